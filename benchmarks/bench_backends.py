@@ -0,0 +1,67 @@
+"""Compare the pure-Python, NumPy and Numba implementations of the kernels.
+
+For each kernel the script prints the time per instrument of the scalar
+function under every available backend, and of the NumPy array function that
+values a whole batch at once. The scalar timings include the Python call
+overhead that a pricing loop pays for every instrument.
+
+    python benchmarks/bench_backends.py [instruments]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from fixincome import backend, bond, solvers, utils, vectorized
+
+DATES = ["20060101", "20060303", "20060704", "20061012", "20061225", "20070301", "20070815"]
+
+
+def per_instrument(func, n: int, repeat: int = 3) -> float:
+    """Return the best time in microseconds per instrument of ``func()``, which values ``n`` of them"""
+    func()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best/n*1e6
+
+
+def main(n: int = 20000) -> None:
+    rng = np.random.default_rng(0)
+    rates = rng.uniform(0.01, 0.12, n)
+    terms = rng.integers(1, 31, n).astype(float)
+    coupons = rng.uniform(0.01, 0.08, n)
+    flows = rng.uniform(50, 150, (n, 10))
+    dated = np.column_stack([-rng.uniform(800, 1000, n), rng.uniform(50, 400, (n, len(DATES) - 1))])
+    schedules = [utils.CashflowSchedule(DATES, row) for row in dated]
+    cf, t = solvers._stack_schedules(schedules)
+
+    scalar = {
+        "present_value": lambda: [utils.present_value(100*c, r, t, 100) for c, r, t in zip(coupons, rates, terms)],
+        "macaulay_duration": lambda: [utils.macaulay_duration(100, r, 100, c, t)
+                                      for c, r, t in zip(coupons, rates, terms)],
+        "xnpv": lambda: [utils.xnpv(r, s) for r, s in zip(rates, schedules)],
+        "internal_rate": lambda: [utils.internal_rate(row, 1000) for row in flows],
+    }
+    array = {
+        "present_value": lambda: vectorized.present_value_array(100*coupons, rates, terms, 100),
+        "macaulay_duration": lambda: bond.macaulay_duration_array(100, rates, 100, coupons, terms),
+        "xnpv": lambda: (cf*(1 + rates[:, None])**-t).sum(axis=1),
+        "internal_rate": lambda: solvers.internal_rate_batch(flows, 1000),
+    }
+    backends = backend.available_backends()
+    print(f"{'kernel':<20}" + "".join(f"{name:>12}" for name in backends) + f"{'numpy':>12}   (us per instrument)")
+    for name in scalar:
+        row = []
+        for b in backends:
+            backend.set_backend(b)
+            row.append(per_instrument(scalar[name], n))
+        row.append(per_instrument(array[name], n))
+        print(f"{name:<20}" + "".join(f"{t:12.2f}" for t in row))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,41 @@
+"""Measure the cold import time of fixincome.
+
+Each statement is run in a fresh interpreter so that nothing is cached between
+runs. fixincome no longer imports SciPy, so importing it should cost a fraction
+of importing SciPy's optimizers, which it used to pull in at import time.
+
+    python benchmarks/bench_import.py [repeat]
+"""
+
+import subprocess
+import sys
+import time
+
+STATEMENTS = {
+    "numpy": "import numpy",
+    "fixincome": "import fixincome",
+    "fixincome + scipy.optimize": "import fixincome, scipy.optimize",
+}
+
+
+def cold_import_time(statement: str, repeat: int) -> float:
+    """Return the best wall time in seconds of running ``statement`` in a new interpreter"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(repeat: int = 5) -> None:
+    baseline = cold_import_time("pass", repeat)
+    for name, statement in STATEMENTS.items():
+        elapsed = cold_import_time(statement, repeat) - baseline
+        scipy_loaded = subprocess.run([sys.executable, "-c", statement + "; import sys; print('scipy' in sys.modules)"],
+                                      check=True, capture_output=True, text=True).stdout.strip()
+        print(f"{name:<28} {elapsed*1000:8.1f} ms   scipy loaded: {scipy_loaded}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,35 @@
+"""Measure how the process-pool runner scales with the number of workers.
+
+Solves the yields of a synthetic book of bonds with `ParallelRunner` for an
+increasing number of processes and prints the speed-up over one process.
+
+    python benchmarks/bench_parallel.py [instruments] [max_processes]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from fixincome.parallel import ParallelRunner
+
+
+def main(n: int = 2_000_000, max_processes: int = os.cpu_count()) -> None:
+    rng = np.random.default_rng(0)
+    price, coupon, term = rng.uniform(80, 120, n), rng.uniform(1, 8, n), rng.integers(1, 31, n)
+    base = None
+    processes = 1
+    while processes <= max_processes:
+        with ParallelRunner(processes) as runner:
+            runner.discount_rate(price[:1000], coupon[:1000], term[:1000], 100)  # start the pool
+            start = time.perf_counter()
+            runner.discount_rate(price, coupon, term, 100)
+            elapsed = time.perf_counter() - start
+        base = base or elapsed
+        print(f"{processes:>4} processes {elapsed:8.3f} s   speed-up {base/elapsed:5.1f}x")
+        processes *= 2
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -1 +1,20 @@
-from .utils import *
\ No newline at end of file
+from .utils import *
+from .vectorized import *
+from .solvers import discount_rate_batch, internal_rate_batch, internal_rates_batch, xirr_batch, RootResult, WarmStartSolver
+from .schedule import CashflowSchedule
+from .bond import BondAnalytics, bond_analytics, bond_analytics_array, macaulay_duration_array, modified_duration_array
+from .cache import FactorCache, enable_factor_cache, disable_factor_cache, factor_cache
+from .daycount import year_fraction, register_convention
+from .calendars import Calendar, get_calendar, register_calendar
+from .book import CashflowBook
+from .coupons import CouponSchedule, coupon_schedule, coupon_schedules
+from .accrued import accrued_interest, clean_price, dirty_price, price_from_yield, yield_from_price
+from .curve import YieldCurve
+
+
+def __getattr__(name):
+    # ParallelRunner is imported on first use, fixincome.parallel loads multiprocessing and shared memory
+    if name == "ParallelRunner":
+        from .parallel import ParallelRunner
+        return ParallelRunner
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,217 @@
+"""Accrued interest, clean and dirty prices and yields of coupon bonds on settlement dates.
+
+The functions of this module take one settlement date and one `CouponSchedule`
+per bond, typically generated by `fixincome.coupons.coupon_schedules`. The
+periods of the distinct schedules are laid out in flat arrays once per call,
+the period of every settlement date is found with a single `np.searchsorted`,
+and accrued interest, prices and their yield derivatives are vector operations
+followed by segmented sums over the remaining payments of each bond.
+
+Accrued interest defaults to the ICMA rule, the coupon of the current period
+prorated by the actual days elapsed, and prices discount the remaining
+payments at the yield compounded at the coupon frequency, over the number of
+coupon periods from settlement to each payment (street convention).
+"""
+
+from typing import NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .coupons import CouponSchedule
+from .dates import to_datetime64
+from .daycount import year_fraction
+from .solvers import RootResult, solve
+
+Schedules = Union[CouponSchedule, Sequence[CouponSchedule]]
+
+
+class _Settlement(NamedTuple):
+    # Current period of each bond at settlement and the payments left after it
+    valid: np.ndarray      # settlement within [issue, maturity)
+    accrued: np.ndarray    # accrued interest, nan where not valid
+    frequency: np.ndarray  # coupons per year
+    lengths: np.ndarray    # number of remaining payments
+    cashflows: np.ndarray  # remaining payments of every bond, one bond after the other
+    periods: np.ndarray    # coupon periods from settlement to each remaining payment
+
+
+def _settle(settlement: ArrayLike, schedules: Schedules, convention: Optional[str]) -> _Settlement:
+    if isinstance(schedules, CouponSchedule):
+        schedules = [schedules]*max(1, np.size(settlement))
+    index = {}
+    uid = np.array([index.setdefault(id(s), len(index)) for s in schedules], dtype=np.int64)
+    unique = list({id(s): s for s in schedules}.values())
+    days = np.broadcast_to(to_datetime64(settlement).astype(np.int64).ravel(), uid.shape)
+
+    columns = np.concatenate([s._columns for s in unique])
+    start, end = columns[:, 0].astype(np.int64), columns[:, 1].astype(np.int64)
+    fractions, coupons, cashflows = columns[:, 2], columns[:, 3], columns[:, 4]
+    indptr = np.concatenate([[0], np.cumsum([s._columns.shape[0] for s in unique])])
+
+    # Periods of all schedules in one sorted key, the first period ending after settlement is current
+    lo = min(start.min(), days.min())
+    span = max(end.max(), days.max()) - lo + 1
+    owner = np.repeat(np.arange(len(unique)), np.diff(indptr))
+    k = np.searchsorted(owner*span + (end - lo), uid*span + (days - lo), side="right")
+    valid = k < indptr[uid + 1]
+    k = np.where(valid, k, indptr[uid])
+    valid &= days >= start[k]
+
+    rate = np.array([s.rate for s in unique])[uid]
+    face = np.array([s.face for s in unique])[uid]
+    frequency = np.array([s.frequency for s in unique], dtype=float)[uid]
+    elapsed = (days - start[k])/(end[k] - start[k])
+    if convention is None:
+        accrued = coupons[k]*elapsed
+    else:
+        accrued = face*rate*year_fraction(start[k].astype("datetime64[D]"), days.astype("datetime64[D]"), convention)
+    accrued = np.where(valid, accrued, np.nan)
+
+    lengths = np.where(valid, indptr[uid + 1] - k, 0)
+    first = np.cumsum(lengths) - lengths
+    flat = np.arange(lengths.sum()) - np.repeat(first - k, lengths)
+    cumulative = np.cumsum(fractions)
+    periods = cumulative[flat] - np.repeat(cumulative[k] - fractions[k]*(1 - elapsed), lengths)
+    return _Settlement(valid, accrued, frequency, lengths, cashflows[flat], periods)
+
+
+def _segment_sum(values: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    out = np.zeros(lengths.shape)
+    filled = lengths > 0
+    if values.size:
+        out[filled] = np.add.reduceat(values, (np.cumsum(lengths) - lengths)[filled])
+    return out
+
+
+def accrued_interest(settlement: ArrayLike, schedules: Schedules, convention: Optional[str] = None) -> np.ndarray:
+    """Calculate the interest accrued by bonds since their last coupon date
+
+    Args:
+        settlement (ArrayLike): settlement date of each bond, in any form accepted by
+                `fixincome.dates.to_datetime64`
+        schedules (CouponSchedule or Sequence[CouponSchedule]): schedule of each bond, or one
+                schedule for all settlement dates
+        convention (str, optional): day-count convention of the accrual, see
+                `fixincome.daycount.CONVENTIONS`. Defaults to the ICMA rule, the coupon of the
+                period prorated by actual days.
+
+    Returns:
+        np.ndarray: accrued interest, nan where settlement is not between issue and maturity
+    """
+    return _settle(settlement, schedules, convention).accrued
+
+
+def dirty_price(clean: ArrayLike, settlement: ArrayLike, schedules: Schedules,
+                convention: Optional[str] = None) -> np.ndarray:
+    """Convert clean prices to dirty prices by adding the accrued interest, see `accrued_interest`
+
+    Args:
+        clean (ArrayLike): clean prices, in the unit of the face values of the schedules
+        settlement (ArrayLike): settlement dates
+        schedules (CouponSchedule or Sequence[CouponSchedule]): schedule of each bond
+        convention (str, optional): day-count convention of the accrual. Defaults to ICMA.
+
+    Returns:
+        np.ndarray: dirty (full) prices
+    """
+    return np.asarray(clean, dtype=float) + accrued_interest(settlement, schedules, convention)
+
+
+def clean_price(dirty: ArrayLike, settlement: ArrayLike, schedules: Schedules,
+                convention: Optional[str] = None) -> np.ndarray:
+    """Convert dirty prices to clean prices by subtracting the accrued interest, see `accrued_interest`
+
+    Args:
+        dirty (ArrayLike): dirty (full) prices, in the unit of the face values of the schedules
+        settlement (ArrayLike): settlement dates
+        schedules (CouponSchedule or Sequence[CouponSchedule]): schedule of each bond
+        convention (str, optional): day-count convention of the accrual. Defaults to ICMA.
+
+    Returns:
+        np.ndarray: clean prices
+    """
+    return np.asarray(dirty, dtype=float) - accrued_interest(settlement, schedules, convention)
+
+
+def price_from_yield(ytm: ArrayLike, settlement: ArrayLike, schedules: Schedules, clean: bool = True,
+                     convention: Optional[str] = None) -> np.ndarray:
+    """Calculate the prices of bonds from their yields to maturity
+
+    Args:
+        ytm (ArrayLike): annual yields, compounded at the coupon frequency of each bond
+        settlement (ArrayLike): settlement dates
+        schedules (CouponSchedule or Sequence[CouponSchedule]): schedule of each bond
+        clean (bool, optional): whether to return clean prices rather than dirty prices.
+                Defaults to True.
+        convention (str, optional): day-count convention of the accrual. Defaults to ICMA.
+
+    Returns:
+        np.ndarray: prices, nan where settlement is not between issue and maturity
+    """
+    s = _settle(settlement, schedules, convention)
+    r = np.broadcast_to(np.asarray(ytm, dtype=float).ravel(), s.valid.shape)/s.frequency
+    dirty = _segment_sum(s.cashflows*np.exp(-s.periods*np.repeat(np.log1p(r), s.lengths)), s.lengths)
+    dirty = np.where(s.valid, dirty, np.nan)
+    return dirty - s.accrued if clean else dirty
+
+
+def yield_from_price(price: ArrayLike, settlement: ArrayLike, schedules: Schedules, clean: bool = True,
+                     guess: ArrayLike = 0.05, convention: Optional[str] = None, tol: float = 1e-12,
+                     maxiter: int = 50) -> RootResult:
+    """Solve the yields to maturity of bonds from their prices
+
+    The yields of all bonds are solved together by `fixincome.solvers.solve`, with Halley steps
+    on the price and its analytic derivatives in the yield.
+
+    Args:
+        price (ArrayLike): clean or dirty prices, in the unit of the face values of the schedules
+        settlement (ArrayLike): settlement dates
+        schedules (CouponSchedule or Sequence[CouponSchedule]): schedule of each bond
+        clean (bool, optional): whether the prices are clean prices. Defaults to True.
+        guess (ArrayLike, optional): starting yield(s). Defaults to 0.05.
+        convention (str, optional): day-count convention of the accrual. Defaults to ICMA.
+        tol (float, optional): convergence tolerance. Defaults to 1e-12.
+        maxiter (int, optional): maximum number of Halley iterations. Defaults to 50.
+
+    Returns:
+        RootResult: annual yields compounded at the coupon frequency, convergence flags and
+                iteration counts, nan and not converged where settlement is not between issue
+                and maturity
+    """
+    s = _settle(settlement, schedules, convention)
+    n = s.valid.size
+    target = np.broadcast_to(np.asarray(price, dtype=float).ravel(), (n,))
+    target = target + s.accrued if clean else target
+    bonds = np.flatnonzero(s.valid)
+    lengths = s.lengths[bonds]
+
+    def payments(rows: np.ndarray) -> Tuple[Union[slice, np.ndarray], np.ndarray]:
+        # Remaining payments of the given rows of ``bonds``
+        if rows.size == bonds.size:
+            return slice(None), lengths
+        mask = np.zeros(bonds.size, dtype=bool)
+        mask[rows] = True
+        return np.repeat(mask, lengths), lengths[rows]
+
+    def func(r, rows, deriv):
+        select, counts = payments(rows)
+        e = s.periods[select]
+        u = 1 + r
+        w = s.cashflows[select]*np.exp(-e*np.repeat(np.log1p(r), counts))
+        res = (_segment_sum(w, counts) - target[bonds[rows]],)
+        if deriv >= 1:
+            res += (-_segment_sum(e*w, counts)/u,)
+            if deriv >= 2:
+                res += (_segment_sum(e*(e+1)*w, counts)/(u*u),)
+        return res
+
+    x0 = np.broadcast_to(np.asarray(guess, dtype=float).ravel(), (n,))[bonds]/s.frequency[bonds]
+    result = solve(func, x0, tol=tol, maxiter=maxiter)
+    root = np.full(n, np.nan)
+    converged = np.zeros(n, dtype=bool)
+    iterations = np.zeros(n, dtype=np.int64)
+    root[bonds] = result.root*s.frequency[bonds]
+    converged[bonds] = result.converged
+    iterations[bonds] = result.iterations
+    return RootResult(root, converged, iterations)
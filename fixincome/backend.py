@@ -0,0 +1,86 @@
+"""Selection of the implementation behind the single-instrument kernels.
+
+The functions of `fixincome.utils` call their kernels through the `ops`
+namespace. The "python" backend uses the pure-Python kernels and root finders of
+`fixincome.kernels` and `fixincome.solvers`; the "numba" backend uses the
+JIT-compiled versions of `fixincome.jit`, which are only imported when the
+backend is selected. By default the backend is chosen on the first kernel call:
+Numba when it is installed, pure Python otherwise. The ``FIXINCOME_BACKEND``
+environment variable ("auto", "python" or "numba") overrides that default.
+"""
+
+import importlib.util
+import os
+from types import SimpleNamespace
+from typing import Callable, List, Optional
+
+from . import kernels, solvers
+
+#: names of the kernels provided by every backend
+KERNELS = ("annuity_derivatives", "present_value", "npv", "xnpv", "internal_rate_root", "discount_rate_root",
+           "xirr_root")
+
+_PYTHON = {
+    "annuity_derivatives": kernels.annuity_derivatives,
+    "present_value": kernels.present_value,
+    "npv": kernels.npv,
+    "xnpv": kernels.xnpv,
+    "internal_rate_root": solvers.internal_rate_root,
+    "discount_rate_root": solvers.discount_rate_root,
+    "xirr_root": solvers.xirr_root,
+}
+
+_backend: Optional[str] = None
+
+
+def _lazy(name: str) -> Callable:
+    # Stub that selects the default backend on the first call of any kernel
+    def stub(*args, **kwargs):
+        set_backend(os.environ.get("FIXINCOME_BACKEND", "auto"))
+        return getattr(ops, name)(*args, **kwargs)
+    return stub
+
+
+#: the kernels of the active backend, looked up at call time by `fixincome.utils`
+ops = SimpleNamespace(**{name: _lazy(name) for name in KERNELS})
+
+
+def numba_available() -> bool:
+    """Return whether Numba is installed, without importing it"""
+    return importlib.util.find_spec("numba") is not None
+
+
+def available_backends() -> List[str]:
+    """Return the backends that can be selected in this environment"""
+    return ["python", "numba"] if numba_available() else ["python"]
+
+
+def set_backend(name: str = "auto") -> str:
+    """Select the implementation of the kernels
+
+    Args:
+        name (str, optional): "python", "numba", or "auto" for Numba when it is installed and
+                pure Python otherwise. Defaults to "auto".
+
+    Returns:
+        str: name of the selected backend
+    """
+    global _backend
+    if name == "auto":
+        name = "numba" if numba_available() else "python"
+    if name == "numba":
+        from . import jit
+        table = {kernel: getattr(jit, kernel) for kernel in KERNELS}
+    elif name == "python":
+        table = _PYTHON
+    else:
+        raise ValueError(f"unknown backend {name!r}, expected 'auto', 'python' or 'numba'")
+    for kernel, func in table.items():
+        setattr(ops, kernel, func)
+    _backend = name
+    return name
+
+
+def get_backend() -> Optional[str]:
+    """Return the name of the active backend, or None before the first kernel call"""
+    return _backend
@@ -0,0 +1,114 @@
+"""Closed-form analytics for level-coupon bonds.
+
+A bond paying ``coupon`` at the end of each of ``term`` periods and ``face_value``
+at maturity is an annuity plus a final payment, so its yield derivatives follow
+from the closed-form annuity moments of `fixincome.vectorized`: the yield to
+maturity is solved once and every sensitivity follows in one pass.
+"""
+
+from typing import NamedTuple, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .backend import ops
+from .solvers import discount_rate_batch
+from .vectorized import annuity_moments_array, present_value_derivatives_array
+
+
+class BondAnalytics(NamedTuple):
+    """Price, yield and risk measures of one bond (floats) or of a book of bonds (arrays)"""
+    price: Union[float, np.ndarray]
+    ytm: Union[float, np.ndarray]
+    macaulay_duration: Union[float, np.ndarray]
+    modified_duration: Union[float, np.ndarray]
+    pvbp: Union[float, np.ndarray]
+    convexity: Union[float, np.ndarray]
+
+
+def macaulay_duration_array(price: ArrayLike, ytm: ArrayLike, par_value: ArrayLike, par_rate: ArrayLike,
+                            term: ArrayLike) -> np.ndarray:
+    """Calculate the Macaulay durations of a universe of bonds
+
+    The arguments follow `fixincome.utils.macaulay_duration` and broadcast against each other,
+    bonds with different terms can be mixed freely.
+
+    Args:
+        price (ArrayLike): current prices of the bonds
+        ytm (ArrayLike): yields to maturity
+        par_value (ArrayLike): face values
+        par_rate (ArrayLike): coupon rates
+        term (ArrayLike): maturities of the bonds, in periods
+
+    Returns:
+        np.ndarray: Macaulay durations
+    """
+    ytm, term = np.asarray(ytm, dtype=float), np.asarray(term, dtype=float)
+    par_value = np.asarray(par_value, dtype=float)
+    _, s1, _ = annuity_moments_array(ytm, term)
+    return (par_value*np.asarray(par_rate)*s1 + par_value*term*(1+ytm)**-term)/np.asarray(price)
+
+
+def modified_duration_array(price: ArrayLike, ytm: ArrayLike, par_value: ArrayLike, par_rate: ArrayLike,
+                            term: ArrayLike) -> np.ndarray:
+    """Calculate the modified durations of a universe of bonds
+
+    Args:
+        price (ArrayLike): current prices of the bonds
+        ytm (ArrayLike): yields to maturity
+        par_value (ArrayLike): face values
+        par_rate (ArrayLike): coupon rates
+        term (ArrayLike): maturities of the bonds, in periods
+
+    Returns:
+        np.ndarray: modified durations
+    """
+    return macaulay_duration_array(price, ytm, par_value, par_rate, term)/(1+np.asarray(ytm))
+
+
+def bond_analytics_array(price: ArrayLike, coupon: ArrayLike, term: ArrayLike, face_value: ArrayLike = 100,
+                         guess: ArrayLike = 0.1) -> BondAnalytics:
+    """Calculate price, yield to maturity, durations, pvbp and convexity of a book of bonds
+
+    The yield of every bond is solved once from its price, and the risk measures are then
+    evaluated from closed-form derivatives of the price at that yield.
+
+    Args:
+        price (ArrayLike): current prices of the bonds
+        coupon (ArrayLike): coupon paid each period
+        term (ArrayLike): number of periods to maturity
+        face_value (ArrayLike, optional): face values of the bonds. Defaults to 100.
+        guess (ArrayLike, optional): starting yield(s) of the solver. Defaults to 0.1.
+
+    Returns:
+        BondAnalytics: arrays of price, ytm, Macaulay duration, modified duration,
+                pvbp (per basis point) and convexity, nan where the yield could not be solved
+    """
+    price, coupon, term, face_value = (np.asarray(a, dtype=float).ravel() for a in
+                                       np.broadcast_arrays(price, coupon, term, face_value))
+
+    ytm = discount_rate_batch(price, coupon, term, face_value, guess).root
+    _, d1, d2 = present_value_derivatives_array(coupon, ytm, term, face_value)
+    modified = -d1/price
+    return BondAnalytics(price, ytm, modified*(1+ytm), modified, -d1*1e-4, d2/price)
+
+
+def bond_analytics(price: float, coupon: float, term: int, face_value: float = 100,
+                   guess: float = 0.1) -> BondAnalytics:
+    """Calculate price, yield to maturity, durations, pvbp and convexity of a bond
+
+    Args:
+        price (float): the current price of the bond
+        coupon (float): coupon paid each period
+        term (int): the maturity of the bond
+        face_value (float, optional): face value of the bond. Defaults to 100.
+        guess (float, optional): starting yield of the solver. Defaults to 0.1.
+
+    Returns:
+        BondAnalytics: price, ytm, Macaulay duration, modified duration, pvbp and convexity
+    """
+    price = float(price)
+    ytm = float(ops.discount_rate_root(price, coupon, term, face_value, guess).root)
+    _, d1, d2 = ops.annuity_derivatives(coupon, ytm, term, face_value)
+    modified = -d1/price
+    return BondAnalytics(price, ytm, modified*(1+ytm), modified, -d1*1e-4, d2/price)
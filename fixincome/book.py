@@ -0,0 +1,302 @@
+"""Compact storage of the cash flows of a whole portfolio.
+
+A `CashflowBook` keeps the cash flows of every instrument in one flat float64
+array and their payment days in one flat int32 array, delimited by a CSR-style
+``indptr`` array: the payments of instrument ``i`` are the elements
+``indptr[i]:indptr[i+1]``. Whole-book valuations are a few vector operations
+over the flat arrays followed by a segmented sum (`np.add.reduceat`), instead of
+a Python loop over lists of floats and date strings.
+"""
+
+from functools import cached_property
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .curve import YieldCurve
+from .dates import to_datetime64
+from .daycount import DEFAULT_CONVENTION, year_fraction
+from .schedule import CashflowSchedule
+from .solvers import RootResult, solve
+
+
+class CashflowBook:
+    """Dated cash flows of many instruments in flat arrays
+
+    Args:
+        cashflows (ArrayLike): cash flows of all instruments, one instrument after the other
+        offsets (ArrayLike): day of each payment counted from the first date of its instrument
+        indptr (ArrayLike): ``len(book) + 1`` increasing positions delimiting the instruments,
+                starting at 0 and ending at ``len(cashflows)``
+        start (ArrayLike, optional): first date of each instrument, in any form accepted by
+                `fixincome.dates.to_datetime64`. Needed to rebuild the dates and for day-count
+                conventions other than ACT/365.
+        convention (str, optional): day-count convention of `year_fractions`, see
+                `fixincome.daycount.CONVENTIONS`. Defaults to "ACT/365".
+    """
+
+    def __init__(self, cashflows: ArrayLike, offsets: ArrayLike, indptr: ArrayLike, start: Optional[ArrayLike] = None,
+                 convention: str = DEFAULT_CONVENTION):
+        self.cashflows = np.ascontiguousarray(cashflows, dtype=float).ravel()
+        self.offsets = np.ascontiguousarray(offsets, dtype=np.int32).ravel()
+        self.indptr = np.ascontiguousarray(indptr, dtype=np.int64).ravel()
+        if self.offsets.shape != self.cashflows.shape:
+            raise ValueError("cashflows and offsets must have the same length")
+        if (self.indptr.size == 0 or self.indptr[0] != 0 or self.indptr[-1] != self.cashflows.size
+                or np.any(np.diff(self.indptr) < 0)):
+            raise ValueError("indptr must increase from 0 to the number of cash flows")
+        self.start = None if start is None else to_datetime64(start).ravel()
+        self.convention = convention
+        self._times: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_lists(cls, dates: Sequence[ArrayLike], cashflows: Sequence[ArrayLike],
+                   convention: str = DEFAULT_CONVENTION) -> "CashflowBook":
+        """Build a book from per-instrument sequences of dates and cash flows
+
+        All dates are parsed in a single call of `fixincome.dates.to_datetime64`.
+
+        Args:
+            dates (Sequence[ArrayLike]): payment dates of each instrument
+            cashflows (Sequence[ArrayLike]): cash flows of each instrument, aligned with ``dates``
+            convention (str, optional): day-count convention. Defaults to "ACT/365".
+
+        Returns:
+            CashflowBook: the book
+        """
+        lengths = np.array([len(c) for c in cashflows], dtype=np.int64)
+        if len(dates) != lengths.size or any(len(d) != n for d, n in zip(dates, lengths)):
+            raise ValueError("dates and cashflows must have the same lengths")
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        days = to_datetime64([d for row in dates for d in row]).astype(np.int64)
+        filled = lengths > 0
+        first = np.zeros(lengths.size, dtype=np.int64)
+        first[filled] = days[indptr[:-1][filled]]
+        values = np.concatenate([np.zeros(0)] + [np.asarray(c, dtype=float).ravel() for c in cashflows])
+        start = np.where(filled, first.astype("datetime64[D]"), np.datetime64("NaT"))
+        return cls(values, days - np.repeat(first, lengths), indptr, start, convention)
+
+    @classmethod
+    def from_schedules(cls, schedules: Sequence[CashflowSchedule],
+                       convention: str = DEFAULT_CONVENTION) -> "CashflowBook":
+        """Build a book from parsed schedules
+
+        Args:
+            schedules (Sequence[CashflowSchedule]): one schedule per instrument
+            convention (str, optional): day-count convention. Defaults to "ACT/365".
+
+        Returns:
+            CashflowBook: the book
+        """
+        indptr = np.concatenate([[0], np.cumsum([len(s) for s in schedules], dtype=np.int64)])
+        start = np.array([s.dates[0] if len(s) else np.datetime64("NaT") for s in schedules], dtype="datetime64[D]")
+        return cls(np.concatenate([s.cashflows for s in schedules]), np.concatenate([s.offsets for s in schedules]),
+                   indptr, start, convention)
+
+    def __len__(self) -> int:
+        return self.indptr.size - 1
+
+    def __repr__(self) -> str:
+        return f"CashflowBook({len(self)} instruments, {self.cashflows.size} payments)"
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[CashflowSchedule, "CashflowBook"]:
+        if isinstance(i, slice):
+            lo, hi, step = i.indices(len(self))
+            if step != 1:
+                raise ValueError("a book can only be sliced with a step of 1")
+            hi = max(lo, hi)
+            first, last = self.indptr[lo], self.indptr[hi]
+            start = None if self.start is None else self.start[lo:hi]
+            return CashflowBook(self.cashflows[first:last], self.offsets[first:last],
+                                self.indptr[lo:hi+1] - first, start, self.convention)
+        if self.start is None:
+            raise ValueError("the book was built without start dates")
+        lo, hi = self.indptr[i], self.indptr[i+1]
+        return CashflowSchedule(self.start[i] + self.offsets[lo:hi], self.cashflows[lo:hi], self.convention)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """np.ndarray: number of payments of each instrument"""
+        return np.diff(self.indptr)
+
+    @property
+    def nbytes(self) -> int:
+        """int: memory used by the arrays of the book"""
+        return sum(a.nbytes for a in (self.cashflows, self.offsets, self.indptr, self.start) if a is not None)
+
+    def times(self, convention: Optional[str] = None) -> np.ndarray:
+        """Return the year fraction of each payment since the first date of its instrument, cached per convention
+
+        Args:
+            convention (str, optional): day-count convention. Defaults to the book's.
+
+        Returns:
+            np.ndarray: year fraction of each payment
+        """
+        convention = (convention or self.convention).upper()
+        times = self._times.get(convention)
+        if times is None:
+            if convention == DEFAULT_CONVENTION:
+                times = self.offsets/365
+            elif self.start is None:
+                raise ValueError(f"the book was built without start dates, which {convention} needs")
+            else:
+                start = np.repeat(self.start, self.lengths)
+                times = year_fraction(start, start + self.offsets, convention)
+            self._times[convention] = times
+        return times
+
+    @property
+    def year_fractions(self) -> np.ndarray:
+        """np.ndarray: year fraction of each payment since its instrument's first date, in the book's convention"""
+        return self.times()
+
+    @cached_property
+    def periods(self) -> np.ndarray:
+        """np.ndarray: position 1, 2, ... of each payment within its instrument"""
+        return np.arange(1, self.cashflows.size + 1) - np.repeat(self.indptr[:-1], self.lengths)
+
+    def segment_sum(self, values: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Sum per-payment values over each instrument
+
+        Args:
+            values (np.ndarray): one value per payment of the book, or per payment of ``rows``
+            rows (np.ndarray, optional): increasing instruments the values belong to. Defaults
+                    to every instrument.
+
+        Returns:
+            np.ndarray: one sum per instrument (per row), 0 for instruments without payments
+        """
+        if rows is None:
+            lengths, starts = self.lengths, self.indptr[:-1]
+        else:
+            lengths = self.lengths[rows]
+            starts = np.concatenate([[0], np.cumsum(lengths[:-1])])
+        out = np.zeros(lengths.shape)
+        filled = lengths > 0
+        if values.size:
+            out[filled] = np.add.reduceat(values, starts[filled])
+        return out
+
+    def _payments(self, rows: Optional[np.ndarray]) -> Union[slice, np.ndarray]:
+        # Positions in the flat arrays of the payments of the given rows
+        if rows is None or len(rows) == len(self):
+            return slice(None)
+        mask = np.zeros(len(self), dtype=bool)
+        mask[rows] = True
+        return np.repeat(mask, self.lengths)
+
+    def _spread(self, rate: ArrayLike, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        # Scalar rate, or one rate per instrument (per row) repeated over its payments
+        rate = np.asarray(rate, dtype=float)
+        if rate.ndim == 0:
+            return rate
+        return np.repeat(rate, self.lengths if rows is None else self.lengths[rows])
+
+    def npv(self, rate: Union[ArrayLike, YieldCurve], investment: ArrayLike = 0) -> np.ndarray:
+        """Calculate the net present value of every instrument, its payments being end-of-period cash flows
+
+        Payment k of an instrument is discounted over k periods, as in
+        `fixincome.utils.net_present_value`, whatever its date.
+
+        Args:
+            rate (ArrayLike or YieldCurve): discount rate per period, one for the book or one per
+                    instrument, or a curve discounting period k at k years
+            investment (ArrayLike, optional): initial investment of each instrument. Defaults to 0.
+
+        Returns:
+            np.ndarray: net present value of each instrument
+        """
+        if isinstance(rate, YieldCurve):
+            disc = rate.discount_factor(self.periods)
+        else:
+            disc = np.exp(-self.periods*np.log1p(self._spread(rate)))
+        return self.segment_sum(self.cashflows*disc) - investment
+
+    def _discounted(self, rate: ArrayLike, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        payments = self._payments(rows)
+        return self.cashflows[payments]*np.exp(-self.year_fractions[payments]*np.log1p(self._spread(rate, rows)))
+
+    def xnpv(self, rate: Union[ArrayLike, YieldCurve]) -> np.ndarray:
+        """Calculate the net present value of every instrument at the date of its first payment
+
+        Args:
+            rate (ArrayLike or YieldCurve): annual discount rate, one for the book or one per
+                    instrument, or a curve. A curve with a valuation date values every instrument
+                    at that date, see `fixincome.curve.YieldCurve.xnpv`.
+
+        Returns:
+            np.ndarray: net present value of each instrument, following `fixincome.utils.xnpv`
+        """
+        if isinstance(rate, YieldCurve):
+            if rate.date is None:
+                return self.segment_sum(self.cashflows*rate.discount_factor(self.year_fractions))
+            if self.start is None:
+                raise ValueError("the book was built without start dates, which a dated curve needs")
+            dates = np.repeat(self.start, self.lengths) + self.offsets
+            return self.segment_sum(self.cashflows*rate.discount_factor_at(dates))
+        return self.segment_sum(self._discounted(rate))
+
+    def macaulay_duration(self, rate: ArrayLike) -> np.ndarray:
+        """Calculate the Macaulay duration of every instrument in years from its first date
+
+        Args:
+            rate (ArrayLike): annual yield, one for the book or one per instrument
+
+        Returns:
+            np.ndarray: present-value weighted average time of the payments of each instrument,
+                    nan for instruments without payments
+        """
+        w = self._discounted(rate)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.segment_sum(self.year_fractions*w)/self.segment_sum(w)
+
+    def modified_duration(self, rate: ArrayLike) -> np.ndarray:
+        """Calculate the modified duration of every instrument, see `macaulay_duration`
+
+        Args:
+            rate (ArrayLike): annual yield, one for the book or one per instrument
+
+        Returns:
+            np.ndarray: Macaulay duration divided by one plus the yield
+        """
+        return self.macaulay_duration(rate)/(1 + np.asarray(rate, dtype=float))
+
+    def xirr(self, guess: ArrayLike = 0.0, tol: float = 1e-12, maxiter: int = 50) -> RootResult:
+        """Calculate the internal rate of return of every instrument, see `fixincome.solvers.xirr_batch`
+
+        Args:
+            guess (ArrayLike, optional): starting rate(s). Defaults to 0.0.
+            tol (float, optional): convergence tolerance. Defaults to 1e-12.
+            maxiter (int, optional): maximum number of Halley iterations. Defaults to 50.
+
+        Returns:
+            RootResult: internal rates of return, convergence flags and iteration counts, nan and
+                    not converged for instruments without payments
+        """
+        filled = np.flatnonzero(self.lengths > 0)
+
+        def func(r, rows, deriv):
+            rows = filled[rows]
+            u = 1 + r
+            w = self._discounted(r, rows)
+            res = (self.segment_sum(w, rows),)
+            if deriv >= 1:
+                t = self.year_fractions[self._payments(rows)]
+                res += (-self.segment_sum(t*w, rows)/u,)
+                if deriv >= 2:
+                    res += (self.segment_sum(t*(t+1)*w, rows)/(u*u),)
+            return res
+
+        x0 = np.broadcast_to(np.asarray(guess, dtype=float), (len(self),))
+        result = solve(func, x0[filled], tol=tol, maxiter=maxiter)
+        if filled.size == len(self):
+            return result
+        root = np.full(len(self), np.nan)
+        converged = np.zeros(len(self), dtype=bool)
+        iterations = np.zeros(len(self), dtype=np.int64)
+        root[filled] = result.root
+        converged[filled] = result.converged
+        iterations[filled] = result.iterations
+        return RootResult(root, converged, iterations)
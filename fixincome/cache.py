@@ -0,0 +1,178 @@
+"""Opt-in memoization of annuity and discount factors.
+
+Pricing loops often evaluate the same ``(rate, nper, time)`` factors thousands of
+times. When the factor cache is enabled with `enable_factor_cache`, the functions
+decorated with `memoized` look their results up in a bounded, thread-safe LRU
+cache keyed on their arguments rounded to a configurable number of decimals, so
+float noise such as ``0.1 + 0.2`` still hits the entry of ``0.3``.
+"""
+
+import threading
+from collections import OrderedDict
+from functools import wraps
+from numbers import Integral, Real
+from typing import Any, Callable, Hashable, Iterable, List, NamedTuple, Optional
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a cache, in the spirit of `functools.lru_cache`"""
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache:
+    """A bounded, thread-safe least recently used mapping with hit/miss statistics
+
+    Args:
+        maxsize (int, optional): maximum number of entries kept. Defaults to 65536.
+    """
+
+    def __init__(self, maxsize: int = 65536):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value stored for ``key`` and mark it as recently used, or ``default``"""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def get_many(self, keys: Iterable[Hashable], default: Any = None) -> List[Any]:
+        """Return the values stored for ``keys`` under a single lock, see `get`"""
+        data = self._data
+        values = []
+        with self._lock:
+            for key in keys:
+                if key in data:
+                    data.move_to_end(key)
+                    values.append(data[key])
+                    self._hits += 1
+                else:
+                    values.append(default)
+                    self._misses += 1
+        return values
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store ``value`` for ``key``, evicting the least recently used entry when full"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def put_many(self, keys: Iterable[Hashable], values: Iterable[Any]) -> None:
+        """Store many values under a single lock, see `put`"""
+        data = self._data
+        with self._lock:
+            for key, value in zip(keys, values):
+                data[key] = value
+                data.move_to_end(key)
+            while len(data) > self.maxsize:
+                data.popitem(last=False)
+
+    def info(self) -> CacheInfo:
+        """Return the hit/miss statistics of the cache"""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.maxsize, len(self._data))
+
+    def clear(self) -> None:
+        """Remove every entry and reset the statistics"""
+        with self._lock:
+            self._data.clear()
+            self._hits = self._misses = 0
+
+
+class FactorCache(LRUCache):
+    """LRU cache of factor function results keyed on quantized arguments
+
+    Args:
+        maxsize (int, optional): maximum number of entries kept. Defaults to 65536.
+        decimals (int, optional): float arguments are rounded to this many decimals to build
+                the key. Defaults to 12.
+    """
+
+    def __init__(self, maxsize: int = 65536, decimals: int = 12):
+        super().__init__(maxsize)
+        self.decimals = decimals
+
+    def key(self, func: Callable, args: tuple, kwargs: dict) -> Optional[Hashable]:
+        """Build the key of a call, or None when an argument is not a plain number"""
+        parts = [func.__qualname__]
+        for name, a in (*((None, a) for a in args), *sorted(kwargs.items())):
+            if isinstance(a, Integral):
+                a = int(a)
+            elif isinstance(a, Real):
+                a = round(float(a), self.decimals) + 0.0
+            else:
+                return None
+            parts.append((name, a))
+        return tuple(parts)
+
+    def call(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        """Return the cached result of ``func(*args, **kwargs)``, computing it on a miss"""
+        key = self.key(func, args, kwargs)
+        if key is None:
+            return func(*args, **kwargs)
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = func(*args, **kwargs)
+            self.put(key, value)
+        return value
+
+
+_MISSING = object()
+_factor_cache: Optional[FactorCache] = None
+
+
+def enable_factor_cache(maxsize: int = 65536, decimals: int = 12) -> FactorCache:
+    """Turn on memoization of the factor functions, replacing any previous cache
+
+    Args:
+        maxsize (int, optional): maximum number of entries kept. Defaults to 65536.
+        decimals (int, optional): float arguments are rounded to this many decimals to build
+                the key. Defaults to 12.
+
+    Returns:
+        FactorCache: the new cache, shared by all threads
+    """
+    global _factor_cache
+    _factor_cache = FactorCache(maxsize, decimals)
+    return _factor_cache
+
+
+def disable_factor_cache() -> None:
+    """Turn off memoization of the factor functions and drop the cache"""
+    global _factor_cache
+    _factor_cache = None
+
+
+def factor_cache() -> Optional[FactorCache]:
+    """Return the active factor cache, or None when memoization is disabled"""
+    return _factor_cache
+
+
+def memoized(func: Callable) -> Callable:
+    """Decorate a factor function so that it uses the factor cache when it is enabled"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        cache = _factor_cache
+        if cache is None:
+            return func(*args, **kwargs)
+        return cache.call(func, args, kwargs)
+    return wrapper
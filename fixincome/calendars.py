@@ -0,0 +1,251 @@
+"""Holiday calendars with vectorized business-day rolls.
+
+A `Calendar` is built once from a weekmask and a list of holidays. It
+precomputes, for every day of its range, whether the day is a business day and
+how many business days precede it. Rolling dates, testing them and counting
+business days between them are then array lookups on ``datetime64[D]`` arrays,
+without a Python loop over the dates. Calendars never change after they are
+built, so they can be shared by any number of threads; `register_calendar` and
+`get_calendar` keep the calendars of a process by name, and joint calendars
+such as ``"NYC+LON"`` are built once on first use.
+"""
+
+import threading
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .dates import to_datetime64
+
+#: business day conventions accepted by `Calendar.roll`
+ROLLS = ("unadjusted", "following", "modified_following", "preceding", "modified_preceding")
+
+Weekmask = Union[str, Sequence[bool]]
+
+
+def _weekmask(weekmask: Weekmask) -> np.ndarray:
+    # Seven booleans for Monday to Sunday, from "1111100" or a sequence
+    mask = np.array([c == "1" for c in weekmask] if isinstance(weekmask, str) else weekmask, dtype=bool)
+    if mask.shape != (7,):
+        raise ValueError("weekmask must have one entry for each day from Monday to Sunday")
+    return mask
+
+
+class Calendar:
+    """Business days of a range of dates, given a weekmask and holidays
+
+    Args:
+        holidays (ArrayLike, optional): non-business dates, in any form accepted by
+                `fixincome.dates.to_datetime64`. Defaults to none.
+        weekmask (str or Sequence[bool], optional): business days of the week from Monday to
+                Sunday. Defaults to "1111100".
+        start (ArrayLike, optional): first date covered. Defaults to 1900-01-01.
+        end (ArrayLike, optional): end of the range covered, exclusive. Defaults to 2200-01-01.
+    """
+
+    def __init__(self, holidays: ArrayLike = (), weekmask: Weekmask = "1111100",
+                 start: ArrayLike = "1900-01-01", end: ArrayLike = "2200-01-01"):
+        self.weekmask = _weekmask(weekmask)
+        self.start = to_datetime64(start)[()]
+        self.end = to_datetime64(end)[()]
+        days = np.arange(self.start, self.end)
+        if days.size == 0:
+            raise ValueError("the calendar range is empty")
+        holidays = np.unique(to_datetime64(holidays).ravel()) if len(holidays) else days[:0]
+        self.holidays = holidays[(holidays >= self.start) & (holidays < self.end)]
+        # 1970-01-01 is a Thursday
+        business = self.weekmask[(days.astype(np.int64) + 3) % 7]
+        business[(self.holidays - self.start).astype(np.int64)] = False
+        self._business = business
+        self._count = np.concatenate([[0], np.cumsum(business)]).astype(np.int32)
+        self._days = np.flatnonzero(business).astype(np.int32)
+        self._month = days.astype("datetime64[M]").astype(np.int32)
+        for a in (self._business, self._count, self._days, self._month, self.holidays):
+            a.flags.writeable = False
+
+    def __repr__(self) -> str:
+        mask = "".join("1" if b else "0" for b in self.weekmask)
+        return f"Calendar({self.holidays.size} holidays, weekmask {mask}, {self.start} to {self.end})"
+
+    @property
+    def nbytes(self) -> int:
+        """int: memory used by the precomputed index"""
+        return sum(a.nbytes for a in (self._business, self._count, self._days, self._month))
+
+    def _index(self, dates: ArrayLike) -> np.ndarray:
+        # Position of each date in the calendar range
+        index = (to_datetime64(dates) - self.start).astype(np.int64)
+        if index.size and (index.min() < 0 or index.max() >= self._business.size):
+            raise ValueError(f"dates must lie between {self.start} and {self.end}")
+        return index
+
+    def _dates(self, index: np.ndarray) -> np.ndarray:
+        return self.start + index
+
+    def is_business_day(self, dates: ArrayLike) -> np.ndarray:
+        """Test whether dates are business days
+
+        Args:
+            dates (ArrayLike): dates accepted by `fixincome.dates.to_datetime64`
+
+        Returns:
+            np.ndarray: boolean array with the shape of ``dates``
+        """
+        return self._business[self._index(dates)]
+
+    def _following(self, index: np.ndarray) -> np.ndarray:
+        count = self._count[index]
+        if count.size and count.max() >= self._days.size:
+            raise ValueError(f"no business day before {self.end}")
+        return self._days[count]
+
+    def _preceding(self, index: np.ndarray) -> np.ndarray:
+        count = self._count[index + 1] - 1
+        if count.size and count.min() < 0:
+            raise ValueError(f"no business day from {self.start}")
+        return self._days[count]
+
+    def roll(self, dates: ArrayLike, convention: str = "following") -> np.ndarray:
+        """Move dates that are not business days to a business day
+
+        Args:
+            dates (ArrayLike): dates accepted by `fixincome.dates.to_datetime64`
+            convention (str, optional): "following" (next business day), "modified_following"
+                    (next business day unless it falls in the next month, preceding then),
+                    "preceding", "modified_preceding" or "unadjusted". Defaults to "following".
+
+        Returns:
+            np.ndarray: ``datetime64[D]`` array of rolled dates with the shape of ``dates``
+        """
+        index = self._index(dates)
+        if convention == "unadjusted":
+            return self._dates(index)
+        if convention in ("following", "modified_following"):
+            rolled = self._following(index)
+            if convention == "modified_following":
+                moved = self._month[rolled] != self._month[index]
+                rolled = np.where(moved, self._preceding(index), rolled)
+        elif convention in ("preceding", "modified_preceding"):
+            rolled = self._preceding(index)
+            if convention == "modified_preceding":
+                moved = self._month[rolled] != self._month[index]
+                rolled = np.where(moved, self._following(index), rolled)
+        else:
+            raise ValueError(f"unknown roll convention {convention!r}, expected one of {ROLLS}")
+        return self._dates(rolled)
+
+    def business_days_between(self, start: ArrayLike, end: ArrayLike) -> np.ndarray:
+        """Count the business days from ``start`` included to ``end`` excluded, like `numpy.busday_count`
+
+        Args:
+            start (ArrayLike): first dates
+            end (ArrayLike): end dates, broadcast against ``start``
+
+        Returns:
+            np.ndarray: number of business days, negative when ``end`` precedes ``start``
+        """
+        return self._count[self._index(end)].astype(np.int64) - self._count[self._index(start)]
+
+    def add_business_days(self, dates: ArrayLike, n: ArrayLike, roll: str = "following") -> np.ndarray:
+        """Move dates by a number of business days, like `numpy.busday_offset`
+
+        Args:
+            dates (ArrayLike): dates accepted by `fixincome.dates.to_datetime64`
+            n (ArrayLike): number of business days, negative to move backward
+            roll (str, optional): "following" or "preceding", how dates that are not business
+                    days are rolled before moving. Defaults to "following".
+
+        Returns:
+            np.ndarray: ``datetime64[D]`` array of the moved dates
+        """
+        if roll not in ("following", "preceding"):
+            raise ValueError("roll must be 'following' or 'preceding'")
+        rolled = self.roll(dates, roll)
+        position = self._count[self._index(rolled)] + np.asarray(n, dtype=np.int64)
+        if position.size and (position.min() < 0 or position.max() >= self._days.size):
+            raise ValueError(f"the moved dates must lie between {self.start} and {self.end}")
+        return self._dates(self._days[position])
+
+    def union(self, other: "Calendar") -> "Calendar":
+        """Return the joint calendar whose business days are business days of both calendars"""
+        holidays = np.concatenate([self.holidays, other.holidays])
+        return Calendar(holidays, self.weekmask & other.weekmask, max(self.start, other.start),
+                        min(self.end, other.end))
+
+
+def read_holidays(path: str) -> np.ndarray:
+    """Read a holiday list with one date per line, ignoring blank lines and ``#`` comments
+
+    Args:
+        path (str): text file of dates in any form accepted by `fixincome.dates.to_datetime64`
+
+    Returns:
+        np.ndarray: ``datetime64[D]`` holidays
+    """
+    with open(path) as f:
+        lines = [line.split("#")[0].strip() for line in f]
+    return to_datetime64([line for line in lines if line])
+
+
+_calendars: Dict[str, Calendar] = {}
+_lock = threading.Lock()
+
+
+def register_calendar(name: str, holidays: Union[ArrayLike, Calendar] = (), weekmask: Weekmask = "1111100",
+                      **kwargs) -> Calendar:
+    """Build a calendar once and make it available by name to every thread
+
+    Args:
+        name (str): name of the calendar, looked up case-insensitively; "+" is reserved for
+                joint calendars
+        holidays (ArrayLike or Calendar, optional): holidays of the calendar, or a calendar
+                already built
+        weekmask (str or Sequence[bool], optional): business days of the week from Monday to
+                Sunday. Defaults to "1111100".
+        **kwargs: ``start`` and ``end`` of the range, see `Calendar`
+
+    Returns:
+        Calendar: the registered calendar
+    """
+    if "+" in name:
+        raise ValueError("calendar names cannot contain '+'")
+    calendar = holidays if isinstance(holidays, Calendar) else Calendar(holidays, weekmask, **kwargs)
+    with _lock:
+        for key in [key for key in _calendars if name.upper() in key.split("+")]:
+            del _calendars[key]
+        _calendars[name.upper()] = calendar
+    return calendar
+
+
+def get_calendar(name: str) -> Calendar:
+    """Return a registered calendar, or the joint calendar of names joined by "+"
+
+    Args:
+        name (str): name of the calendar, such as "WEEKENDS" (no holidays) or "NYC+LON"
+
+    Returns:
+        Calendar: the shared calendar
+    """
+    key = name.upper()
+    with _lock:
+        calendar = _calendars.get(key)
+    if calendar is not None:
+        return calendar
+    parts = key.split("+")
+    if len(parts) > 1:
+        calendar = get_calendar(parts[0])
+        for part in parts[1:]:
+            calendar = calendar.union(get_calendar(part))
+    elif key == "WEEKENDS":
+        calendar = Calendar()
+    else:
+        raise ValueError(f"unknown calendar {name!r}, expected one of {calendar_names()}")
+    with _lock:
+        return _calendars.setdefault(key, calendar)
+
+
+def calendar_names() -> List[str]:
+    """Return the names of the registered calendars"""
+    with _lock:
+        return sorted({"WEEKENDS", *(key for key in _calendars if "+" not in key)})
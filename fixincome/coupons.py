@@ -0,0 +1,246 @@
+"""Coupon schedules of many bonds generated at once and interned.
+
+`coupon_schedules` takes arrays of bond terms (issue and maturity dates, coupon
+frequency, stub rule, ...) and builds the coupon dates of all bonds in a few
+array operations on a (bonds x periods) grid of month offsets. Bonds sharing the
+same terms share the same read-only `CouponSchedule` object: the schedules are
+interned in an LRU cache keyed on the terms, so a portfolio of thousands of
+bonds with a handful of distinct terms generates and stores a handful of
+schedules, and later calls only look them up.
+
+Stub rules, when the period from issue to maturity is not a whole number of
+coupon periods:
+
+    short_front   dates roll back from maturity, the first period is shorter
+    long_front    dates roll back from maturity, the first period is longer
+    short_back    dates roll forward from issue, the last period is shorter
+    long_back     dates roll forward from issue, the last period is longer
+
+The coupon of a stub period is prorated by the fraction of the regular coupon
+period it spans, counted in actual days as in ACT/ACT ICMA.
+"""
+
+from functools import cached_property
+from typing import List, Optional, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .cache import LRUCache
+from .calendars import Calendar, get_calendar
+from .dates import add_months, to_datetime64, ymd
+from .daycount import DEFAULT_CONVENTION
+from .schedule import CashflowSchedule
+
+#: stub rules accepted by `coupon_schedules`
+STUBS = ("short_front", "long_front", "short_back", "long_back")
+
+#: coupon frequencies per year accepted by `coupon_schedules`
+FREQUENCIES = (1, 2, 3, 4, 6, 12)
+
+# bonds generated at once, bounding the (bonds x periods) date grids
+_BLOCK_ROWS = 4096
+
+_TERMS = np.dtype([("issue", np.int64), ("maturity", np.int64), ("frequency", np.int64), ("rate", np.float64),
+                   ("face", np.float64), ("stub", np.int8), ("eom", np.bool_)])
+
+
+class CouponSchedule(CashflowSchedule):
+    """Coupon periods and payments of a fixed-rate bond
+
+    The payment dates and cash flows (coupons, plus the face value on the last payment) are
+    those of a `CashflowSchedule`. The accrual periods are kept unadjusted, the payment dates
+    may be rolled to business days. Schedules are shared between bonds by `coupon_schedules`,
+    so their arrays are read-only.
+
+    Args:
+        accrual_start (ArrayLike): start date of each coupon period
+        accrual_end (ArrayLike): end date of each coupon period
+        fractions (ArrayLike): length of each period in regular coupon periods, 1 except for stubs
+        rate (float): annual coupon rate
+        frequency (int, optional): coupons per year. Defaults to 2.
+        face (float, optional): face value. Defaults to 100.
+        payment_dates (ArrayLike, optional): payment date of each coupon. Defaults to the
+                accrual end dates.
+        convention (str, optional): day-count convention of `year_fractions`. Defaults to "ACT/365".
+    """
+
+    def __init__(self, accrual_start: ArrayLike, accrual_end: ArrayLike, fractions: ArrayLike, rate: float,
+                 frequency: int = 2, face: float = 100, payment_dates: Optional[ArrayLike] = None,
+                 convention: str = DEFAULT_CONVENTION):
+        self.accrual_start = to_datetime64(accrual_start).ravel()
+        self.accrual_end = to_datetime64(accrual_end).ravel()
+        self.fractions = np.asarray(fractions, dtype=float).ravel()
+        if not self.accrual_start.size or not (self.accrual_start.shape == self.accrual_end.shape
+                                               == self.fractions.shape):
+            raise ValueError("a coupon schedule needs the same non-zero number of starts, ends and fractions")
+        self.rate = float(rate)
+        self.frequency = int(frequency)
+        self.face = float(face)
+        self.coupons = self.face*self.rate/self.frequency*self.fractions
+        cashflows = self.coupons.copy()
+        cashflows[-1] += self.face
+        super().__init__(self.accrual_end if payment_dates is None else payment_dates, cashflows, convention)
+        if self.dates.shape != self.coupons.shape:
+            raise ValueError("a coupon schedule needs one payment date per period")
+        for a in (self.accrual_start, self.accrual_end, self.fractions, self.coupons, self.dates, self.cashflows,
+                  self.offsets):
+            a.flags.writeable = False
+
+    def __repr__(self) -> str:
+        return (f"CouponSchedule({len(self)} coupons of {self.rate:g} x {self.frequency}/year "
+                f"from {self.issue} to {self.maturity})")
+
+    @cached_property
+    def _columns(self) -> np.ndarray:
+        # accrual start and end days, fractions, coupons and cash flows side by side, so that the
+        # periods of many schedules are gathered with a single concatenation
+        days = np.column_stack([self.accrual_start, self.accrual_end]).astype(np.int64)
+        columns = np.column_stack([days, self.fractions, self.coupons, self.cashflows])
+        columns.flags.writeable = False
+        return columns
+
+    @property
+    def issue(self) -> np.datetime64:
+        """np.datetime64: start of the first coupon period"""
+        return self.accrual_start[0]
+
+    @property
+    def maturity(self) -> np.datetime64:
+        """np.datetime64: end of the last coupon period"""
+        return self.accrual_end[-1]
+
+
+def _generate(terms: np.ndarray) -> tuple:
+    # Unadjusted coupon periods of unique bond terms, as flat arrays delimited by indptr
+    issue = terms["issue"].astype("datetime64[D]")
+    maturity = terms["maturity"].astype("datetime64[D]")
+    step = 12 // terms["frequency"]
+    back = terms["stub"] >= 2
+    long = (terms["stub"] % 2) == 1
+    rows = np.arange(terms.size)
+
+    y1, m1, _ = ymd(issue)
+    y2, m2, _ = ymd(maturity)
+    span = (y2.astype(np.int64) - y1)*12 + (m2 - m1)
+    k = np.arange(int((span // step).max()) + 3)
+    # Regular dates rolled forward from issue (back stubs) or backward from maturity (front stubs)
+    months = np.where(back, 1, -1)[:, None]*step[:, None]*k
+    grid = add_months(np.where(back, issue, maturity)[:, None], months, terms["eom"][:, None])
+
+    # Front: grid[n] is the last regular date on or before issue, periods end at grid[n-1..0]
+    # Back: grid[n] is the last regular date before maturity, periods end at grid[1..n] and maturity
+    n = np.where(back, ((k >= 1) & (grid < maturity[:, None])).sum(axis=1), (grid > issue[:, None]).sum(axis=1))
+    lo, hi = grid[rows, n], grid[rows, np.where(back, n + 1, n - 1)]
+    stub = np.where(back, hi != maturity, lo != issue)
+    partial = np.where(back, maturity - lo, hi - issue).astype(np.int64)/(hi - lo).astype(np.int64)
+    merge = long & stub & (n >= np.where(back, 1, 2))
+    fraction = np.where(stub, partial, 1.0) + merge
+
+    count = n - merge + back
+    ends = np.where(back[:, None], np.roll(grid, -1, axis=1), grid[:, ::-1])
+    keep = np.where(back[:, None], k < count[:, None], k >= k.size - count[:, None])
+    # the last period of back rows ends at maturity, right after their last kept regular date
+    ends[back, count[back] - 1] = maturity[back]
+    accrual_end = ends[keep]
+    indptr = np.concatenate([[0], np.cumsum(count)])
+    accrual_start = np.empty_like(accrual_end)
+    accrual_start[1:] = accrual_end[:-1]
+    accrual_start[indptr[:-1]] = issue
+    fractions = np.ones(accrual_end.size)
+    fractions[np.where(back, indptr[1:] - 1, indptr[:-1])] = fraction
+    return accrual_start, accrual_end, fractions, indptr
+
+
+def _unique_terms(terms: np.ndarray) -> tuple:
+    # np.unique on the rows, with a lexsort of the columns: sorting records directly is much slower
+    order = np.lexsort([terms[name] for name in reversed(_TERMS.names)])
+    ordered = terms[order]
+    first = np.ones(terms.size, dtype=bool)
+    first[1:] = np.any([ordered[name][1:] != ordered[name][:-1] for name in _TERMS.names], axis=0)
+    inverse = np.empty(terms.size, dtype=np.int64)
+    inverse[order] = np.cumsum(first) - 1
+    return ordered[first], inverse
+
+
+_schedules = LRUCache()
+
+
+def schedule_cache() -> LRUCache:
+    """Return the cache interning the schedules of `coupon_schedules`, see its `info` and `clear`"""
+    return _schedules
+
+
+def coupon_schedules(issue: ArrayLike, maturity: ArrayLike, rate: ArrayLike, frequency: ArrayLike = 2,
+                     face: ArrayLike = 100, stub: Union[str, ArrayLike] = "short_front", eom: ArrayLike = True,
+                     calendar: Union[None, str, Calendar] = None, roll: str = "following",
+                     convention: str = DEFAULT_CONVENTION) -> List[CouponSchedule]:
+    """Generate the coupon schedules of many bonds at once
+
+    The arguments broadcast against each other. Bonds with identical terms get the same
+    `CouponSchedule` object, and schedules generated by earlier calls are reused, see
+    `schedule_cache`.
+
+    Args:
+        issue (ArrayLike): issue (first accrual) dates, in any form accepted by
+                `fixincome.dates.to_datetime64`
+        maturity (ArrayLike): maturity dates, after the issue dates
+        rate (ArrayLike): annual coupon rates
+        frequency (ArrayLike, optional): coupons per year, one of `FREQUENCIES`. Defaults to 2.
+        face (ArrayLike, optional): face values. Defaults to 100.
+        stub (str or ArrayLike, optional): stub rule of each bond, one of `STUBS`.
+                Defaults to "short_front".
+        eom (ArrayLike, optional): whether coupon dates stay on month ends when the date they
+                roll from is a month end. Defaults to True.
+        calendar (str or Calendar, optional): calendar the payment dates are rolled on, or the
+                name of a registered calendar. Defaults to no adjustment.
+        roll (str, optional): business day convention of the payment dates, see
+                `fixincome.calendars.Calendar.roll`. Defaults to "following".
+        convention (str, optional): day-count convention of the schedules. Defaults to "ACT/365".
+
+    Returns:
+        List[CouponSchedule]: the schedule of each bond
+    """
+    if isinstance(calendar, str):
+        calendar = get_calendar(calendar)
+    stub = np.asarray(stub)
+    names, codes = np.unique(stub, return_inverse=True)
+    unknown = set(names.tolist()) - set(STUBS)
+    if unknown:
+        raise ValueError(f"unknown stub rules {sorted(unknown)}, expected one of {STUBS}")
+    codes = np.array([STUBS.index(s) for s in names.tolist()], dtype=np.int8)[codes].reshape(stub.shape)
+    columns = np.broadcast_arrays(to_datetime64(issue).astype(np.int64), to_datetime64(maturity).astype(np.int64),
+                                  np.asarray(frequency, dtype=np.int64), np.asarray(rate, dtype=float),
+                                  np.asarray(face, dtype=float), codes, np.asarray(eom, dtype=bool))
+    terms = np.empty(columns[0].size, dtype=_TERMS)
+    for name, column in zip(_TERMS.names, columns):
+        terms[name] = column.ravel()
+    if np.any(terms["maturity"] <= terms["issue"]):
+        raise ValueError("maturity must be after issue")
+    if not np.all(np.isin(terms["frequency"], FREQUENCIES)):
+        raise ValueError(f"frequency must be one of {FREQUENCIES}")
+
+    unique, inverse = _unique_terms(terms)
+    keys = [t + (calendar, roll, convention.upper()) for t in unique.tolist()]
+    schedules = _schedules.get_many(keys)
+    missing = np.array([i for i, s in enumerate(schedules) if s is None], dtype=np.int64)
+    for block in range(0, missing.size, _BLOCK_ROWS):
+        rows = missing[block:block+_BLOCK_ROWS]
+        starts, ends, fractions, indptr = _generate(unique[rows])
+        payments = ends if calendar is None else calendar.roll(ends, roll)
+        for i, t, lo, hi in zip(rows.tolist(), unique[rows].tolist(), indptr[:-1], indptr[1:]):
+            schedules[i] = CouponSchedule(starts[lo:hi], ends[lo:hi], fractions[lo:hi], t[3], t[2], t[4],
+                                          payments[lo:hi], convention)
+        _schedules.put_many([keys[i] for i in rows.tolist()], [schedules[i] for i in rows.tolist()])
+    return [schedules[i] for i in inverse.ravel()]
+
+
+def coupon_schedule(issue: ArrayLike, maturity: ArrayLike, rate: float, frequency: int = 2, face: float = 100,
+                    stub: str = "short_front", eom: bool = True, calendar: Union[None, str, Calendar] = None,
+                    roll: str = "following", convention: str = DEFAULT_CONVENTION) -> CouponSchedule:
+    """Generate the coupon schedule of one bond, see `coupon_schedules`
+
+    Returns:
+        CouponSchedule: the interned schedule of the bond
+    """
+    return coupon_schedules(issue, maturity, rate, frequency, face, stub, eom, calendar, roll, convention)[0]
@@ -0,0 +1,259 @@
+"""Yield curves with precomputed interpolation and memoized discount factors.
+
+A `YieldCurve` is built from zero rates or discount factors at node times. The
+interpolation is reduced once, when the curve is built, to one cubic
+polynomial per segment between two nodes, so a lookup is a `np.searchsorted`
+followed by a Horner evaluation, whatever the method:
+
+    linear          linear zero rates
+    log_linear      linear logarithm of the discount factors, that is piecewise
+                    constant forward rates
+    monotone_cubic  Fritsch-Carlson monotone cubic zero rates, without the
+                    overshoot of a natural spline between nodes
+
+Zero rates are annually compounded, like the rates of `fixincome.utils.xnpv`,
+and stay flat beyond the first and last nodes. Curves never change after they
+are built; the discount factors of small lookups, such as the few tenors a
+pricing loop asks for again and again, are memoized in a per-curve LRU cache.
+"""
+
+from typing import Iterable, Optional, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .cache import CacheInfo, LRUCache
+from .dates import to_datetime64
+from .daycount import DEFAULT_CONVENTION, year_fraction
+from .schedule import CashflowSchedule
+
+#: interpolation methods accepted by `YieldCurve`
+INTERPOLATIONS = ("linear", "log_linear", "monotone_cubic")
+
+#: lookups of at most this many times go through the memo cache
+MEMO_LIMIT = 64
+
+
+def _pchip_slopes(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    # Fritsch-Carlson slopes at the nodes, with the shape-preserving end conditions of scipy's pchip
+    h = np.diff(x)
+    delta = np.diff(y)/h
+    if delta.size == 1:
+        return np.repeat(delta, 2)
+    slopes = np.zeros(x.size)
+    w1, w2 = 2*h[1:] + h[:-1], h[1:] + 2*h[:-1]
+    same = delta[:-1]*delta[1:] > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slopes[1:-1] = np.where(same, (w1 + w2)/(w1/delta[:-1] + w2/delta[1:]), 0.0)
+    for end, (h0, h1, d0, d1) in ((0, (h[0], h[1], delta[0], delta[1])),
+                                  (-1, (h[-1], h[-2], delta[-1], delta[-2]))):
+        m = ((2*h0 + h1)*d0 - h0*d1)/(h0 + h1)
+        if np.sign(m) != np.sign(d0):
+            m = 0.0
+        elif np.sign(d0) != np.sign(d1) and abs(m) > 3*abs(d0):
+            m = 3*d0
+        slopes[end] = m
+    return slopes
+
+
+def _coefficients(x: np.ndarray, y: np.ndarray, cubic: bool) -> np.ndarray:
+    # One row a, b, c, d per segment: y = a + b*dt + c*dt**2 + d*dt**3 with dt = t - x[i]
+    if x.size == 1:
+        return np.array([[y[0], 0.0, 0.0, 0.0]])
+    h = np.diff(x)
+    delta = np.diff(y)/h
+    coef = np.zeros((h.size, 4))
+    coef[:, 0] = y[:-1]
+    if not cubic:
+        coef[:, 1] = delta
+        return coef
+    m = _pchip_slopes(x, y)
+    coef[:, 1] = m[:-1]
+    coef[:, 2] = (3*delta - 2*m[:-1] - m[1:])/h
+    coef[:, 3] = (m[:-1] + m[1:] - 2*delta)/(h*h)
+    return coef
+
+
+class YieldCurve:
+    """Term structure of annually compounded zero rates
+
+    Give either ``zero_rates`` or ``discount_factors`` at the node times.
+
+    Args:
+        times (ArrayLike): increasing node times in years, non-negative
+        zero_rates (ArrayLike, optional): annually compounded zero rate at each node
+        discount_factors (ArrayLike, optional): discount factor at each node, positive
+        interpolation (str, optional): one of `INTERPOLATIONS`. Defaults to "linear".
+        date (ArrayLike, optional): valuation date the times are counted from. Needed to
+                discount dated cash flows from the valuation date; without it, dated cash flows
+                are discounted from their first date, as in `fixincome.utils.xnpv`.
+        convention (str, optional): day-count convention from ``date`` to payment dates.
+                Defaults to "ACT/365".
+        cache_size (int, optional): number of tenors whose discount factors are memoized.
+                Defaults to 4096.
+    """
+
+    def __init__(self, times: ArrayLike, zero_rates: Optional[ArrayLike] = None,
+                 discount_factors: Optional[ArrayLike] = None, interpolation: str = "linear",
+                 date: Optional[ArrayLike] = None, convention: str = DEFAULT_CONVENTION, cache_size: int = 4096):
+        if (zero_rates is None) == (discount_factors is None):
+            raise ValueError("give either zero_rates or discount_factors")
+        if interpolation not in INTERPOLATIONS:
+            raise ValueError(f"unknown interpolation {interpolation!r}, expected one of {INTERPOLATIONS}")
+        x = np.asarray(times, dtype=float).ravel()
+        if x.size == 0 or x[0] < 0 or np.any(np.diff(x) <= 0):
+            raise ValueError("times must be non-negative and strictly increasing")
+        if zero_rates is not None:
+            z = np.broadcast_to(np.asarray(zero_rates, dtype=float).ravel(), x.shape)
+            log_df = -x*np.log1p(z)
+        else:
+            df = np.broadcast_to(np.asarray(discount_factors, dtype=float).ravel(), x.shape)
+            if np.any(df <= 0):
+                raise ValueError("discount factors must be positive")
+            log_df = np.log(df)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                z = np.expm1(-log_df/x)
+            if x[0] == 0:
+                if log_df[0] != 0:
+                    raise ValueError("the discount factor at time 0 must be 1")
+                z[0] = z[1] if x.size > 1 else 0.0
+        self.times = x
+        self.zero_rates = np.array(z)
+        self.discount_factors = np.exp(log_df)
+        self.interpolation = interpolation
+        self.date = None if date is None else to_datetime64(date)[()]
+        self.convention = convention
+        # log-linear curves interpolate -log(df), which is 0 at time 0
+        self._log = interpolation == "log_linear"
+        if self._log:
+            self._x = x if x[0] == 0 else np.concatenate([[0.0], x])
+            self._y = -log_df if x[0] == 0 else np.concatenate([[0.0], -log_df])
+        else:
+            self._x, self._y = x, self.zero_rates
+        self._coef = _coefficients(self._x, self._y, interpolation == "monotone_cubic")
+        self._memo = LRUCache(cache_size)
+        for a in (self.times, self.zero_rates, self.discount_factors, self._x, self._y, self._coef):
+            a.flags.writeable = False
+
+    def __repr__(self) -> str:
+        return (f"YieldCurve({self.times.size} nodes from {self.times[0]:g} to {self.times[-1]:g} years, "
+                f"{self.interpolation})")
+
+    def _interpolate(self, t: np.ndarray) -> np.ndarray:
+        i = np.clip(np.searchsorted(self._x, t, side="right") - 1, 0, self._coef.shape[0] - 1)
+        dt = t - self._x[i]
+        a, b, c, d = self._coef[i].T
+        return a + dt*(b + dt*(c + dt*d))
+
+    def _log_discount(self, t: np.ndarray) -> np.ndarray:
+        # -log of the discount factors, with flat zero rates beyond the nodes
+        inside = np.clip(t, self._x[0], self._x[-1])
+        y = self._interpolate(inside)
+        if not self._log:
+            return t*np.log1p(y)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rate = np.where(inside > 0, y/inside, self._coef[0, 1])
+        return np.where(t == inside, y, t*rate)
+
+    def discount_factor(self, t: ArrayLike) -> Union[float, np.ndarray]:
+        """Look up the discount factors of times
+
+        Lookups of at most `MEMO_LIMIT` times are memoized, see `cache_info`.
+
+        Args:
+            t (ArrayLike): times in years
+
+        Returns:
+            float or np.ndarray: discount factors with the shape of ``t``
+        """
+        t = np.asarray(t, dtype=float)
+        if t.size > MEMO_LIMIT:
+            return np.exp(-self._log_discount(t))
+        keys = t.ravel().tolist()
+        values = self._memo.get_many(keys)
+        missing = [i for i, v in enumerate(values) if v is None]
+        if missing:
+            new = np.exp(-self._log_discount(np.array([keys[i] for i in missing]))).tolist()
+            self._memo.put_many([keys[i] for i in missing], new)
+            for i, v in zip(missing, new):
+                values[i] = v
+        out = np.array(values).reshape(t.shape)
+        return out[()] if out.ndim == 0 else out
+
+    def discount_factor_at(self, dates: ArrayLike) -> np.ndarray:
+        """Look up the discount factors of dates, counted from the valuation date of the curve
+
+        Args:
+            dates (ArrayLike): dates in any form accepted by `fixincome.dates.to_datetime64`
+
+        Returns:
+            np.ndarray: discount factors with the shape of ``dates``
+        """
+        if self.date is None:
+            raise ValueError("the curve was built without a valuation date")
+        return self.discount_factor(year_fraction(self.date, dates, self.convention))
+
+    def zero_rate(self, t: ArrayLike) -> Union[float, np.ndarray]:
+        """Interpolate the annually compounded zero rates of times
+
+        Args:
+            t (ArrayLike): times in years, positive
+
+        Returns:
+            float or np.ndarray: zero rates with the shape of ``t``
+        """
+        t = np.asarray(t, dtype=float)
+        out = np.expm1(self._log_discount(t)/t)
+        return out[()] if out.ndim == 0 else out
+
+    def forward_rate(self, t1: ArrayLike, t2: ArrayLike) -> Union[float, np.ndarray]:
+        """Calculate the annually compounded forward rates between two times
+
+        Args:
+            t1 (ArrayLike): start times in years
+            t2 (ArrayLike): end times, after ``t1``
+
+        Returns:
+            float or np.ndarray: forward rates
+        """
+        t1, t2 = np.asarray(t1, dtype=float), np.asarray(t2, dtype=float)
+        out = np.expm1((self._log_discount(t2) - self._log_discount(t1))/(t2 - t1))
+        return out[()] if out.ndim == 0 else out
+
+    def cache_info(self) -> CacheInfo:
+        """Return the hit/miss statistics of the memoized discount factors"""
+        return self._memo.info()
+
+    def npv(self, cashflows: Iterable[float], investment: float = 0) -> float:
+        """Calculate the net present value of end-of-year cash flows, see `fixincome.utils.net_present_value`
+
+        Args:
+            cashflows (Iterable[float]): cash flow at the end of years 1, 2, ...
+            investment (float, optional): initial investment. Defaults to 0.
+
+        Returns:
+            float: net present value
+        """
+        if iter(cashflows) is cashflows:
+            cashflows = np.fromiter(cashflows, dtype=float)
+        cashflows = np.asarray(cashflows, dtype=float).ravel()
+        return float(cashflows @ self.discount_factor(np.arange(1.0, cashflows.size + 1))) - investment
+
+    def xnpv(self, dates: Union[ArrayLike, CashflowSchedule], cashflows: Optional[ArrayLike] = None,
+             convention: Optional[str] = None) -> float:
+        """Calculate the net present value of dated cash flows, see `fixincome.utils.xnpv`
+
+        Args:
+            dates (ArrayLike or CashflowSchedule): payment dates, or a parsed schedule, in which
+                    case ``cashflows`` is omitted
+            cashflows (ArrayLike, optional): cash flow for each payment date
+            convention (str, optional): day-count convention of the times from the first date
+                    when the curve has no valuation date. Defaults to that of the schedule.
+
+        Returns:
+            float: net present value at the valuation date, or at the first date of the cash flows
+        """
+        schedule = dates if isinstance(dates, CashflowSchedule) else CashflowSchedule(dates, cashflows)
+        if self.date is not None:
+            return float(schedule.cashflows @ self.discount_factor_at(schedule.dates))
+        return float(schedule.cashflows @ self.discount_factor(schedule.times(convention)))
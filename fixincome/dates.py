@@ -0,0 +1,133 @@
+"""Vectorized date conversion helpers.
+
+Dates are converted to ``datetime64[D]`` arrays in one pass, without calling
+``datetime.strptime`` for every element.
+"""
+
+from typing import Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+
+def to_datetime64(dates: ArrayLike) -> np.ndarray:
+    """Convert dates to a ``datetime64[D]`` array
+
+    Args:
+        dates (ArrayLike): dates as strings in the form of "20060101" or "2006-01-01", integers
+                such as 20060101, ``date``/``datetime`` objects or ``datetime64`` values, in an
+                array of any shape
+
+    Returns:
+        np.ndarray: array of ``datetime64[D]`` with the same shape as the input
+
+    Raises:
+        ValueError: for impossible dates such as "20070230", or strings mixing both forms
+    """
+    arr = np.asarray(dates)
+    if arr.dtype.kind in "US" and arr.size:
+        dashed = np.char.find(arr, "-") >= 0
+        if dashed.all():
+            return arr.astype("datetime64[D]", copy=False)
+        if dashed.any():
+            raise ValueError("dates mix the forms 20060101 and 2006-01-01")
+    if arr.dtype.kind in "MO":
+        return arr.astype("datetime64[D]", copy=False)
+    compact = arr.astype(np.int64)
+    y, m, d = compact // 10000, compact // 100 % 100, compact % 100
+    years = (y - 1970).astype("datetime64[Y]")
+    result = (years.astype("datetime64[M]") + (m - 1)).astype("datetime64[D]") + (d - 1)
+    # months and days out of range roll over into the next month, catch them on the way back
+    y2, m2, d2 = ymd(result)
+    bad = (y2 != y) | (m2 != m) | (d2 != d)
+    if bad.any():
+        raise ValueError(f"invalid dates {arr[bad][:5].tolist()}")
+    return result
+
+
+def day_offsets(dates: ArrayLike) -> np.ndarray:
+    """Calculate the number of days between each date and the first date of its row
+
+    Args:
+        dates (ArrayLike): dates accepted by `to_datetime64`, the last axis holds one schedule
+
+    Returns:
+        np.ndarray: integer day offsets with the same shape as the input
+    """
+    days = to_datetime64(dates).astype(np.int64)
+    return days - days[..., :1]
+
+
+def ymd(dates: ArrayLike) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Split dates into year, month and day
+
+    Uses integer civil calendar arithmetic, which is much faster than casting to
+    ``datetime64[Y]`` and ``datetime64[M]``.
+
+    Args:
+        dates (ArrayLike): dates accepted by `to_datetime64`
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: int32 years, months (1-12) and days (1-31)
+    """
+    z = to_datetime64(dates).astype(np.int32) + 719468
+    era = z // 146097
+    doe = z - era*146097
+    yoe = (doe - doe//1460 + doe//36524 - doe//146096) // 365
+    doy = doe - (365*yoe + yoe//4 - yoe//100)
+    mp = (5*doy + 2) // 153
+    d = doy - (153*mp + 2)//5 + 1
+    m = np.where(mp < 10, mp + 3, mp - 9)
+    return yoe + era*400 + (m <= 2), m, d
+
+
+def from_ymd(y: ArrayLike, m: ArrayLike, d: ArrayLike) -> np.ndarray:
+    """Build dates from year, month and day, the inverse of `ymd`
+
+    Args:
+        y (ArrayLike): years
+        m (ArrayLike): months, 1-12
+        d (ArrayLike): days of the month, broadcast against the years and months
+
+    Returns:
+        np.ndarray: ``datetime64[D]`` dates
+    """
+    y, m, d = (np.asarray(a, dtype=np.int64) for a in (y, m, d))
+    y = y - (m <= 2)
+    era = y // 400
+    yoe = y - era*400
+    doy = (153*np.where(m > 2, m - 3, m + 9) + 2)//5 + d - 1
+    doe = yoe*365 + yoe//4 - yoe//100 + doy
+    return (era*146097 + doe - 719468).astype("datetime64[D]")
+
+
+def is_leap(y: ArrayLike) -> np.ndarray:
+    """Test whether years are leap years in the Gregorian calendar"""
+    y = np.asarray(y)
+    return (y % 4 == 0) & ((y % 100 != 0) | (y % 400 == 0))
+
+
+def days_in_month(y: ArrayLike, m: ArrayLike) -> np.ndarray:
+    """Return the number of days of the months ``m`` (1-12) of the years ``y``"""
+    m = np.asarray(m)
+    return np.where(m == 2, 28 + is_leap(y), 30 + ((m + (m > 7)) % 2))
+
+
+def add_months(dates: ArrayLike, months: ArrayLike, eom: ArrayLike = False) -> np.ndarray:
+    """Move dates by whole months, clipping the day to the end of shorter months
+
+    Args:
+        dates (ArrayLike): dates accepted by `to_datetime64`
+        months (ArrayLike): number of months, negative to move backward, broadcast against ``dates``
+        eom (ArrayLike, optional): whether dates on the last day of their month move to the last
+                day of the target month (end-of-month rule). Defaults to False.
+
+    Returns:
+        np.ndarray: ``datetime64[D]`` moved dates
+    """
+    y, m, d = ymd(dates)
+    total = y.astype(np.int64)*12 + (m - 1) + np.asarray(months, dtype=np.int64)
+    y2, m2 = total // 12, total % 12 + 1
+    month_end = days_in_month(y2, m2)
+    last = np.asarray(eom, dtype=bool) & (d == days_in_month(y, m))
+    return from_ymd(y2, m2, np.where(last, month_end, np.minimum(d, month_end)))
@@ -0,0 +1,138 @@
+"""Vectorized day-count conventions.
+
+A convention turns pairs of dates into year fractions. Every convention works
+on whole ``datetime64[D]`` arrays with NumPy broadcasting, so the year
+fractions of millions of date pairs are computed in a few array operations.
+Conventions are looked up by name in `CONVENTIONS`, and new ones can be added
+with `register_convention`:
+
+    ACT/365   actual days / 365 (ACT/365 Fixed), the default of the package
+    ACT/360   actual days / 360
+    30/360    30/360 US (bond basis), with the end-of-February rules
+    30E/360   30E/360 (Eurobond basis)
+    ACT/ACT   ACT/ACT ISDA, days in leap years / 366 plus days in other years / 365
+    ACT/365L  actual days / 366 when the period contains a 29 February, / 365 otherwise
+"""
+
+from typing import Callable, Dict
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .dates import from_ymd, is_leap, to_datetime64, ymd
+
+DEFAULT_CONVENTION = "ACT/365"
+
+Convention = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+
+def _days(start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    return (end - start).astype(np.int64)
+
+
+def act_365(start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """ACT/365 Fixed year fractions"""
+    return _days(start, end)/365
+
+
+def act_360(start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """ACT/360 year fractions"""
+    return _days(start, end)/360
+
+
+def _thirty_360(y1, m1, d1, y2, m2, d2) -> np.ndarray:
+    return (360*(y2 - y1) + 30*(m2 - m1) + (d2 - d1))/360
+
+
+def thirty_360_us(start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """30/360 US year fractions, the last day of February counting as the 30th"""
+    y1, m1, d1 = ymd(start)
+    y2, m2, d2 = ymd(end)
+    feb_end1 = (m1 == 2) & (d1 == np.where(is_leap(y1), 29, 28))
+    feb_end2 = (m2 == 2) & (d2 == np.where(is_leap(y2), 29, 28))
+    d2 = np.where(feb_end1 & feb_end2, 30, d2)
+    d1 = np.where(feb_end1, 30, d1)
+    d2 = np.where((d2 == 31) & (d1 >= 30), 30, d2)
+    d1 = np.minimum(d1, 30)
+    return _thirty_360(y1, m1, d1, y2, m2, d2)
+
+
+def thirty_e_360(start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """30E/360 (Eurobond basis) year fractions"""
+    y1, m1, d1 = ymd(start)
+    y2, m2, d2 = ymd(end)
+    return _thirty_360(y1, m1, np.minimum(d1, 30), y2, m2, np.minimum(d2, 30))
+
+
+def act_act_isda(start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """ACT/ACT ISDA year fractions"""
+    y1, _, _ = ymd(start)
+    y2, _, _ = ymd(end)
+    len1 = np.where(is_leap(y1), 366, 365)
+    len2 = np.where(is_leap(y2), 366, 365)
+    return (y2 - y1 - 1) + _days(start, from_ymd(y1 + 1, 1, 1))/len1 + _days(from_ymd(y2, 1, 1), end)/len2
+
+
+def _leap_days_through(dates: np.ndarray) -> np.ndarray:
+    # Number of 29 Februaries from year 1 up to and including each date
+    y, m, d = ymd(dates)
+    before = y - 1
+    return before//4 - before//100 + before//400 + (is_leap(y) & ((m > 2) | ((m == 2) & (d == 29))))
+
+
+def act_365l(start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """ACT/365L year fractions, over 366 days when a 29 February falls in (start, end]"""
+    lo, hi = np.minimum(start, end), np.maximum(start, end)
+    leap = _leap_days_through(hi) > _leap_days_through(lo)
+    return _days(start, end)/np.where(leap, 366, 365)
+
+
+#: day-count conventions by name
+CONVENTIONS: Dict[str, Convention] = {
+    "ACT/365": act_365,
+    "ACT/360": act_360,
+    "30/360": thirty_360_us,
+    "30E/360": thirty_e_360,
+    "ACT/ACT": act_act_isda,
+    "ACT/365L": act_365l,
+}
+
+
+def register_convention(name: str, func: Convention) -> None:
+    """Make a day-count convention available by name
+
+    Args:
+        name (str): name of the convention, looked up case-insensitively
+        func (Convention): function of broadcastable ``datetime64[D]`` start and end arrays
+                returning the year fractions
+    """
+    CONVENTIONS[name.upper()] = func
+
+
+def get_convention(name: str) -> Convention:
+    """Return the function of a day-count convention
+
+    Args:
+        name (str): name of the convention, such as "ACT/360", see `CONVENTIONS`
+
+    Returns:
+        Convention: function of the start and end dates returning the year fractions
+    """
+    try:
+        return CONVENTIONS[name.upper()]
+    except KeyError:
+        raise ValueError(f"unknown day-count convention {name!r}, expected one of {sorted(CONVENTIONS)}") from None
+
+
+def year_fraction(start: ArrayLike, end: ArrayLike, convention: str = DEFAULT_CONVENTION) -> np.ndarray:
+    """Calculate the year fractions between dates
+
+    Args:
+        start (ArrayLike): start dates in any form accepted by `fixincome.dates.to_datetime64`
+        end (ArrayLike): end dates, broadcast against ``start``
+        convention (str, optional): day-count convention, see `CONVENTIONS`. Defaults to "ACT/365".
+
+    Returns:
+        np.ndarray: year fraction of each date pair, negative when the end precedes the start
+    """
+    return get_convention(convention)(to_datetime64(start), to_datetime64(end))
@@ -0,0 +1,234 @@
+"""Numba-compiled versions of the single-instrument kernels and root finders.
+
+This module requires Numba and is imported by `fixincome.backend.set_backend`
+when the "numba" backend is selected. The kernels are compiled eagerly for
+float64 arguments and cached on disk (``cache=True``), so only the very first
+import on a machine pays for compilation. Run ``python -m fixincome.jit`` at
+deployment time to populate that cache before production traffic arrives.
+
+The root finders run the Halley iteration of `fixincome.solvers.solve_scalar`
+in compiled code; the rare problems it does not solve are handed over to the
+pure-Python solver and its bracketing fallback.
+"""
+
+import math
+from typing import Sequence, Tuple
+
+import numba
+import numpy as np
+
+from . import solvers
+from .kernels import ANNUITY_SERIES, SERIES_TERMS, SMALL_RATE
+from .solvers import ScalarRoot
+
+#: convergence tolerance and iteration limit of the compiled root finders
+TOL = 1e-12
+MAXITER = 50
+
+_Triple = "UniTuple(float64, 3)"
+_Root = "Tuple((float64, boolean, int64))"
+
+
+@numba.njit(_Triple + "(float64, float64)", cache=True, nogil=True)
+def _annuity_moments(rate, nper):
+    x = math.log1p(rate)
+    if abs(rate) < SMALL_RATE and abs(nper*x) <= 1:
+        # series of fixincome.kernels.annuity_series
+        s = np.zeros(3)
+        xj = 1.0
+        for j in range(SERIES_TERMS + 1):
+            ni = 1.0
+            for i in range(SERIES_TERMS + 4):
+                for k in range(3):
+                    s[k] += ANNUITY_SERIES[k, j, i]*ni*xj
+                ni *= nper
+            xj *= x
+        return s[0], s[1], s[2]
+    v = 1/(1+rate)
+    n = nper
+    vn = v**n
+    w = 1 - v
+    s0 = v*(1-vn)/w
+    s1 = v*(1 - (n+1)*vn + n*vn*v)/w**2
+    s2 = v*(1 + v - (n+1)**2*vn + (2*n*n+2*n-1)*vn*v - n*n*vn*v*v)/w**3 + s1
+    return s0, s1, s2
+
+
+@numba.njit(_Triple + "(float64, float64, float64, float64)", cache=True, nogil=True)
+def _annuity_derivatives(pmt, rate, term, fv):
+    s0, s1, s2 = _annuity_moments(rate, term)
+    v = 1/(1+rate)
+    vn = v**term
+    return pmt*s0 + fv*vn, -v*(pmt*s1 + fv*term*vn), v*v*(pmt*s2 + fv*term*(term+1)*vn)
+
+
+@numba.njit("float64(float64, float64, float64, float64, int64)", cache=True, nogil=True)
+def _present_value(pmt, rate, term, fv, time):
+    x = math.log1p(rate)
+    factor = -math.expm1(-term*x)/rate if rate != 0 else term
+    if time != 0:
+        factor *= 1 + rate
+    return pmt*factor + fv*math.exp(-term*x)
+
+
+@numba.njit("float64(float64, float64[::1], float64)", cache=True, nogil=True)
+def _npv(rate, cashflows, investment):
+    d = 1/(1+rate)
+    q = 0.0
+    for i in range(cashflows.size - 1, -1, -1):
+        q = q*d + cashflows[i]
+    return q*d - investment
+
+
+@numba.njit(_Triple + "(float64, float64[::1], float64)", cache=True, nogil=True)
+def _npv_derivatives(rate, cashflows, investment):
+    d = 1/(1+rate)
+    q = q1 = q2 = 0.0
+    for i in range(cashflows.size - 1, -1, -1):
+        q2 = q2*d + q1
+        q1 = q1*d + q
+        q = q*d + cashflows[i]
+    q2 = q2*d + q1
+    q1 = q1*d + q
+    q = q*d
+    d2 = d*d
+    return q - investment, -q1*d2, 2*d2*d*(q2*d + q1)
+
+
+@numba.njit("float64(float64, float64[::1], float64[::1])", cache=True, nogil=True)
+def _xnpv(rate, times, cashflows):
+    lu = math.log(1+rate)
+    f = 0.0
+    for i in range(times.size):
+        f += cashflows[i]*math.exp(-times[i]*lu)
+    return f
+
+
+@numba.njit(_Triple + "(float64, float64[::1], float64[::1])", cache=True, nogil=True)
+def _xnpv_derivatives(rate, times, cashflows):
+    u = 1 + rate
+    lu = math.log(u)
+    f = f1 = f2 = 0.0
+    for i in range(times.size):
+        t = times[i]
+        w = cashflows[i]*math.exp(-t*lu)
+        f += w
+        f1 += t*w
+        f2 += t*(t+1)*w
+    return f, -f1/u, f2/(u*u)
+
+
+@numba.njit("Tuple((float64, int64))(float64, float64, float64, float64, float64, float64)", cache=True, nogil=True)
+def _halley_step(x, f, f1, f2, max_step, tol):
+    # One safeguarded Halley step of solve_scalar: returns the new point and a status,
+    # 1 when converged, 0 to continue and -1 when the iteration broke down
+    if f == 0:
+        return x, 1
+    if f1 == 0 or not math.isfinite(f1):
+        return x, -1
+    step = f/f1
+    denominator = 2*f1*f1 - f*f2
+    if denominator != 0 and math.isfinite(denominator):
+        step = 2*f*f1/denominator
+    if not math.isfinite(step):
+        return x, -1
+    step = min(max(step, -max_step), max_step)
+    new = x - step
+    if new <= -1.0:
+        new = (x - 1.0)/2
+    if abs(step) <= tol*max(1.0, abs(new)):
+        return new, 1
+    return new, 0
+
+
+@numba.njit(_Root + "(float64[::1], float64, float64, float64, int64)", cache=True, nogil=True)
+def _internal_rate_halley(cashflows, investment, guess, tol, maxiter):
+    x = guess
+    for i in range(1, maxiter + 1):
+        f, f1, f2 = _npv_derivatives(x, cashflows, investment)
+        x, status = _halley_step(x, f, f1, f2, math.inf, tol)
+        if status != 0:
+            return x, status == 1, i
+    return x, False, maxiter
+
+
+@numba.njit(_Root + "(float64, float64, float64, float64, float64, float64, int64)", cache=True, nogil=True)
+def _discount_rate_halley(pv, pmt, nper, fv, guess, tol, maxiter):
+    x = guess
+    for i in range(1, maxiter + 1):
+        f, f1, f2 = _annuity_derivatives(pmt, x, nper, fv)
+        x, status = _halley_step(x, f - pv, f1, f2, 0.5, tol)
+        if status != 0:
+            return x, status == 1, i
+    return x, False, maxiter
+
+
+@numba.njit(_Root + "(float64[::1], float64[::1], float64, float64, int64)", cache=True, nogil=True)
+def _xirr_halley(times, cashflows, guess, tol, maxiter):
+    x = guess
+    for i in range(1, maxiter + 1):
+        f, f1, f2 = _xnpv_derivatives(x, times, cashflows)
+        x, status = _halley_step(x, f, f1, f2, math.inf, tol)
+        if status != 0:
+            return x, status == 1, i
+    return x, False, maxiter
+
+
+def _array(values: Sequence[float]) -> np.ndarray:
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def annuity_derivatives(pmt: float, rate: float, term: float, fv: float = 0) -> Tuple[float, float, float]:
+    """Compiled `fixincome.kernels.annuity_derivatives`"""
+    return _annuity_derivatives(pmt, rate, term, fv)
+
+
+def present_value(pmt: float, rate: float, term: float, fv: float = 0, time: int = 0) -> float:
+    """Compiled `fixincome.kernels.present_value`"""
+    return _present_value(pmt, rate, term, fv, time)
+
+
+def npv(rate: float, cashflows: Sequence[float], investment: float = 0) -> float:
+    """Compiled `fixincome.kernels.npv`"""
+    if not isinstance(cashflows, (list, tuple, np.ndarray)):
+        cashflows = list(cashflows)
+    return _npv(rate, _array(cashflows), investment)
+
+
+def xnpv(rate: float, times: np.ndarray, cashflows: np.ndarray) -> float:
+    """Compiled `fixincome.kernels.xnpv`"""
+    return _xnpv(rate, _array(times), _array(cashflows))
+
+
+def internal_rate_root(cashflows: Sequence[float], investment: float = 0, guess: float = 0.1,
+                       method: str = "halley") -> ScalarRoot:
+    """Compiled `fixincome.solvers.internal_rate_root`"""
+    if method == "halley":
+        root, converged, iterations = _internal_rate_halley(_array(cashflows), investment, guess, TOL, MAXITER)
+        if converged:
+            return ScalarRoot(root, True, iterations)
+    return solvers.internal_rate_root(cashflows, investment, guess, method)
+
+
+def discount_rate_root(pv: float, pmt: float, nper: float, fv: float = 0, guess: float = 0.1,
+                       method: str = "halley") -> ScalarRoot:
+    """Compiled `fixincome.solvers.discount_rate_root`"""
+    if method == "halley":
+        root, converged, iterations = _discount_rate_halley(pv, pmt, nper, fv, guess, TOL, MAXITER)
+        if converged:
+            return ScalarRoot(root, True, iterations)
+    return solvers.discount_rate_root(pv, pmt, nper, fv, guess, method)
+
+
+def xirr_root(times: np.ndarray, cashflows: np.ndarray, guess: float = 0.0, method: str = "halley") -> ScalarRoot:
+    """Compiled `fixincome.solvers.xirr_root`"""
+    if method == "halley":
+        root, converged, iterations = _xirr_halley(_array(times), _array(cashflows), guess, TOL, MAXITER)
+        if converged:
+            return ScalarRoot(root, True, iterations)
+    return solvers.xirr_root(times, cashflows, guess, method)
+
+
+if __name__ == "__main__":
+    # importing the module compiled (or loaded from the cache) every kernel
+    print(f"fixincome kernels compiled with numba {numba.__version__}")
@@ -0,0 +1,215 @@
+"""Scalar kernels behind the single-instrument functions of `fixincome.utils`.
+
+Each kernel returns a value together with its first and second derivatives with
+respect to the rate, so that the in-package root finder can take Halley steps
+without any finite differences. The kernels work on Python floats, which is far
+cheaper than NumPy for a single instrument.
+"""
+
+import math
+from typing import Iterable, Tuple
+
+import numpy as np
+
+#: below this absolute rate the annuity moments are evaluated by `annuity_series`, the closed forms cancel
+SMALL_RATE = 1e-2
+
+#: highest power of log(1+rate) kept by `annuity_series`
+SERIES_TERMS = 16
+
+
+def _faulhaber(terms: int) -> np.ndarray:
+    # Coefficients of P_j(n) = sum(t**j for t in 1..n) as polynomials in n, one row per j = 0..terms+2
+    bernoulli = [1.0]
+    for m in range(1, terms + 3):
+        bernoulli.append(-sum(math.comb(m + 1, k)*bernoulli[k] for k in range(m))/(m + 1))
+    bernoulli[1] = 0.5
+    table = np.zeros((terms + 3, terms + 4))
+    for j in range(terms + 3):
+        for i in range(j + 1):
+            table[j, j + 1 - i] = math.comb(j + 1, i)*bernoulli[i]/(j + 1)
+    return table
+
+
+def _series(terms: int) -> np.ndarray:
+    # With x = log(1+rate), S0 = sum_j (-x)**j/j! P_j(n), S1 = sum_j (-x)**j/j! P_{j+1}(n) and
+    # S2 = sum_j (-x)**j/j! (P_{j+2}(n) + P_{j+1}(n)): coefficient [k, j, i] of x**j n**i in Sk
+    p = _faulhaber(terms)
+    scale = np.array([(-1)**j/math.factorial(j) for j in range(terms + 1)])[:, None]
+    return np.stack([p[:-2], p[1:-1], p[2:] + p[1:-1]])*scale
+
+
+#: coefficients of the annuity moments as polynomials in log(1+rate) and the number of periods
+ANNUITY_SERIES = _series(SERIES_TERMS)
+
+
+def annuity_series(rate: float, nper: float) -> Tuple[float, float, float]:
+    """Calculate the annuity moments of `annuity_moments` from their series in log(1+rate)
+
+    The series holds for any real number of periods, it is accurate to double precision while
+    ``abs(nper*log(1+rate)) <= 1``.
+
+    Args:
+        rate (float): rate of return
+        nper (float): number of periods
+
+    Returns:
+        Tuple[float, float, float]: S0, S1 and S2
+    """
+    x = math.log1p(rate)
+    moments = ANNUITY_SERIES @ (float(nper)**np.arange(SERIES_TERMS + 4)) @ (x**np.arange(SERIES_TERMS + 1))
+    return float(moments[0]), float(moments[1]), float(moments[2])
+
+
+def annuity_moments(rate: float, nper: float) -> Tuple[float, float, float]:
+    """Calculate the discounted time moments of a level annuity
+
+    With v = 1/(1+rate) the moments are S0 = sum(v**t), S1 = sum(t*v**t) and
+    S2 = sum(t*(t+1)*v**t) for t = 1..nper, extended to non-integer ``nper`` by their closed
+    forms. Rates closer to zero than `SMALL_RATE` use `annuity_series`, where the closed forms
+    cancel.
+
+    Args:
+        rate (float): rate of return
+        nper (float): number of periods
+
+    Returns:
+        Tuple[float, float, float]: S0, S1 and S2
+    """
+    if abs(rate) < SMALL_RATE and abs(nper*math.log1p(rate)) <= 1:
+        return annuity_series(rate, nper)
+    v = 1/(1+rate)
+    n = nper
+    vn = v**n
+    w = 1 - v
+    s0 = v*(1-vn)/w
+    s1 = v*(1 - (n+1)*vn + n*vn*v)/w**2
+    s2 = v*(1 + v - (n+1)**2*vn + (2*n*n+2*n-1)*vn*v - n*n*vn*v*v)/w**3 + s1
+    return s0, s1, s2
+
+
+def annuity_derivatives(pmt: float, rate: float, term: float, fv: float = 0) -> Tuple[float, float, float]:
+    """Calculate the present value of a level annuity and its first two derivatives in the rate
+
+    Args:
+        pmt (float): cash flow per period, paid at the end of each period
+        rate (float): discount rate
+        term (float): total period of the cash flows
+        fv (float, optional): final payment
+
+    Returns:
+        Tuple[float, float, float]: present value, first and second derivative
+    """
+    s0, s1, s2 = annuity_moments(rate, term)
+    v = 1/(1+rate)
+    vn = v**term
+    return pmt*s0 + fv*vn, -v*(pmt*s1 + fv*term*vn), v*v*(pmt*s2 + fv*term*(term+1)*vn)
+
+
+def present_value(pmt: float, rate: float, term: float, fv: float = 0, time: int = 0) -> float:
+    """Calculate the present value of a level annuity and a final payment
+
+    Args:
+        pmt (float): cash flow per period
+        rate (float): discount rate
+        term (float): total period of the cash flows
+        fv (float, optional): final payment
+        time (int, optional): 0 for payments at the end of each period, 1 for the beginning
+
+    Returns:
+        float: present value
+    """
+    x = math.log1p(rate)
+    # (1 - (1+rate)**-term)/rate without losing the digits of a small rate in 1+rate
+    factor = -math.expm1(-term*x)/rate if rate != 0 else term
+    if time != 0:
+        factor *= 1 + rate
+    return pmt*factor + fv*math.exp(-term*x)
+
+
+def _reversed(cashflows: Iterable[float]) -> Iterable[float]:
+    # Horner's scheme starts from the last cash flow, materialize one-shot iterators
+    try:
+        return reversed(cashflows)
+    except TypeError:
+        return reversed(list(cashflows))
+
+
+def npv(rate: float, cashflows: Iterable[float], investment: float = 0) -> float:
+    """Calculate the net present value of end-of-period cash flows with Horner's scheme
+
+    The value is the polynomial sum(c_t*d**t) in the discount factor d = 1/(1+rate), evaluated
+    with one multiplication and one addition per cash flow and no power.
+
+    Args:
+        rate (float): discount rate
+        cashflows (Iterable[float]): cash flow of periods 1, 2, ...
+        investment (float, optional): initial investment subtracted from the value
+
+    Returns:
+        float: net present value
+    """
+    d = 1/(1+rate)
+    q = 0.0
+    for c in _reversed(cashflows):
+        q = q*d + c
+    return q*d - investment
+
+
+def npv_derivatives(rate: float, cashflows: Iterable[float], investment: float = 0) -> Tuple[float, float, float]:
+    """Calculate the net present value of end-of-period cash flows and its first two derivatives
+
+    The polynomial Q(d) = sum(c_t*d**t) in the discount factor d = 1/(1+rate) and its first two
+    derivatives are evaluated in a single Horner pass, then converted to derivatives in the
+    rate with dd/dr = -d**2.
+
+    Args:
+        rate (float): discount rate
+        cashflows (Iterable[float]): cash flow of periods 1, 2, ...
+        investment (float, optional): initial investment subtracted from the value
+
+    Returns:
+        Tuple[float, float, float]: net present value, first and second derivative
+    """
+    d = 1/(1+rate)
+    q = q1 = q2 = 0.0
+    for c in _reversed(cashflows):
+        q2 = q2*d + q1
+        q1 = q1*d + q
+        q = q*d + c
+    # last step of the scheme, for the zero constant term of Q
+    q2 = q2*d + q1
+    q1 = q1*d + q
+    q = q*d
+    d2 = d*d
+    return q - investment, -q1*d2, 2*d2*d*(q2*d + q1)
+
+
+def xnpv(rate: float, times: np.ndarray, cashflows: np.ndarray) -> float:
+    """Calculate the net present value of dated cash flows
+
+    Args:
+        rate (float): annual discount rate
+        times (np.ndarray): time of each cash flow in years
+        cashflows (np.ndarray): cash flow amounts
+
+    Returns:
+        float: net present value
+    """
+    return float(cashflows @ (1+rate) ** -times)
+
+
+def xnpv_derivatives(rate: float, times: np.ndarray, cashflows: np.ndarray) -> Tuple[float, float, float]:
+    """Calculate the net present value of dated cash flows and its first two derivatives
+
+    Args:
+        rate (float): annual discount rate
+        times (np.ndarray): time of each cash flow in years
+        cashflows (np.ndarray): cash flow amounts
+
+    Returns:
+        Tuple[float, float, float]: net present value, first and second derivative
+    """
+    u = 1 + rate
+    w = cashflows*np.exp(-times*math.log(u))
+    return float(w.sum()), float(-(times @ w)/u), float((times*(times+1)) @ w/(u*u))
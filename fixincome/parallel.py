@@ -0,0 +1,297 @@
+"""Process-pool valuation of large columnar books.
+
+`ParallelRunner` copies the columns of a book once into
+`multiprocessing.shared_memory` blocks and splits the rows into contiguous
+chunks. Each worker process receives only the names of the blocks and the
+bounds of its chunk, maps the columns without copying them, runs the batch
+function of `fixincome.solvers` or `fixincome.bond` on its rows and writes the
+results straight into shared output columns. No row is ever pickled, so the
+work scales with the number of cores rather than with the cost of
+serialization.
+
+`parallel_npv` splits a single very long cash flow vector instead, and reduces
+the values of its chunks on a thread or process pool.
+"""
+
+import math
+import multiprocessing
+from concurrent.futures import Executor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .bond import BondAnalytics, bond_analytics_array, macaulay_duration_array, modified_duration_array
+from .solvers import RootResult, _xirr_matrices, _xirr_solve, discount_rate_batch
+
+#: chunks per worker process when no chunk size is given, to balance rows that are slower to solve
+CHUNKS_PER_PROCESS = 4
+
+#: periods per chunk of `parallel_npv` when no chunk size is given, fixed so that the result does not
+#: depend on the number of workers
+NPV_CHUNK = 2**16
+
+
+class _Block(NamedTuple):
+    # Picklable description of an array held in a shared memory block
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+def _discount_rate(pv, pmt, nper, fv, guess):
+    return discount_rate_batch(pv, pmt, nper, fv, guess)
+
+
+def _xirr(cashflows, times, guess):
+    return _xirr_solve(cashflows, times, guess)
+
+
+def _bond_analytics(price, coupon, term, face_value, guess):
+    return bond_analytics_array(price, coupon, term, face_value, guess)[1:]
+
+
+def _macaulay_duration(price, ytm, par_value, par_rate, term):
+    return (macaulay_duration_array(price, ytm, par_value, par_rate, term),)
+
+
+def _modified_duration(price, ytm, par_value, par_rate, term):
+    return (modified_duration_array(price, ytm, par_value, par_rate, term),)
+
+
+# chunk functions run by the workers, they return one array per output column
+_KERNELS: Dict[str, Callable[..., Sequence[np.ndarray]]] = {
+    "discount_rate": _discount_rate,
+    "xirr": _xirr,
+    "bond_analytics": _bond_analytics,
+    "macaulay_duration": _macaulay_duration,
+    "modified_duration": _modified_duration,
+}
+
+
+def _view(shm: shared_memory.SharedMemory, block: _Block) -> np.ndarray:
+    return np.ndarray(block.shape, dtype=block.dtype, buffer=shm.buf)
+
+
+def _close(blocks: Sequence[shared_memory.SharedMemory]) -> None:
+    for shm in blocks:
+        try:
+            shm.close()
+        except BufferError:
+            # a traceback still references views of the block, it is unmapped when they are collected
+            pass
+
+
+def _compute(kernel: str, inputs: Dict[str, _Block], outputs: Sequence[_Block],
+             blocks: Sequence[shared_memory.SharedMemory], start: int, stop: int) -> None:
+    columns = {key: _view(shm, block)[start:stop] for (key, block), shm in zip(inputs.items(), blocks)}
+    result = _KERNELS[kernel](**columns)
+    for block, shm, values in zip(outputs, blocks[len(inputs):], result):
+        _view(shm, block)[start:stop] = values
+
+
+def _share(shms: List[shared_memory.SharedMemory], shape: Tuple[int, ...], dtype: np.dtype,
+           values: Optional[np.ndarray] = None) -> _Block:
+    # Allocate a shared memory block, appended to shms, optionally filled with values
+    shms.append(shared_memory.SharedMemory(create=True, size=max(math.prod(shape)*dtype.itemsize, 1)))
+    block = _Block(shms[-1].name, shape, dtype.str)
+    if values is not None:
+        _view(shms[-1], block)[...] = values
+    return block
+
+
+def _run_chunk(task: Tuple[str, Dict[str, _Block], Sequence[_Block], int, int]) -> int:
+    # Worker entry point: map the blocks, value rows start:stop and unmap the blocks
+    kernel, inputs, outputs, start, stop = task
+    blocks = [shared_memory.SharedMemory(name=block.name) for block in (*inputs.values(), *outputs)]
+    try:
+        _compute(kernel, inputs, outputs, blocks, start, stop)
+    finally:
+        _close(blocks)
+    return stop - start
+
+
+class ParallelRunner:
+    """Process pool that values columnar books held in shared memory
+
+    The pool is started on first use and reused by every call until `close`; the
+    runner can also be used as a context manager. Every method takes one array per
+    column, broadcast to the number of instruments, and returns the same result as the
+    corresponding batch function.
+
+    Args:
+        processes (int, optional): number of worker processes. Defaults to the number of CPUs.
+        chunksize (int, optional): rows valued per task. Defaults to splitting the book in
+                `CHUNKS_PER_PROCESS` chunks per process.
+        start_method (str, optional): multiprocessing start method, such as "fork" or "spawn".
+                Defaults to the platform default.
+    """
+
+    def __init__(self, processes: Optional[int] = None, chunksize: Optional[int] = None,
+                 start_method: Optional[str] = None):
+        if chunksize is not None and chunksize <= 0:
+            raise ValueError("chunksize must be positive")
+        self.processes = processes or multiprocessing.cpu_count()
+        self.chunksize = chunksize
+        self._context = multiprocessing.get_context(start_method)
+        self._pool = None
+
+    def __enter__(self) -> "ParallelRunner":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _chunks(self, n: int) -> List[Tuple[int, int]]:
+        size = self.chunksize or max(1, math.ceil(n/(self.processes*CHUNKS_PER_PROCESS)))
+        return [(start, min(start + size, n)) for start in range(0, n, size)]
+
+    def run(self, kernel: str, inputs: Dict[str, np.ndarray], dtypes: Sequence[type]) -> List[np.ndarray]:
+        """Value the rows of a book in the worker processes
+
+        Args:
+            kernel (str): name of the chunk function, such as "discount_rate" or "xirr"
+            inputs (Dict[str, np.ndarray]): keyword arguments of the chunk function, arrays
+                    sharing their first dimension (the instruments)
+            dtypes (Sequence[type]): data type of each output column
+
+        Returns:
+            List[np.ndarray]: one array per output column
+        """
+        n = len(next(iter(inputs.values())))
+        shms: List[shared_memory.SharedMemory] = []
+        try:
+            in_blocks = {key: _share(shms, values.shape, values.dtype, values) for key, values in inputs.items()}
+            out_blocks = [_share(shms, (n,), np.dtype(dtype)) for dtype in dtypes]
+            if self._pool is None:
+                self._pool = self._context.Pool(self.processes)
+            tasks = [(kernel, in_blocks, out_blocks, start, stop) for start, stop in self._chunks(n)]
+            for _ in self._pool.imap_unordered(_run_chunk, tasks):
+                pass
+            return [_view(shm, block).copy() for shm, block in zip(shms[len(in_blocks):], out_blocks)]
+        finally:
+            _close(shms)
+            for shm in shms:
+                shm.unlink()
+
+    @staticmethod
+    def _columns(*columns: ArrayLike) -> List[np.ndarray]:
+        return [np.ascontiguousarray(a, dtype=float).ravel() for a in np.broadcast_arrays(*columns)]
+
+    def discount_rate(self, pv: ArrayLike, pmt: ArrayLike, nper: ArrayLike, fv: ArrayLike = 0,
+                      guess: ArrayLike = 0.1) -> RootResult:
+        """Calculate the discount rates of many annuities, see `fixincome.solvers.discount_rate_batch`
+
+        Args:
+            pv (ArrayLike): present values (prices) of the annuities
+            pmt (ArrayLike): annuity payments each period
+            nper (ArrayLike): numbers of annuity payments
+            fv (ArrayLike, optional): final payments. Defaults to 0.
+            guess (ArrayLike, optional): starting rate(s). Defaults to 0.1.
+
+        Returns:
+            RootResult: discount rates, convergence flags and iteration counts
+        """
+        inputs = dict(zip(("pv", "pmt", "nper", "fv", "guess"), self._columns(pv, pmt, nper, fv, guess)))
+        return RootResult(*self.run("discount_rate", inputs, (float, bool, np.int64)))
+
+    def xirr(self, dates: ArrayLike, cashflows: Optional[ArrayLike] = None, lengths: Optional[ArrayLike] = None,
+             guess: ArrayLike = 0.0, convention: Optional[str] = None) -> RootResult:
+        """Calculate the internal rates of return of many dated cash flow plans, see `fixincome.solvers.xirr_batch`
+
+        The dates are converted to year fractions in the calling process, which is vectorized
+        and cheap; only the solves are spread over the workers.
+
+        Args:
+            dates (ArrayLike): dates of the plans, or a list of `CashflowSchedule` objects
+            cashflows (ArrayLike, optional): cash flows aligned with ``dates``
+            lengths (ArrayLike, optional): number of valid payments in each row
+            guess (ArrayLike, optional): starting rate(s). Defaults to 0.0.
+            convention (str, optional): day-count convention. Defaults to "ACT/365".
+
+        Returns:
+            RootResult: internal rates of return, convergence flags and iteration counts
+        """
+        cf, t = _xirr_matrices(dates, cashflows, lengths, convention)
+        guess = np.broadcast_to(np.asarray(guess, dtype=float), cf.shape[:1])
+        inputs = {"cashflows": cf, "times": np.ascontiguousarray(t, dtype=float), "guess": guess}
+        return RootResult(*self.run("xirr", inputs, (float, bool, np.int64)))
+
+    def bond_analytics(self, price: ArrayLike, coupon: ArrayLike, term: ArrayLike, face_value: ArrayLike = 100,
+                       guess: ArrayLike = 0.1) -> BondAnalytics:
+        """Calculate yields and risk measures of a book of bonds, see `fixincome.bond.bond_analytics_array`
+
+        Args:
+            price (ArrayLike): current prices of the bonds
+            coupon (ArrayLike): coupon paid each period
+            term (ArrayLike): number of periods to maturity
+            face_value (ArrayLike, optional): face values of the bonds. Defaults to 100.
+            guess (ArrayLike, optional): starting yield(s) of the solver. Defaults to 0.1.
+
+        Returns:
+            BondAnalytics: arrays of price, ytm, durations, pvbp and convexity
+        """
+        columns = self._columns(price, coupon, term, face_value, guess)
+        inputs = dict(zip(("price", "coupon", "term", "face_value", "guess"), columns))
+        return BondAnalytics(columns[0], *self.run("bond_analytics", inputs, (float,)*5))
+
+    def macaulay_duration(self, price: ArrayLike, ytm: ArrayLike, par_value: ArrayLike, par_rate: ArrayLike,
+                          term: ArrayLike) -> np.ndarray:
+        """Calculate Macaulay durations, see `fixincome.bond.macaulay_duration_array`"""
+        inputs = dict(zip(("price", "ytm", "par_value", "par_rate", "term"),
+                          self._columns(price, ytm, par_value, par_rate, term)))
+        return self.run("macaulay_duration", inputs, (float,))[0]
+
+    def modified_duration(self, price: ArrayLike, ytm: ArrayLike, par_value: ArrayLike, par_rate: ArrayLike,
+                          term: ArrayLike) -> np.ndarray:
+        """Calculate modified durations, see `fixincome.bond.modified_duration_array`"""
+        inputs = dict(zip(("price", "ytm", "par_value", "par_rate", "term"),
+                          self._columns(price, ytm, par_value, par_rate, term)))
+        return self.run("modified_duration", inputs, (float,))[0]
+
+
+def _chunk_npv(rate: float, chunk: np.ndarray) -> float:
+    # Value of a chunk at the period before its first cash flow
+    return float(chunk @ (1+rate) ** -np.arange(1, chunk.size + 1))
+
+
+def parallel_npv(rate: float, cashflows: ArrayLike, investment: float = 0, chunksize: int = NPV_CHUNK,
+                 workers: Optional[int] = None, executor: Optional[Executor] = None) -> float:
+    """Calculate the net present value of a very long vector of end-of-period cash flows on several cores
+
+    The vector is split in chunks of ``chunksize`` periods, each chunk is valued relative to its
+    own start on the pool, and the partial values are rescaled by the discount factor of their
+    first period and added in order. The chunks only depend on ``chunksize``, so the result is
+    the same whatever the number of workers.
+
+    Args:
+        rate (float): discount rate per period
+        cashflows (ArrayLike): cash flow of periods 1, 2, ...
+        investment (float, optional): initial investment subtracted from the value
+        chunksize (int, optional): periods per chunk. Defaults to `NPV_CHUNK`.
+        workers (int, optional): number of threads when no executor is given. Defaults to the
+                number of CPUs.
+        executor (Executor, optional): pool the chunks are valued on, such as a
+                `concurrent.futures.ProcessPoolExecutor`. Defaults to a thread pool, NumPy
+                releasing the GIL while it discounts a chunk.
+
+    Returns:
+        float: net present value
+    """
+    flat = np.ascontiguousarray(cashflows, dtype=float).ravel()
+    starts = range(0, flat.size, chunksize)
+    chunks = [flat[start:start+chunksize] for start in starts]
+    if executor is None:
+        with ThreadPoolExecutor(workers or multiprocessing.cpu_count()) as pool:
+            partial = list(pool.map(_chunk_npv, [rate]*len(chunks), chunks))
+    else:
+        partial = list(executor.map(_chunk_npv, [rate]*len(chunks), chunks))
+    return math.fsum(p*(1+rate)**-start for p, start in zip(partial, starts)) - investment
@@ -0,0 +1,95 @@
+"""Dated cash flow schedules that are parsed once and valued many times.
+"""
+
+from typing import Dict, Optional, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .dates import to_datetime64
+from .daycount import DEFAULT_CONVENTION, year_fraction
+from .kernels import xnpv
+
+#: upper bound on the number of discount factors materialised at once by a rate grid valuation
+BLOCK_SIZE = 2**20
+
+
+class CashflowSchedule:
+    """A dated cash flow plan stored as compact NumPy arrays
+
+    The dates are parsed once into ``datetime64[D]`` values and int32 day offsets from the
+    first payment date, and the year fractions of each day-count convention are cached on
+    first use, so the same schedule can be revalued at any number of rates without parsing
+    it again.
+
+    Args:
+        dates (ArrayLike): payment dates in any form accepted by `fixincome.dates.to_datetime64`
+        cashflows (ArrayLike): cash flow for each payment date
+        convention (str, optional): day-count convention of `year_fractions`, see
+                `fixincome.daycount.CONVENTIONS`. Defaults to "ACT/365".
+    """
+
+    def __init__(self, dates: ArrayLike, cashflows: ArrayLike, convention: str = DEFAULT_CONVENTION):
+        self.dates = to_datetime64(dates).ravel()
+        self.cashflows = np.asarray(cashflows, dtype=float).ravel()
+        if self.dates.shape != self.cashflows.shape:
+            raise ValueError("dates and cashflows must have the same length")
+        days = self.dates.astype(np.int64)
+        self.offsets = (days - days[:1]).astype(np.int32)
+        self.convention = convention
+        self._times: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self.cashflows.size
+
+    def __repr__(self) -> str:
+        return f"CashflowSchedule({len(self)} payments from {self.dates[0]} to {self.dates[-1]})"
+
+    def times(self, convention: Optional[str] = None) -> np.ndarray:
+        """Return the year fraction of each payment since the first payment, cached per convention
+
+        Args:
+            convention (str, optional): day-count convention. Defaults to the schedule's.
+
+        Returns:
+            np.ndarray: year fraction of each payment
+        """
+        convention = (convention or self.convention).upper()
+        times = self._times.get(convention)
+        if times is None:
+            times = self._times[convention] = year_fraction(self.dates[:1], self.dates, convention)
+        return times
+
+    @property
+    def year_fractions(self) -> np.ndarray:
+        """np.ndarray: year fraction of each payment since the first payment, in the schedule's convention"""
+        return self.times()
+
+    def xnpv(self, rate: Union[float, ArrayLike], chunksize: Optional[int] = None,
+             convention: Optional[str] = None) -> Union[float, np.ndarray]:
+        """Returns the net present value of the schedule at one rate or at a grid of rates
+
+        A grid of rates is valued as a (rates x payments) discount factor matrix multiplied by
+        the cash flow vector, built in blocks of ``chunksize`` rates to bound memory.
+
+        Args:
+            rate (float or ArrayLike): annual discount rate, or an array of rates
+            chunksize (int, optional): number of rates valued per block, by default as many as
+                    fit in `BLOCK_SIZE` discount factors
+            convention (str, optional): day-count convention. Defaults to the schedule's.
+
+        Returns:
+            float or np.ndarray: net present value, with the shape of ``rate`` for an array
+        """
+        times = self.times(convention)
+        if np.ndim(rate) == 0:
+            return xnpv(rate, times, self.cashflows)
+        rates = np.asarray(rate, dtype=float)
+        flat = rates.ravel()
+        if chunksize is None:
+            chunksize = max(1, BLOCK_SIZE // max(1, len(self)))
+        npv = np.empty(flat.shape)
+        for start in range(0, flat.size, chunksize):
+            block = flat[start:start+chunksize]
+            npv[start:start+chunksize] = np.exp(np.outer(-np.log1p(block), times)) @ self.cashflows
+        return npv.reshape(rates.shape)
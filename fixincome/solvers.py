@@ -0,0 +1,646 @@
+"""Vectorized root finders used to solve many rates of return at once.
+
+The batch solvers work on a batch of independent problems. The objective is passed as
+a callable ``func(x, rows, deriv)`` that evaluates the problems listed in
+``rows`` at the points ``x`` and returns a tuple with the value and its first
+``deriv`` derivatives. Rows are solved with a Halley (or Newton) iteration using
+those analytic derivatives; rows that fail to converge fall back to a bracketing
+search followed by bisection. `solve_scalar` applies the same scheme to a single
+problem with plain Python floats; it can also delegate to SciPy, which is then
+imported on first use only.
+"""
+
+import math
+import threading
+from typing import Callable, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .cache import LRUCache
+from .dates import to_datetime64
+from .daycount import DEFAULT_CONVENTION, year_fraction
+from .kernels import annuity_derivatives, npv_derivatives, xnpv_derivatives
+from .schedule import CashflowSchedule
+from .vectorized import npv_derivatives_array, present_value_derivatives_array
+
+Objective = Callable[[np.ndarray, np.ndarray, int], Tuple[np.ndarray, ...]]
+ScalarObjective = Callable[[float], Tuple[float, ...]]
+
+#: candidate rates scanned when looking for a sign change in the fallback path
+RATE_GRID = np.concatenate([[-0.99, -0.95, -0.9, -0.8, -0.7, -0.6, -0.5, -0.4, -0.3, -0.2, -0.15],
+                            np.arange(-0.1, 0.5, 0.025), [0.5, 0.6, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0]])
+
+
+class RootResult(NamedTuple):
+    """Roots of a batch of problems together with per-row diagnostics"""
+    root: np.ndarray
+    converged: np.ndarray
+    iterations: np.ndarray
+
+
+class ScalarRoot(NamedTuple):
+    """Root of a single problem together with its diagnostics"""
+    root: float
+    converged: bool
+    iterations: int
+
+
+def _evaluate(func: ScalarObjective, x: float) -> Tuple[float, ...]:
+    # Objective values with overflow and poles mapped to nan
+    try:
+        return func(x)
+    except (OverflowError, ZeroDivisionError, ValueError):
+        return (math.nan, math.nan, math.nan)
+
+
+def _solve_scipy(func: ScalarObjective, x0: float, tol: float, maxiter: int, deriv: int) -> ScalarRoot:
+    from scipy.optimize import newton
+
+    fprime2 = (lambda x: func(x)[2]) if deriv >= 2 else None
+    root, info = newton(lambda x: func(x)[0], x0, lambda x: func(x)[1], fprime2=fprime2, tol=tol,
+                        maxiter=maxiter, full_output=True, disp=False)
+    return ScalarRoot(float(root), bool(info.converged), int(info.iterations))
+
+
+def solve_scalar(func: ScalarObjective, x0: float, lower: float = -1.0, tol: float = 1e-12, maxiter: int = 50,
+                 deriv: int = 2, grid: Sequence[float] = RATE_GRID, max_step: float = math.inf,
+                 method: str = "halley") -> ScalarRoot:
+    """Solve a single problem with Halley/Newton and bisect it if the iteration fails
+
+    Args:
+        func (ScalarObjective): objective returning the value and its first two derivatives
+        x0 (float): starting point
+        lower (float, optional): exclusive lower bound of the domain. Defaults to -1.0.
+        tol (float, optional): convergence tolerance on the step size. Defaults to 1e-12.
+        maxiter (int, optional): maximum number of Halley/Newton iterations. Defaults to 50.
+        deriv (int, optional): number of derivatives used by the iteration. Defaults to 2.
+        grid (Sequence[float], optional): candidate points scanned by the bracketing fallback
+        max_step (float, optional): steps are clamped to this absolute size. Defaults to no limit.
+        method (str, optional): "halley" for the in-package solver, "scipy" to use
+                `scipy.optimize.newton`, which imports SciPy on first use. Defaults to "halley".
+
+    Returns:
+        ScalarRoot: root (nan if not found), convergence flag and iteration count
+    """
+    if method == "scipy":
+        return _solve_scipy(func, x0, tol, maxiter, deriv)
+    if method != "halley":
+        raise ValueError(f"unknown method {method!r}, expected 'halley' or 'scipy'")
+    x = float(x0)
+    iterations = 0
+    for iterations in range(1, maxiter + 1):
+        values = _evaluate(func, x)
+        f, f1 = values[0], values[1]
+        if f == 0:
+            return ScalarRoot(x, True, iterations)
+        if f1 == 0 or not math.isfinite(f1):
+            break
+        step = f/f1
+        if deriv >= 2:
+            denominator = 2*f1*f1 - f*values[2]
+            if denominator != 0 and math.isfinite(denominator):
+                step = 2*f*f1/denominator
+        if not math.isfinite(step):
+            break
+        step = min(max(step, -max_step), max_step)
+        new = x - step
+        if new <= lower:
+            new = (x + lower)/2
+        if abs(step) <= tol*max(1, abs(new)):
+            return ScalarRoot(new, True, iterations)
+        x = new
+
+    lo = f_lo = hi = None
+    for g in map(float, grid):
+        fg = _evaluate(func, g)[0]
+        if fg == 0:
+            return ScalarRoot(g, True, iterations)
+        if f_lo is not None and math.isfinite(fg) and (fg > 0) != (f_lo > 0):
+            hi = g
+            break
+        lo, f_lo = (g, fg) if math.isfinite(fg) else (None, None)
+    if hi is None:
+        return ScalarRoot(math.nan, False, iterations)
+    for _ in range(200):
+        iterations += 1
+        mid = (lo + hi)/2
+        fm = _evaluate(func, mid)[0]
+        if fm == 0:
+            return ScalarRoot(mid, True, iterations)
+        if (fm > 0) == (f_lo > 0):
+            lo, f_lo = mid, fm
+        else:
+            hi = mid
+        if hi - lo <= tol*max(1, abs(mid)):
+            break
+    return ScalarRoot((lo + hi)/2, True, iterations)
+
+
+def halley(func: Objective, x0: ArrayLike, lower: float = -1.0, tol: float = 1e-12,
+           maxiter: int = 50, deriv: int = 2, max_step: float = np.inf) -> RootResult:
+    """Solve a batch of problems with Halley's (deriv=2) or Newton's (deriv=1) method
+
+    Args:
+        func (Objective): objective returning the value and derivatives for the given rows
+        x0 (ArrayLike): starting points, one per row
+        lower (float, optional): exclusive lower bound of the domain, steps that cross it are
+                halved towards it. Defaults to -1.0.
+        tol (float, optional): convergence tolerance on the step size, relative to max(1, |x|)
+        maxiter (int, optional): maximum number of iterations. Defaults to 50.
+        deriv (int, optional): number of derivatives to use. Defaults to 2.
+        max_step (float, optional): steps are clamped to this absolute size. Defaults to no limit.
+
+    Returns:
+        RootResult: roots, convergence flags and iteration counts
+    """
+    x = np.array(x0, dtype=float, ndmin=1)
+    converged = np.zeros(x.shape, dtype=bool)
+    iterations = np.zeros(x.shape, dtype=np.int64)
+    active = np.arange(x.size)
+    for _ in range(maxiter):
+        if active.size == 0:
+            break
+        xa = x[active]
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            values = func(xa, active, deriv)
+            f, f1 = values[0], values[1]
+            step = f/f1
+            if deriv >= 2:
+                halley_step = 2*f*f1/(2*f1*f1 - f*values[2])
+                step = np.where(np.isfinite(halley_step), halley_step, step)
+            step = np.where(f1 == 0, np.nan, step)
+        iterations[active] += 1
+        ok = np.isfinite(step)
+        step = np.clip(step, -max_step, max_step)
+        new = xa - np.where(ok, step, 0)
+        crossed = new <= lower
+        new[crossed] = (xa[crossed] + lower)/2
+        x[active] = new
+        done = ok & (np.abs(step) <= tol*np.maximum(1, np.abs(new))) | (f == 0)
+        converged[active[done]] = True
+        active = active[ok & ~done]
+    return RootResult(x, converged, iterations)
+
+
+def bisect(func: Objective, rows: ArrayLike, grid: ArrayLike = RATE_GRID, tol: float = 1e-12,
+           maxiter: int = 200) -> RootResult:
+    """Find a sign change on a grid of candidate points for each row and bisect it
+
+    Args:
+        func (Objective): objective returning at least the value for the given rows
+        rows (ArrayLike): rows to solve
+        grid (ArrayLike, optional): increasing candidate points scanned for a sign change
+        tol (float, optional): width of the final bracket, relative to max(1, |x|)
+        maxiter (int, optional): maximum number of bisection steps. Defaults to 200.
+
+    Returns:
+        RootResult: roots (nan when no sign change was found), convergence flags and
+                iteration counts, all aligned with ``rows``
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    lo = np.full(rows.shape, np.nan)
+    hi = np.full(rows.shape, np.nan)
+    f_lo = np.full(rows.shape, np.nan)
+    prev_x, prev_f = None, None
+    for g in np.asarray(grid, dtype=float):
+        xs = np.full(rows.shape, g)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            fg = func(xs, rows, 0)[0]
+        if prev_f is not None:
+            found = np.isnan(lo) & np.isfinite(prev_f) & np.isfinite(fg) & (np.sign(prev_f) != np.sign(fg))
+            lo[found], hi[found], f_lo[found] = prev_x, g, prev_f[found]
+        prev_x, prev_f = g, fg
+
+    iterations = np.zeros(rows.shape, dtype=np.int64)
+    active = np.flatnonzero(~np.isnan(lo))
+    for _ in range(maxiter):
+        if active.size == 0:
+            break
+        mid = (lo[active] + hi[active])/2
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            fm = func(mid, rows[active], 0)[0]
+        iterations[active] += 1
+        left = np.sign(fm) == np.sign(f_lo[active])
+        lo[active] = np.where(left, mid, lo[active])
+        f_lo[active] = np.where(left, fm, f_lo[active])
+        hi[active] = np.where(left, hi[active], mid)
+        width = hi[active] - lo[active]
+        active = active[(width > tol*np.maximum(1, np.abs(mid))) & (fm != 0)]
+
+    root = (lo + hi)/2
+    return RootResult(root, ~np.isnan(root), iterations)
+
+
+def solve(func: Objective, x0: ArrayLike, lower: float = -1.0, tol: float = 1e-12, maxiter: int = 50,
+          deriv: int = 2, grid: ArrayLike = RATE_GRID, max_step: float = np.inf) -> RootResult:
+    """Solve a batch of problems with Halley/Newton and bisect the rows that fail to converge
+
+    Args:
+        func (Objective): objective returning the value and derivatives for the given rows
+        x0 (ArrayLike): starting points, one per row
+        lower (float, optional): exclusive lower bound of the domain. Defaults to -1.0.
+        tol (float, optional): convergence tolerance. Defaults to 1e-12.
+        maxiter (int, optional): maximum number of Halley/Newton iterations. Defaults to 50.
+        deriv (int, optional): number of derivatives used by the iteration. Defaults to 2.
+        grid (ArrayLike, optional): candidate points scanned by the bracketing fallback
+        max_step (float, optional): steps are clamped to this absolute size. Defaults to no limit.
+
+    Returns:
+        RootResult: roots, convergence flags and total iteration counts
+    """
+    res = halley(func, x0, lower, tol, maxiter, deriv, max_step)
+    failed = np.flatnonzero(~res.converged)
+    if failed.size:
+        fallback = bisect(func, failed, grid, tol)
+        res.root[failed] = fallback.root
+        res.converged[failed] = fallback.converged
+        res.iterations[failed] += fallback.iterations
+    return res
+
+
+def discount_rate_batch(pv: ArrayLike, pmt: ArrayLike, nper: ArrayLike, fv: ArrayLike = 0,
+                        guess: ArrayLike = 0.1, tol: float = 1e-12, maxiter: int = 50,
+                        max_step: float = 0.5) -> RootResult:
+    """Calculate the discount rates (yields) of many annuities at once
+
+    Every row is solved with Newton's method on the closed-form annuity present value and its
+    analytic derivative, with steps clamped to ``max_step``; rows that do not converge are
+    bracketed and bisected.
+
+    Args:
+        pv (ArrayLike): present values (prices) of the annuities
+        pmt (ArrayLike): annuity payments each period
+        nper (ArrayLike): numbers of annuity payments
+        fv (ArrayLike, optional): final payments, such as the face value of a bond. Defaults to 0.
+        guess (ArrayLike, optional): starting rate(s), such as the yields solved at the previous
+                tick. Defaults to 0.1.
+        tol (float, optional): convergence tolerance. Defaults to 1e-12.
+        maxiter (int, optional): maximum number of Newton iterations. Defaults to 50.
+        max_step (float, optional): largest rate change per iteration. Defaults to 0.5.
+
+    Returns:
+        RootResult: discount rates, convergence flags and iteration counts
+    """
+    pv, pmt, nper, fv = (np.asarray(a, dtype=float).ravel() for a in np.broadcast_arrays(pv, pmt, nper, fv))
+
+    def func(r, rows, deriv):
+        value, d1, _ = present_value_derivatives_array(pmt[rows], r, nper[rows], fv[rows])
+        return (value - pv[rows], d1)[:deriv+1]
+
+    x0 = np.broadcast_to(np.asarray(guess, dtype=float), pv.shape)
+    return solve(func, x0, tol=tol, maxiter=maxiter, deriv=1, max_step=max_step)
+
+
+def discount_rate_root(pv: float, pmt: float, nper: float, fv: float = 0, guess: float = 0.1,
+                       method: str = "halley") -> ScalarRoot:
+    """Calculate the discount rate (yield) of one annuity with its solver diagnostics
+
+    Args:
+        pv (float): present value (price) of the annuity
+        pmt (float): annuity payment each period
+        nper (float): number of annuity payments
+        fv (float, optional): final payment, such as the face value of a bond. Defaults to 0.
+        guess (float, optional): starting rate. Defaults to 0.1.
+        method (str, optional): root finder, "halley" or "scipy", see `solve_scalar`
+
+    Returns:
+        ScalarRoot: discount rate, convergence flag and iteration count
+    """
+    def func(r):
+        value, d1, d2 = annuity_derivatives(pmt, r, nper, fv)
+        return value - pv, d1, d2
+    return solve_scalar(func, guess, max_step=0.5, method=method)
+
+
+def internal_rate_root(cashflows: Sequence[float], investment: float = 0, guess: float = 0.1,
+                       method: str = "halley") -> ScalarRoot:
+    """Calculate the internal rate of return of one cash flow series with its solver diagnostics
+
+    Args:
+        cashflows (Sequence[float]): cash flow of periods 1, 2, ...
+        investment (float, optional): initial investment. Defaults to 0.
+        guess (float, optional): starting rate. Defaults to 0.1.
+        method (str, optional): root finder, "halley" or "scipy", see `solve_scalar`
+
+    Returns:
+        ScalarRoot: internal rate of return, convergence flag and iteration count
+    """
+    return solve_scalar(lambda r: npv_derivatives(r, cashflows, investment), guess, method=method)
+
+
+def xirr_root(times: np.ndarray, cashflows: np.ndarray, guess: float = 0.0, method: str = "halley") -> ScalarRoot:
+    """Calculate the internal rate of return of one dated cash flow plan with its solver diagnostics
+
+    Args:
+        times (np.ndarray): time of each cash flow in years
+        cashflows (np.ndarray): cash flow amounts
+        guess (float, optional): starting rate. Defaults to 0.0.
+        method (str, optional): root finder, "halley" or "scipy", see `solve_scalar`
+
+    Returns:
+        ScalarRoot: internal rate of return, convergence flag and iteration count
+    """
+    return solve_scalar(lambda r: xnpv_derivatives(r, times, cashflows), guess, method=method)
+
+
+class WarmStartStats(NamedTuple):
+    """Counters of a `WarmStartSolver`"""
+    solves: int
+    iterations: int
+    warm_starts: int
+    cold_starts: int
+
+    @property
+    def mean_iterations(self) -> float:
+        """float: average number of solver iterations per solve"""
+        return self.iterations/self.solves if self.solves else math.nan
+
+
+class WarmStartSolver:
+    """Yield solver that starts each instrument from its last solved yield
+
+    The last converged yield of every instrument key is kept in a bounded LRU cache and used
+    as the starting point of the next solve of that instrument; unknown instruments start from
+    ``default_guess``. The statistics report the average number of iterations per solve, to
+    check that warm starts pay off.
+
+    Args:
+        maxsize (int, optional): maximum number of instruments remembered. Defaults to 100000.
+        default_guess (float, optional): starting yield of unknown instruments. Defaults to 0.1.
+    """
+
+    def __init__(self, maxsize: int = 100000, default_guess: float = 0.1):
+        self.default_guess = default_guess
+        self.yields = LRUCache(maxsize)
+        self._lock = threading.Lock()
+        self._solves = self._iterations = 0
+
+    def _record(self, iterations: int, solves: int) -> None:
+        with self._lock:
+            self._solves += solves
+            self._iterations += iterations
+
+    def discount_rate(self, key: Hashable, pv: float, pmt: float, nper: float, fv: float = 0) -> float:
+        """Solve the yield of one instrument, see `fixincome.utils.discount_rate`
+
+        Args:
+            key (Hashable): identifier of the instrument
+            pv (float): present value (price) of the instrument
+            pmt (float): payment each period
+            nper (float): number of payments
+            fv (float, optional): final payment. Defaults to 0.
+
+        Returns:
+            float: discount rate, nan if the solver did not converge
+        """
+        res = discount_rate_root(pv, pmt, nper, fv, self.yields.get(key, self.default_guess))
+        if res.converged:
+            self.yields.put(key, res.root)
+        self._record(res.iterations, 1)
+        return res.root
+
+    def discount_rate_batch(self, keys: Sequence[Hashable], pv: ArrayLike, pmt: ArrayLike, nper: ArrayLike,
+                            fv: ArrayLike = 0) -> RootResult:
+        """Solve the yields of many instruments at once, see `discount_rate_batch`
+
+        Args:
+            keys (Sequence[Hashable]): identifier of each instrument
+            pv (ArrayLike): present values (prices) of the instruments
+            pmt (ArrayLike): payments each period
+            nper (ArrayLike): numbers of payments
+            fv (ArrayLike, optional): final payments. Defaults to 0.
+
+        Returns:
+            RootResult: discount rates, convergence flags and iteration counts
+        """
+        guess = np.array(self.yields.get_many(keys, self.default_guess), dtype=float)
+        res = discount_rate_batch(pv, pmt, nper, fv, guess)
+        converged = np.flatnonzero(res.converged)
+        self.yields.put_many([keys[i] for i in converged], res.root[converged].tolist())
+        self._record(int(res.iterations.sum()), res.root.size)
+        return res
+
+    def stats(self) -> WarmStartStats:
+        """Return the solve counters and the warm start hit rate"""
+        info = self.yields.info()
+        with self._lock:
+            return WarmStartStats(self._solves, self._iterations, info.hits, info.misses)
+
+    def clear(self) -> None:
+        """Forget every remembered yield and reset the statistics"""
+        self.yields.clear()
+        with self._lock:
+            self._solves = self._iterations = 0
+
+
+def _ragged(values: ArrayLike, lengths: Optional[ArrayLike] = None) -> np.ndarray:
+    # Pad a ragged batch into a 2-D float array, dropping the entries that are masked
+    # or lie beyond each row's length. Zero padding does not change any NPV.
+    if isinstance(values, np.ma.MaskedArray):
+        values = values.filled(0)
+    values = np.array(values, dtype=float, ndmin=2)
+    if lengths is not None:
+        lengths = np.asarray(lengths)
+        values[np.arange(values.shape[1]) >= lengths[:, None]] = 0
+    return values
+
+
+def _lengths_of(rows: ArrayLike) -> Optional[np.ndarray]:
+    # Lengths of a python batch of sequences, or None when it is already rectangular
+    if isinstance(rows, np.ndarray):
+        return None
+    lengths = np.array([len(r) for r in rows])
+    return None if (lengths == lengths.max()).all() else lengths
+
+
+def _pad(rows: ArrayLike, lengths: np.ndarray) -> np.ndarray:
+    # Pad a python batch of unequal sequences by repeating each row's first element
+    width = lengths.max()
+    return np.array([list(r) + [r[0]]*(width - len(r)) for r in rows])
+
+
+def internal_rate_batch(cashflows: ArrayLike, initial_investment: ArrayLike = 0,
+                        lengths: Optional[ArrayLike] = None, guess: ArrayLike = 0.1,
+                        tol: float = 1e-12, maxiter: int = 50) -> RootResult:
+    """Calculate the internal rates of return of many cash flow series at once
+
+    Row ``i`` of ``cashflows`` holds the cash flows received at the end of periods 1, 2, ...
+    of instrument ``i``, exactly as `fixincome.utils.internal_rate` expects them.
+
+    Args:
+        cashflows (ArrayLike): 2-D array (instruments x periods), may be a masked array
+        initial_investment (ArrayLike, optional): initial investment of each instrument
+        lengths (ArrayLike, optional): number of valid periods in each row, for ragged batches
+        guess (ArrayLike, optional): starting rate(s). Defaults to 0.1.
+        tol (float, optional): convergence tolerance. Defaults to 1e-12.
+        maxiter (int, optional): maximum number of Halley iterations. Defaults to 50.
+
+    Returns:
+        RootResult: internal rates of return, convergence flags and iteration counts
+    """
+    cf = _ragged(cashflows, lengths)
+    investment = np.broadcast_to(np.asarray(initial_investment, dtype=float), cf.shape[:1])
+
+    def func(r, rows, deriv):
+        return npv_derivatives_array(r, cf[rows], investment[rows])
+
+    x0 = np.broadcast_to(np.asarray(guess, dtype=float), cf.shape[:1])
+    return solve(func, x0, tol=tol, maxiter=maxiter)
+
+
+def sign_changes(coefficients: ArrayLike) -> np.ndarray:
+    """Count the sign changes of each row of coefficients, ignoring zeros
+
+    By Descartes' rule of signs this bounds the number of positive real roots of the
+    polynomial with these coefficients, and has the same parity.
+
+    Args:
+        coefficients (ArrayLike): 2-D array of polynomial coefficients, one polynomial per row
+
+    Returns:
+        np.ndarray: number of sign changes of each row
+    """
+    signs = np.sign(np.array(coefficients, dtype=float, ndmin=2))
+    last = np.maximum.accumulate(np.where(signs != 0, np.arange(signs.shape[1]), 0), axis=1)
+    filled = np.take_along_axis(signs, last, axis=1)
+    return (filled[:, 1:]*filled[:, :-1] < 0).sum(axis=1)
+
+
+def _polish(rate: float, cashflows: np.ndarray, investment: float, steps: int = 3) -> float:
+    # Refine an eigenvalue root with a few Newton steps on the exact NPV
+    for _ in range(steps):
+        f, f1, _ = npv_derivatives(rate, cashflows, investment)
+        if f1 == 0 or not math.isfinite(f/f1):
+            break
+        rate -= f/f1
+    return rate
+
+
+def internal_rates_batch(cashflows: ArrayLike, initial_investment: ArrayLike = 0,
+                         lengths: Optional[ArrayLike] = None, tol: float = 1e-6) -> List[np.ndarray]:
+    """Calculate every real internal rate of return above -100% of many cash flow series
+
+    The NPV of a row is a polynomial in the discount factor d = 1/(1+r) whose coefficients are
+    the negated initial investment and the cash flows, so each IRR is a positive real root d.
+    Descartes' rule of signs is checked first: rows without a sign change have no IRR and are
+    skipped, rows with exactly one have a unique IRR, solved with `internal_rate_batch`. The
+    other rows are solved as the eigenvalues of their companion matrices, stacked per degree,
+    and the real positive roots are polished with Newton steps. A repeated root comes out of the
+    eigenvalue solver split by about the square root of the machine precision, possibly into a
+    complex pair, hence the loose default ``tol``; the roots of such a cluster are merged into
+    their mean.
+
+    Args:
+        cashflows (ArrayLike): 2-D array (instruments x periods), may be a masked array
+        initial_investment (ArrayLike, optional): initial investment of each instrument
+        lengths (ArrayLike, optional): number of valid periods in each row, for ragged batches
+        tol (float, optional): relative imaginary part below which an eigenvalue counts as real,
+                and relative distance below which two roots are merged. Defaults to 1e-6.
+
+    Returns:
+        List[np.ndarray]: the sorted internal rates of return of each row, possibly empty
+    """
+    cf = _ragged(cashflows, lengths)
+    investment = np.broadcast_to(np.asarray(initial_investment, dtype=float), cf.shape[:1])
+    coefficients = np.column_stack([-investment, cf])
+    changes = sign_changes(coefficients)
+    roots = [np.empty(0) for _ in range(cf.shape[0])]
+
+    single = np.flatnonzero(changes == 1)
+    if single.size:
+        res = internal_rate_batch(cf[single], investment[single])
+        for i, root, ok in zip(single, res.root, res.converged):
+            roots[i] = np.array([root]) if ok else roots[i]
+
+    multiple = np.flatnonzero(changes > 1)
+    nonzero = coefficients[multiple] != 0
+    low = nonzero.argmax(axis=1)
+    high = nonzero.shape[1] - 1 - nonzero[:, ::-1].argmax(axis=1)
+    for lo, hi in set(zip(low.tolist(), high.tolist())):
+        rows = multiple[(low == lo) & (high == hi)]
+        a = coefficients[rows, lo:hi+1]
+        n = hi - lo
+        companion = np.zeros((rows.size, n, n))
+        companion[:, 0, :] = -a[:, -2::-1]/a[:, -1:]
+        companion[:, np.arange(1, n), np.arange(n-1)] = 1
+        for i, eigenvalues in zip(rows, np.linalg.eigvals(companion)):
+            real = eigenvalues[(np.abs(eigenvalues.imag) <= tol*np.maximum(1, np.abs(eigenvalues))) &
+                               (eigenvalues.real > 0)].real
+            found = np.sort([_polish(1/d - 1, cf[i], investment[i]) for d in real])
+            if found.size:
+                first = np.flatnonzero(np.append(True, np.diff(found) > tol*np.maximum(1, np.abs(found[1:]))))
+                found = np.add.reduceat(found, first)/np.diff(np.append(first, found.size))
+            roots[i] = found
+    return roots
+
+
+def _stack_schedules(schedules: Sequence[CashflowSchedule],
+                     convention: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+    # Zero-padded cash flow and year fraction matrices of a batch of schedules
+    width = max(len(s) for s in schedules)
+    cf, t = np.zeros((len(schedules), width)), np.zeros((len(schedules), width))
+    for i, s in enumerate(schedules):
+        cf[i, :len(s)], t[i, :len(s)] = s.cashflows, s.times(convention)
+    return cf, t
+
+
+def xirr_batch(dates: ArrayLike, cashflows: Optional[ArrayLike] = None, lengths: Optional[ArrayLike] = None,
+               guess: ArrayLike = 0.0, tol: float = 1e-12, maxiter: int = 50,
+               convention: Optional[str] = None) -> RootResult:
+    """Calculate the internal rates of return of many dated cash flow plans at once
+
+    The dates are converted to year fractions once, and the NPV and its derivatives are then
+    evaluated analytically for all plans at every iteration, as in `fixincome.utils.xnpv`.
+
+    Args:
+        dates (ArrayLike): 2-D array (plans x payments) of dates accepted by
+                `fixincome.dates.to_datetime64`, a list of per-plan date sequences, or a
+                list of `CashflowSchedule` objects
+        cashflows (ArrayLike, optional): cash flows aligned with ``dates``, omitted when
+                ``dates`` holds schedules
+        lengths (ArrayLike, optional): number of valid payments in each row, for ragged batches;
+                inferred when lists of unequal length are passed
+        guess (ArrayLike, optional): starting rate(s). Defaults to 0.0.
+        tol (float, optional): convergence tolerance. Defaults to 1e-12.
+        maxiter (int, optional): maximum number of Halley iterations. Defaults to 50.
+        convention (str, optional): day-count convention, see `fixincome.daycount.CONVENTIONS`.
+                Defaults to "ACT/365", or to the convention of each schedule.
+
+    Returns:
+        RootResult: internal rates of return, convergence flags and iteration counts
+    """
+    cf, t = _xirr_matrices(dates, cashflows, lengths, convention)
+    return _xirr_solve(cf, t, guess, tol, maxiter)
+
+
+def _xirr_matrices(dates: ArrayLike, cashflows: Optional[ArrayLike] = None, lengths: Optional[ArrayLike] = None,
+                   convention: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+    # Zero-padded cash flow and year fraction matrices of the arguments of xirr_batch
+    if cashflows is None:
+        return _stack_schedules(dates, convention)
+    if lengths is None:
+        lengths = _lengths_of(cashflows)
+        if lengths is not None:
+            dates, cashflows = _pad(dates, lengths), _pad(cashflows, lengths)
+    cf = _ragged(cashflows, lengths)
+    days = np.atleast_2d(to_datetime64(dates))
+    return cf, np.where(cf != 0, year_fraction(days[:, :1], days, convention or DEFAULT_CONVENTION), 0)
+
+
+def _xirr_solve(cf: np.ndarray, t: np.ndarray, guess: ArrayLike = 0.0, tol: float = 1e-12,
+                maxiter: int = 50) -> RootResult:
+    # Solve the XIRR of every row of the cash flow and year fraction matrices
+    def func(r, rows, deriv):
+        u = 1 + r
+        c, tr = cf[rows], t[rows]
+        disc = np.exp(-tr*np.log(u)[:, None])
+        res = ((c*disc).sum(axis=1),)
+        if deriv >= 1:
+            res += (-(c*tr*disc).sum(axis=1)/u,)
+        if deriv >= 2:
+            res += ((c*tr*(tr+1)*disc).sum(axis=1)/(u*u),)
+        return res
+
+    x0 = np.broadcast_to(np.asarray(guess, dtype=float), cf.shape[:1])
+    return solve(func, x0, tol=tol, maxiter=maxiter)
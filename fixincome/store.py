@@ -0,0 +1,223 @@
+"""On-disk cash flow books for portfolios that do not fit in memory.
+
+A book is stored as a directory holding the arrays of a `CashflowBook` as raw
+little-endian binary files, next to a ``book.json`` file recording their
+lengths and data types:
+
+    cashflows.bin   float64, amount of every payment
+    offsets.bin     int32, day of every payment from the first date of its instrument
+    indptr.bin      int64, ``instruments + 1`` positions delimiting the instruments
+    start.bin       datetime64[D], first date of every instrument
+
+`BookWriter` appends books chunk by chunk, so a portfolio can be converted from
+CSV or lists once without ever holding it in memory. `open_book` maps the
+files with `numpy.memmap` into a `CashflowBook` whose pages are only read when
+they are used, and `value_book` values it chunk by chunk, streaming the results
+to an ``.npy`` file.
+"""
+
+import csv
+import json
+import os
+from typing import Any, Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+from .book import CashflowBook
+from .daycount import DEFAULT_CONVENTION
+from .schedule import BLOCK_SIZE
+
+FORMAT = "fixincome.book"
+VERSION = 1
+
+#: file name and data type of each array of a stored book
+ARRAYS = {
+    "cashflows": "<f8",
+    "offsets": "<i4",
+    "indptr": "<i8",
+    "start": "<M8[D]",
+}
+
+PathLike = Union[str, os.PathLike]
+
+
+class BookWriter:
+    """Write a cash flow book to disk one chunk of instruments at a time
+
+    Use it as a context manager, or call `close` once every chunk has been appended; the
+    book can only be opened after that.
+
+    Args:
+        path (PathLike): directory of the book, created if needed. Existing book files in it
+                are overwritten.
+    """
+
+    def __init__(self, path: PathLike):
+        self.path = os.fspath(path)
+        os.makedirs(self.path, exist_ok=True)
+        self._files = {name: open(os.path.join(self.path, name + ".bin"), "wb") for name in ARRAYS}
+        self.instruments = 0
+        self.payments = 0
+        np.zeros(1, dtype=ARRAYS["indptr"]).tofile(self._files["indptr"])
+
+    def __enter__(self) -> "BookWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def append(self, book: CashflowBook) -> None:
+        """Append the instruments of a book after those already written
+
+        Args:
+            book (CashflowBook): next chunk of instruments
+        """
+        start = book.start if book.start is not None else np.full(len(book), np.datetime64("NaT"))
+        columns = {"cashflows": book.cashflows, "offsets": book.offsets,
+                   "indptr": book.indptr[1:] + self.payments, "start": start}
+        for name, values in columns.items():
+            np.asarray(values, dtype=ARRAYS[name]).tofile(self._files[name])
+        self.instruments += len(book)
+        self.payments += book.cashflows.size
+
+    def close(self) -> None:
+        """Flush the arrays and write the ``book.json`` header"""
+        if not self._files:
+            return
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+        header = {"format": FORMAT, "version": VERSION, "instruments": self.instruments,
+                  "payments": self.payments, "dtypes": ARRAYS}
+        with open(os.path.join(self.path, "book.json"), "w") as f:
+            json.dump(header, f)
+
+
+def write_book(path: PathLike, book: CashflowBook) -> None:
+    """Write an in-memory book to disk, see `BookWriter`
+
+    Args:
+        path (PathLike): directory of the book
+        book (CashflowBook): book to write
+    """
+    with BookWriter(path) as writer:
+        writer.append(book)
+
+
+def csv_to_book(csv_path: PathLike, path: PathLike, chunksize: int = 100000, delimiter: str = ",") -> int:
+    """Convert a CSV file of cash flows to an on-disk book
+
+    The file has a header line and one line per payment with three columns: instrument key,
+    payment date in any form accepted by `fixincome.dates.to_datetime64`, and amount. The
+    lines of an instrument must be contiguous; instruments are numbered in order of first
+    appearance.
+
+    Args:
+        csv_path (PathLike): CSV file to read
+        path (PathLike): directory of the book
+        chunksize (int, optional): number of instruments parsed and written at once.
+                Defaults to 100000.
+        delimiter (str, optional): column delimiter. Defaults to ",".
+
+    Returns:
+        int: number of instruments written
+    """
+    with open(csv_path, newline="") as f, BookWriter(path) as writer:
+        reader = csv.reader(f, delimiter=delimiter)
+        next(reader, None)
+        dates, cashflows, current = [], [], None
+        for key, date, amount in reader:
+            if key != current:
+                if len(dates) >= chunksize:
+                    writer.append(CashflowBook.from_lists(dates, cashflows))
+                    dates, cashflows = [], []
+                dates.append([])
+                cashflows.append([])
+                current = key
+            dates[-1].append(date)
+            cashflows[-1].append(float(amount))
+        if dates:
+            writer.append(CashflowBook.from_lists(dates, cashflows))
+        return writer.instruments
+
+
+def open_book(path: PathLike, convention: str = DEFAULT_CONVENTION) -> CashflowBook:
+    """Open an on-disk book without reading it
+
+    The arrays of the returned book are read-only `numpy.memmap` views of the files: indexing
+    ``book[i]`` reads the payments of instrument ``i`` only, and slicing ``book[lo:hi]``
+    gives a smaller memory-mapped book.
+
+    Args:
+        path (PathLike): directory of the book
+        convention (str, optional): day-count convention of the book. Defaults to "ACT/365".
+
+    Returns:
+        CashflowBook: memory-mapped book
+    """
+    path = os.fspath(path)
+    with open(os.path.join(path, "book.json")) as f:
+        header = json.load(f)
+    if header.get("format") != FORMAT or header.get("version") != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} fixincome book")
+    lengths = {"cashflows": header["payments"], "offsets": header["payments"],
+               "indptr": header["instruments"] + 1, "start": header["instruments"]}
+    arrays = {name: np.memmap(os.path.join(path, name + ".bin"), dtype=header["dtypes"][name], mode="r",
+                              shape=(n,)) if n else np.zeros(0, dtype=header["dtypes"][name])
+              for name, n in lengths.items()}
+    return CashflowBook(**arrays, convention=convention)
+
+
+def iter_chunks(book: CashflowBook, max_payments: int = BLOCK_SIZE) -> Iterator[Tuple[int, int, CashflowBook]]:
+    """Split a book into consecutive chunks of instruments with a bounded number of payments
+
+    Args:
+        book (CashflowBook): book to split
+        max_payments (int, optional): payments per chunk, exceeded only by a single instrument
+                with more payments. Defaults to `fixincome.schedule.BLOCK_SIZE`.
+
+    Yields:
+        Tuple[int, int, CashflowBook]: first and past-the-end instrument and the chunk
+    """
+    lo, n = 0, len(book)
+    while lo < n:
+        hi = int(np.searchsorted(book.indptr, book.indptr[lo] + max_payments, side="right")) - 1
+        hi = min(max(hi, lo + 1), n)
+        yield lo, hi, book[lo:hi]
+        lo = hi
+
+
+def value_book(book: CashflowBook, method: str, *args: Any, out: Optional[PathLike] = None,
+               max_payments: int = BLOCK_SIZE) -> np.ndarray:
+    """Value a book chunk by chunk with one of the methods of `CashflowBook`
+
+    Only one chunk of payments and its temporaries are in memory at a time, so a memory-mapped
+    book larger than the memory can be valued. Arguments with one value per instrument, such
+    as per-instrument rates, are sliced along with the chunks.
+
+    Args:
+        book (CashflowBook): book to value, typically opened with `open_book`
+        method (str): "npv", "xnpv", "macaulay_duration", "modified_duration" or "xirr",
+                the latter giving the rates of return, nan where the solver did not converge
+        *args: arguments of the method, such as the rate
+        out (PathLike, optional): ``.npy`` file the results are streamed to. Defaults to an
+                in-memory array.
+        max_payments (int, optional): payments per chunk. Defaults to `fixincome.schedule.BLOCK_SIZE`.
+
+    Returns:
+        np.ndarray: one result per instrument, memory-mapped to ``out`` when given
+    """
+    n = len(book)
+    if out is None:
+        result = np.empty(n)
+    else:
+        result = np.lib.format.open_memmap(os.fspath(out), mode="w+", dtype=np.float64, shape=(n,))
+    for lo, hi, chunk in iter_chunks(book, max_payments):
+        chunk_args = [a[lo:hi] if np.ndim(a) == 1 and len(a) == n else a for a in args]
+        values = getattr(chunk, method)(*chunk_args)
+        if method == "xirr":
+            values = np.where(values.converged, values.root, np.nan)
+        result[lo:hi] = values
+    if out is not None:
+        result.flush()
+    return result
@@ -0,0 +1,198 @@
+"""Valuation of cash flow streams too long to be held in memory.
+
+The functions of this module consume cash flows from any iterable, such as a
+generator fed by a simulation or `read_cashflows` reading a file, in chunks of
+a fixed number of periods. Each chunk is discounted with NumPy at once and
+added to running sums, and the discount factor reached at the end of a chunk is
+carried to the next one, so memory stays bounded by the chunk size whatever the
+length of the stream.
+"""
+
+import itertools
+import math
+import os
+from typing import Callable, Iterable, Iterator, Tuple, Union
+
+import numpy as np
+
+from .dates import to_datetime64
+from .daycount import DEFAULT_CONVENTION, year_fraction
+from .solvers import ScalarRoot, solve_scalar
+
+#: number of periods discounted at once by default
+CHUNKSIZE = 65536
+
+Stream = Union[Iterable[float], Iterable[np.ndarray]]
+
+
+def chunked(cashflows: Stream, chunksize: int = CHUNKSIZE) -> Iterator[np.ndarray]:
+    """Split a stream of cash flows into float64 arrays
+
+    Args:
+        cashflows (Stream): iterable of numbers, a NumPy array, or an iterable of 1-D arrays
+                holding consecutive chunks, which are passed through as they are
+        chunksize (int, optional): number of values per array when the stream holds numbers.
+                Defaults to `CHUNKSIZE`.
+
+    Yields:
+        np.ndarray: consecutive chunks of the stream
+    """
+    if isinstance(cashflows, np.ndarray):
+        flat = cashflows.ravel()
+        for start in range(0, flat.size, chunksize):
+            yield np.asarray(flat[start:start+chunksize], dtype=float)
+        return
+    it = iter(cashflows)
+    first = next(it, None)
+    if first is None:
+        return
+    if isinstance(first, np.ndarray):
+        for chunk in itertools.chain([first], it):
+            yield np.asarray(chunk, dtype=float).ravel()
+        return
+    it = itertools.chain([first], it)
+    while True:
+        chunk = np.fromiter(itertools.islice(it, chunksize), dtype=float)
+        if chunk.size == 0:
+            return
+        yield chunk
+
+
+def read_cashflows(path: Union[str, os.PathLike], chunksize: int = CHUNKSIZE,
+                   binary: bool = False) -> Iterator[np.ndarray]:
+    """Read the cash flows of a file chunk by chunk
+
+    Args:
+        path (str or PathLike): text file with one cash flow per line, or binary file of
+                native float64 values
+        chunksize (int, optional): number of cash flows per chunk. Defaults to `CHUNKSIZE`.
+        binary (bool, optional): whether the file holds raw float64 values. Defaults to False.
+
+    Yields:
+        np.ndarray: consecutive chunks of the cash flows
+    """
+    if binary:
+        with open(path, "rb") as f:
+            while True:
+                chunk = np.fromfile(f, dtype=np.float64, count=chunksize)
+                if chunk.size == 0:
+                    return
+                yield chunk
+    else:
+        with open(path) as f:
+            yield from chunked((float(line) for line in f if line.strip()), chunksize)
+
+
+def stream_npv_derivatives(rate: float, cashflows: Stream, investment: float = 0,
+                           chunksize: int = CHUNKSIZE) -> Tuple[float, float, float]:
+    """Calculate the net present value of a stream of end-of-period cash flows and its first two derivatives
+
+    Args:
+        rate (float): discount rate per period
+        cashflows (Stream): cash flow of periods 1, 2, ..., see `chunked`
+        investment (float, optional): initial investment subtracted from the value
+        chunksize (int, optional): number of periods discounted at once. Defaults to `CHUNKSIZE`.
+
+    Returns:
+        Tuple[float, float, float]: net present value, first and second derivative in the rate
+    """
+    v = 1/(1+rate)
+    carry = 1.0
+    period = 0
+    f = f1 = f2 = 0.0
+    with np.errstate(over="ignore", invalid="ignore", under="ignore"):
+        for chunk in chunked(cashflows, chunksize):
+            steps = np.arange(1, chunk.size + 1)
+            w = chunk*(carry*v**steps)
+            t = period + steps
+            f += float(w.sum())
+            f1 += float(t @ w)
+            f2 += float((t*(t+1)) @ w)
+            carry *= v**chunk.size
+            period += chunk.size
+    return f - investment, -f1*v, f2*v*v
+
+
+def stream_npv(rate: float, cashflows: Stream, investment: float = 0, chunksize: int = CHUNKSIZE) -> float:
+    """Calculate the net present value of a stream of end-of-period cash flows
+
+    Args:
+        rate (float): discount rate per period
+        cashflows (Stream): cash flow of periods 1, 2, ..., see `chunked`
+        investment (float, optional): initial investment subtracted from the value
+        chunksize (int, optional): number of periods discounted at once. Defaults to `CHUNKSIZE`.
+
+    Returns:
+        float: net present value
+    """
+    v = 1/(1+rate)
+    carry = 1.0
+    f = 0.0
+    with np.errstate(over="ignore", invalid="ignore", under="ignore"):
+        for chunk in chunked(cashflows, chunksize):
+            f += float(chunk @ (carry*v**np.arange(1, chunk.size + 1)))
+            carry *= v**chunk.size
+    return f - investment
+
+
+def stream_xnpv(rate: float, dates: Iterable, cashflows: Stream, chunksize: int = CHUNKSIZE,
+                convention: str = DEFAULT_CONVENTION) -> float:
+    """Calculate the net present value of a stream of dated cash flows
+
+    The time of each cash flow is counted in years from the first date of the stream, as in
+    `fixincome.utils.xnpv`.
+
+    Args:
+        rate (float): annual discount rate
+        dates (Iterable): payment dates in any form accepted by `fixincome.dates.to_datetime64`
+        cashflows (Stream): cash flow for each payment date, see `chunked`
+        chunksize (int, optional): number of payments discounted at once. Defaults to `CHUNKSIZE`.
+        convention (str, optional): day-count convention, see `fixincome.daycount.CONVENTIONS`.
+                Defaults to "ACT/365".
+
+    Returns:
+        float: net present value
+    """
+    date_iter = iter(dates)
+    lu = math.log1p(rate)
+    first = None
+    f = 0.0
+    for chunk in chunked(cashflows, chunksize):
+        days = to_datetime64(list(itertools.islice(date_iter, chunk.size)))
+        if days.size != chunk.size:
+            raise ValueError("dates and cashflows must have the same length")
+        if first is None:
+            first = days[0]
+        f += float(chunk @ np.exp(-year_fraction(first, days, convention)*lu))
+    return f
+
+
+def _rewindable(cashflows: Union[Iterable, Callable[[], Iterable]]) -> Callable[[], Iterable]:
+    # Root finders traverse the stream once per iteration, a one-shot iterator cannot be used
+    if callable(cashflows):
+        return cashflows
+    if iter(cashflows) is cashflows:
+        raise TypeError("an iterator can only be traversed once, pass a function returning a new stream")
+    return lambda: cashflows
+
+
+def stream_internal_rate(cashflows: Union[Iterable, Callable[[], Iterable]], investment: float = 0,
+                         guess: float = 0.1, chunksize: int = CHUNKSIZE) -> ScalarRoot:
+    """Calculate the internal rate of return of a stream of end-of-period cash flows
+
+    Every Halley iteration of `fixincome.solvers.solve_scalar` reads the stream once, so it
+    must be re-iterable: a list, an array, a `read_cashflows` call wrapped in a function, or any
+    function returning a fresh stream.
+
+    Args:
+        cashflows (Iterable or Callable[[], Iterable]): re-iterable stream of cash flows of
+                periods 1, 2, ..., or a function returning a new stream on each call
+        investment (float, optional): initial investment. Defaults to 0.
+        guess (float, optional): starting rate. Defaults to 0.1.
+        chunksize (int, optional): number of periods discounted at once. Defaults to `CHUNKSIZE`.
+
+    Returns:
+        ScalarRoot: internal rate of return, convergence flag and iteration count
+    """
+    source = _rewindable(cashflows)
+    return solve_scalar(lambda r: stream_npv_derivatives(r, source(), investment, chunksize), guess)
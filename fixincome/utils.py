@@ -1,16 +1,26 @@
 """This module is a collection of helper functions.
 """
 
-from datetime import datetime
-from typing import List
+import math
+from typing import List, Optional, Union
 
 import numpy as np
-from scipy.optimize import fsolve
+
+from .backend import ops
+from .bond import bond_analytics
+from .cache import factor_cache, memoized
+from .curve import YieldCurve
+from .schedule import CashflowSchedule
+from .solvers import internal_rates_batch
+from .stream import stream_npv
 
 
 def geometric_series_sum(a1: float, q: float, n: float) -> float:
     """Calculate the sum of a geometric sequence
 
+       The sum is evaluated as a1*expm1(n*log1p(q-1))/(q-1), which keeps full precision for
+       ratios close to 1, and equals a1*n at q == 1.
+
     Args:
         a1 (float): first item
         q (float): common ratio
@@ -19,9 +29,19 @@ def geometric_series_sum(a1: float, q: float, n: float) -> float:
     Returns:
         float: sum of geometric numbers
     """
-    return a1*(1-q**n)/(1-q)
+    if q == 1:
+        return a1*n
+    if q <= 0:
+        return a1*(1-q**n)/(1-q)
+    return a1*math.expm1(n*math.log1p(q-1))/(q-1)
+
 
+def _growth_factor(rate: float, nper: float) -> float:
+    # ((1+rate)**nper - 1)/rate without losing the digits of a small rate in 1+rate
+    return math.expm1(nper*math.log1p(rate))/rate if rate != 0 else nper
 
+
+@memoized
 def future_value_factor(rate: float, nper: float, time: int = 0) -> float:
     """Calculate the annuity future value factor
 
@@ -34,10 +54,11 @@ def future_value_factor(rate: float, nper: float, time: int = 0) -> float:
     Returns:
         float: annuity future value factor
     """
-    res = geometric_series_sum(1, 1+rate, nper)
+    res = _growth_factor(rate, nper)
     return res if time == 0 else res*(1+rate)
 
 
+@memoized
 def present_value_factor(rate: float, nper: float, time: int = 0) -> float:
     """Calculate the annuity present value factor
 
@@ -50,10 +71,24 @@ def present_value_factor(rate: float, nper: float, time: int = 0) -> float:
     Returns:
         float: annuity present value factor
     """
-    res = geometric_series_sum(1/(1+rate), 1/(1+rate), nper)
+    res = -_growth_factor(rate, -nper)
     return res if time == 0 else res*(1+rate)
 
 
+@memoized
+def discount_factor(rate: float, nper: float) -> float:
+    """Calculate the discount factor of a single payment
+
+    Args:
+        rate (float): discount rate per period
+        nper (float): number of periods until the payment
+
+    Returns:
+        float: present value of one unit paid after nper periods
+    """
+    return 1/pow(1+rate, nper)
+
+
 def present_value(pmt: float, rate: float, term: int, fv: float = 0, time: int = 0) -> float:
     """Calculate the present value of a series of cash flows
 
@@ -68,37 +103,67 @@ def present_value(pmt: float, rate: float, term: int, fv: float = 0, time: int =
     Returns:
         float: present value of cash flow
     """
-    pv = pmt*present_value_factor(rate, term, time) + fv/pow(1+rate, term)
-    return pv
+    if factor_cache() is not None:
+        # the memoized factors, so that repeated pricing hits the enabled factor cache
+        return pmt*present_value_factor(rate, term, time) + fv*discount_factor(rate, term)
+    return ops.present_value(pmt, rate, term, fv, time)
 
 
-def net_present_value(rate: float, cashflows: List[float], investment: float = 0) -> float:
+def net_present_value(rate: Union[float, YieldCurve], cashflows: List[float], investment: float = 0,
+                      workers: Optional[int] = None) -> float:
     """Calculates the net present value of a series of cash flows, 
         with the initial investment expressed as a negative number
 
     Args:
-        rate (float): Discount rate
-        cashflow (List[float]):  Cash flow per period
+        rate (float or YieldCurve): Discount rate, or a curve discounting period k at k years,
+                see `fixincome.curve.YieldCurve.npv`
+        cashflow (List[float]):  Cash flow per period, an iterator is valued as a stream,
+                see `fixincome.stream.stream_npv`
+        investment (float, optional): initial investment
+        workers (int, optional): value the cash flows in chunks on this many threads, for very
+                long vectors, see `fixincome.parallel.parallel_npv`. Defaults to a single thread.
 
     Returns:
         float: net present value
     """
-    return sum(c/pow(1+rate, t+1) for t, c in enumerate(cashflows)) - investment
+    if isinstance(rate, YieldCurve):
+        return rate.npv(cashflows, investment)
+    if workers is not None:
+        # imported on demand, the pools and shared memory of fixincome.parallel are slow to import
+        from .parallel import parallel_npv
+        return parallel_npv(rate, cashflows, investment, workers=workers)
+    if iter(cashflows) is cashflows:
+        return stream_npv(rate, cashflows, investment)
+    return ops.npv(rate, cashflows, investment)
+
+
+def internal_rate(cashflows: List[float], initial_investment: float, guess: float = 0.1,
+                  method: str = "halley") -> float:
+    """Calculate the internal rate of return on cash flow
 
+    Args:
+        cashflows (List[float]): a series of cash flows
+        initial_investment (float): initial investment
+        guess (float, optional): starting rate of the solver. Defaults to 0.1.
+        method (str, optional): root finder, "halley" or "scipy", see `fixincome.solvers.solve_scalar`
+
+    Returns:
+        float: Internal Rate of Return, nan if the solver did not converge
+    """
+    return ops.internal_rate_root(cashflows, initial_investment, guess, method).root
 
-def internal_rate(cashflows: List[float], initial_investment: float, guess: float = 0.1) -> float:
-    """Calculate the internal rate of return on cash flow
+
+def internal_rates(cashflows: List[float], initial_investment: float) -> List[float]:
+    """Calculate every internal rate of return above -100% of cash flows with several sign changes
 
     Args:
         cashflows (List[float]): a series of cash flows
         initial_investment (float): initial investment
 
     Returns:
-        float: Internal Rate of Return
+        List[float]: all internal rates of return in increasing order, empty if there is none
     """
-    def func(r): return sum(c/pow(1+r, 1+t)
-                            for t, c in enumerate(cashflows)) - initial_investment
-    return fsolve(func, guess)[0]
+    return internal_rates_batch([cashflows], initial_investment)[0].tolist()
 
 
 def future_value(rate: float, term: int, pmt: float, pv: float = 0.0, time: int = 0) -> float:
@@ -116,7 +181,7 @@ def future_value(rate: float, term: int, pmt: float, pv: float = 0.0, time: int
     Returns:
         float: future value of investment
     """
-    fv = pmt*future_value_factor(rate, term, time) + pv*pow(1+rate, term)
+    fv = pmt*future_value_factor(rate, term, time) + pv/discount_factor(rate, term)
     return fv
 
 
@@ -135,20 +200,22 @@ def effective_annual_rate(rate: float, t: float = 1, time_unit: str = "d") -> fl
     return pow(1+rate, tu[time_unit]/t) - 1
 
 
-def discount_rate(pv: float, pmt: float, nper: int, fv: float = 0, guess: float = 0.1) -> float:
+def discount_rate(pv: float, pmt: float, nper: int, fv: float = 0, guess: float = 0.1,
+                  method: str = "halley") -> float:
     """Calculate the discount rate for an annuity
 
     Args:
         pv (float): present value of the annuity
         pmt (float): Annuity Payments Each Period
         nper (int): Number of annuity payments
+        fv (float, optional): final payment of the annuity. Defaults to 0.
         guess (float, optional): the given interest rate guess. Defaults to 0.1.
+        method (str, optional): root finder, "halley" or "scipy", see `fixincome.solvers.solve_scalar`
 
     Returns:
-        float: discount rate
+        float: discount rate, nan if the solver did not converge
     """
-    def func(r): return present_value(pmt, r, nper, fv) - pv
-    return fsolve(func, guess)[0]
+    return ops.discount_rate_root(pv, pmt, nper, fv, guess, method).root
 
 
 def holding_period_yield(p1: float, p0: float, d: float = 0) -> float:
@@ -182,36 +249,54 @@ def hpy_to_ear(p1: float, p0: float, t: float, d: float = 0, time_unit: str = "d
     return effective_annual_rate(hpy, t, time_unit)
 
 
-def xnpv(rate: float, dates: List[str], cashflows: List[float]) -> float:
+def xnpv(rate: Union[float, np.ndarray, YieldCurve], dates: Union[List[str], CashflowSchedule],
+         cashflows: Optional[List[float]] = None, chunksize: Optional[int] = None,
+         convention: Optional[str] = None) -> Union[float, np.ndarray]:
     """Returns the net present value for the cash flow plan
 
     Args:
-        rate(float): annual discount rate
-        dates (List[str]): The payment date of each cash flow, input as a string in the form of "20060101"
-        cashflows (List[float]): Cash flow for each payment date
+        rate(float, np.ndarray or YieldCurve): annual discount rate, an array of scenario rates,
+                or a curve, see `fixincome.curve.YieldCurve.xnpv`
+        dates (List[str] or CashflowSchedule): The payment date of each cash flow, input as a string
+                in the form of "20060101" (or any form accepted by `CashflowSchedule`), or a
+                parsed schedule, in which case ``cashflows`` is omitted
+        cashflows (List[float], optional): Cash flow for each payment date
+        chunksize (int, optional): number of scenario rates valued per block,
+                see `CashflowSchedule.xnpv`
+        convention (str, optional): day-count convention of the times of the cash flows, see
+                `fixincome.daycount.CONVENTIONS`. Defaults to "ACT/365", or to the convention
+                of the schedule.
 
     Returns:
-        float: net present value
+        float or np.ndarray: net present value, one per rate when an array of rates is given
     """
-    dates = [datetime.strptime(d, "%Y%m%d") for d in dates]
-    delta = [(d - dates[0]).days for d in dates[1:]]
-    r = pow(1+rate, 1/365) - 1
-    npv = sum(c/pow(1+r, d)
-              for c, d in zip(cashflows[1:], delta)) + cashflows[0]
-    return npv
+    schedule = dates if isinstance(dates, CashflowSchedule) else CashflowSchedule(dates, cashflows)
+    if isinstance(rate, YieldCurve):
+        return rate.xnpv(schedule, convention=convention)
+    if np.ndim(rate) == 0:
+        return ops.xnpv(rate, schedule.times(convention), schedule.cashflows)
+    return schedule.xnpv(rate, chunksize, convention)
 
 
-def xirr(dates: List[str], cashflows: List[float]) -> float:
+def xirr(dates: Union[List[str], CashflowSchedule], cashflows: Optional[List[float]] = None,
+         method: str = "halley", convention: Optional[str] = None) -> float:
     """Returns the internal rate of return for the cash flow plan
 
     Args:
-        dates (List[str]): The payment date of each cash flow, input as a string in the form of "20060101"
-        cashflows (List[float]): Cash flow for each payment date
+        dates (List[str] or CashflowSchedule): The payment date of each cash flow, input as a string
+                in the form of "20060101" (or any form accepted by `CashflowSchedule`), or a
+                parsed schedule, in which case ``cashflows`` is omitted
+        cashflows (List[float], optional): Cash flow for each payment date
+        method (str, optional): root finder, "halley" or "scipy", see `fixincome.solvers.solve_scalar`
+        convention (str, optional): day-count convention of the times of the cash flows, see
+                `fixincome.daycount.CONVENTIONS`. Defaults to "ACT/365", or to the convention
+                of the schedule.
 
     Returns:
-        float: internal rate of return
+        float: internal rate of return, nan if the solver did not converge
     """
-    return fsolve(lambda r: xnpv(r, dates, cashflows), 0)[0]
+    schedule = dates if isinstance(dates, CashflowSchedule) else CashflowSchedule(dates, cashflows)
+    return ops.xirr_root(schedule.times(convention), schedule.cashflows, 0.0, method).root
 
 
 def macaulay_duration(price: float, ytm: float, par_value: float, par_rate: float, term: int) -> float:
@@ -232,8 +317,8 @@ def macaulay_duration(price: float, ytm: float, par_value: float, par_rate: floa
     Returns:
         float: Macaulay duration
     """
-    pmts = [par_value*par_rate] * (term - 1) + [par_value*par_rate + par_value]
-    return sum((t+1) * pmt/pow(1+ytm, t+1) for t, pmt in enumerate(pmts))/price
+    _, d1, _ = ops.annuity_derivatives(par_value*par_rate, ytm, term, par_value)
+    return -d1*(1+ytm)/price
 
 
 def modified_duration(price: float, ytm: float, par_value: float, par_rate: float, term: int) -> float:
@@ -268,10 +353,7 @@ def pvbp(price: float, coupon: float, term: int) -> float:
     Returns:
         float: price value of basis point(pvbp)
     """
-    ytm = discount_rate(price, coupon, term, 100)
-    v_plus = present_value(coupon, ytm-0.0001, term, 100)
-    v_minus = present_value(coupon, ytm+0.0001, term, 100)
-    return (v_plus-v_minus)/2
+    return bond_analytics(price, coupon, term, 100).pvbp
 
 
 def convexity(price: float, coupon: float, term: int, face_value: float, delta: float = 0.0001) -> float:
@@ -282,12 +364,10 @@ def convexity(price: float, coupon: float, term: int, face_value: float, delta:
         coupon (float): bond coupons
         term (int): the maturity of the bond
         face_value (float): face value of the bond
-        delta (float, optional): change in yield to maturity. Defaults to 0.0001.
+        delta (float, optional): change in yield to maturity. Defaults to 0.0001. Kept for
+                backward compatibility, the convexity is now computed analytically.
 
     Returns:
         float: he convexity of a bond
     """
-    ytm = discount_rate(price, coupon, term, face_value)
-    v_plus = present_value(coupon, ytm-delta, term, face_value)
-    v_minus = present_value(coupon, ytm+delta, term, face_value)
-    return (v_minus+v_plus-2*price)/(delta*delta*price)
+    return bond_analytics(price, coupon, term, face_value).convexity
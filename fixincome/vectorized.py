@@ -0,0 +1,208 @@
+"""Array-aware versions of the time value of money helpers.
+
+Every function in this module accepts scalars or NumPy arrays for its numeric
+arguments, broadcasts them against each other and returns an ndarray, so that
+a whole batch of instruments can be valued in one pass instead of one Python
+call per row. The formulas mirror the scalar functions in `fixincome.utils`.
+"""
+
+from typing import Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .kernels import ANNUITY_SERIES, SERIES_TERMS, SMALL_RATE
+
+
+def geometric_series_sum_array(a1: ArrayLike, q: ArrayLike, n: ArrayLike) -> np.ndarray:
+    """Calculate the sum of geometric sequences element-wise
+
+    The sums are evaluated as a1*expm1(n*log1p(q-1))/(q-1), which keeps full precision for
+    ratios close to 1, and equal a1*n where q == 1.
+
+    Args:
+        a1 (ArrayLike): first items
+        q (ArrayLike): common ratios
+        n (ArrayLike): numbers of items
+
+    Returns:
+        np.ndarray: sums of geometric numbers
+    """
+    a1, q, n = np.asarray(a1, dtype=float), np.asarray(q, dtype=float), np.asarray(n, dtype=float)
+    d = q - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        res = np.where(q > 0, np.expm1(n*np.log1p(d))/d, (1-q**n)/(1-q))
+    return a1*np.where(d == 0, n, res)
+
+
+def _growth_factor(rate: np.ndarray, nper: ArrayLike) -> np.ndarray:
+    # ((1+rate)**nper - 1)/rate without losing the digits of a small rate in 1+rate
+    nper = np.asarray(nper, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        res = np.expm1(nper*np.log1p(rate))/rate
+    return np.where(rate == 0, nper, res)
+
+
+def _apply_time(res: np.ndarray, rate: np.ndarray, time: ArrayLike) -> np.ndarray:
+    # payments at the beginning of the period are compounded one more period
+    return np.where(np.asarray(time) == 0, res, res*(1+rate))
+
+
+def future_value_factor_array(rate: ArrayLike, nper: ArrayLike, time: ArrayLike = 0) -> np.ndarray:
+    """Calculate annuity future value factors element-wise
+
+    Args:
+        rate (ArrayLike): rates of return
+        nper (ArrayLike): total annuity investment periods
+        time (ArrayLike, optional): 0 for payments at the end of the period, 1 for payments at
+                the beginning of the period, the default is 0
+
+    Returns:
+        np.ndarray: annuity future value factors
+    """
+    rate = np.asarray(rate, dtype=float)
+    res = _growth_factor(rate, nper)
+    return _apply_time(res, rate, time)
+
+
+def present_value_factor_array(rate: ArrayLike, nper: ArrayLike, time: ArrayLike = 0) -> np.ndarray:
+    """Calculate annuity present value factors element-wise
+
+    Args:
+        rate (ArrayLike): rates of return
+        nper (ArrayLike): total annuity investment periods
+        time (ArrayLike, optional): 0 for payments at the end of the period, 1 for payments at
+                the beginning of the period, the default is 0
+
+    Returns:
+        np.ndarray: annuity present value factors
+    """
+    rate = np.asarray(rate, dtype=float)
+    res = -_growth_factor(rate, -np.asarray(nper, dtype=float))
+    return _apply_time(res, rate, time)
+
+
+def present_value_array(pmt: ArrayLike, rate: ArrayLike, term: ArrayLike, fv: ArrayLike = 0,
+                        time: ArrayLike = 0) -> np.ndarray:
+    """Calculate the present values of many series of cash flows
+
+    Args:
+        pmt (ArrayLike): cash flow per period
+        rate (ArrayLike): discount rates
+        term (ArrayLike): total periods of the cash flows
+        fv (ArrayLike, optional): future values of the cash flows
+        time (ArrayLike, optional): 0 for payments at the end of the period, 1 for payments at
+                the beginning of the period, the default is 0
+
+    Returns:
+        np.ndarray: present values of the cash flows
+    """
+    rate, term = np.asarray(rate, dtype=float), np.asarray(term, dtype=float)
+    return np.asarray(pmt)*present_value_factor_array(rate, term, time) + np.asarray(fv)/(1+rate)**term
+
+
+def future_value_array(rate: ArrayLike, term: ArrayLike, pmt: ArrayLike, pv: ArrayLike = 0.0,
+                       time: ArrayLike = 0) -> np.ndarray:
+    """Calculate the future values of many series of investments
+
+    Args:
+        rate (ArrayLike): returns on investment
+        term (ArrayLike): investment periods
+        pmt (ArrayLike): amounts of investment in each period
+        pv (ArrayLike, optional): initial investment amounts. Defaults to 0.0.
+        time (ArrayLike, optional): 0 for payments at the end of the period, 1 for payments at
+                the beginning of the period, the default is 0
+
+    Returns:
+        np.ndarray: future values of the investments
+    """
+    rate, term = np.asarray(rate, dtype=float), np.asarray(term, dtype=float)
+    return np.asarray(pmt)*future_value_factor_array(rate, term, time) + np.asarray(pv)*(1+rate)**term
+
+
+def annuity_moments_array(rate: ArrayLike, nper: ArrayLike) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Calculate the discounted time moments of level annuities element-wise
+
+    With v = 1/(1+rate) the moments are S0 = sum(v**t), S1 = sum(t*v**t) and
+    S2 = sum(t*(t+1)*v**t) for t = 1..nper. They are evaluated in closed form, and from the
+    series of `fixincome.kernels.annuity_series` for rates closer to zero than `SMALL_RATE`
+    where the closed forms cancel.
+
+    Args:
+        rate (ArrayLike): rates of return
+        nper (ArrayLike): numbers of periods
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: S0, S1 and S2
+    """
+    rate, n = np.broadcast_arrays(np.asarray(rate, dtype=float), np.asarray(nper, dtype=float))
+    v = 1/(1+rate)
+    vn = v**n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w = 1 - v
+        s0 = v*(1-vn)/w
+        s1 = v*(1 - (n+1)*vn + n*vn*v)/w**2
+        s2 = v*(1 + v - (n+1)**2*vn + (2*n*n+2*n-1)*vn*v - n*n*vn*v*v)/w**3 + s1
+    x = np.log1p(rate)
+    small = (np.abs(rate) < SMALL_RATE) & (np.abs(n*x) <= 1)
+    if small.any():
+        npow = n[small][:, None]**np.arange(SERIES_TERMS + 4)
+        xpow = x[small][:, None]**np.arange(SERIES_TERMS + 1)
+        s0, s1, s2 = np.array(s0), np.array(s1), np.array(s2)
+        s0[small], s1[small], s2[small] = np.einsum("kji,mi,mj->km", ANNUITY_SERIES, npow, xpow)
+    return s0, s1, s2
+
+
+def present_value_derivatives_array(pmt: ArrayLike, rate: ArrayLike, term: ArrayLike,
+                                    fv: ArrayLike = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Calculate present values of level annuities and their first two derivatives in the rate
+
+    Args:
+        pmt (ArrayLike): cash flow per period, paid at the end of each period
+        rate (ArrayLike): discount rates
+        term (ArrayLike): total periods of the cash flows, integers
+        fv (ArrayLike, optional): future values of the cash flows
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: present values, first and second derivatives
+    """
+    rate, term = np.asarray(rate, dtype=float), np.asarray(term, dtype=float)
+    pmt, fv = np.asarray(pmt, dtype=float), np.asarray(fv, dtype=float)
+    s0, s1, s2 = annuity_moments_array(rate, term)
+    v = 1/(1+rate)
+    vn = v**term
+    pv = pmt*s0 + fv*vn
+    d1 = -v*(pmt*s1 + fv*term*vn)
+    d2 = v*v*(pmt*s2 + fv*term*(term+1)*vn)
+    return pv, d1, d2
+
+
+def npv_derivatives_array(rate: ArrayLike, cashflows: ArrayLike,
+                          investment: ArrayLike = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Calculate net present values of many cash flow series and their first two rate derivatives
+
+    Row ``i`` of ``cashflows`` holds the cash flows of periods 1, 2, ... of instrument ``i``. The
+    polynomials in the discount factors d = 1/(1+rate) are evaluated with Horner's scheme, one
+    period at a time for all instruments at once, so no power is computed.
+
+    Args:
+        rate (ArrayLike): discount rate of each instrument
+        cashflows (ArrayLike): 2-D array (instruments x periods) of cash flows
+        investment (ArrayLike, optional): initial investments subtracted from the values
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: net present values, first and second derivatives
+    """
+    cashflows = np.asarray(cashflows, dtype=float)
+    d = 1/(1+np.asarray(rate, dtype=float))
+    q = np.zeros(cashflows.shape[:1])
+    q1, q2 = q.copy(), q.copy()
+    for c in cashflows.T[::-1]:
+        q2 = q2*d + q1
+        q1 = q1*d + q
+        q = q*d + c
+    # last step of the scheme, for the zero constant term
+    q2 = q2*d + q1
+    q1 = q1*d + q
+    d2 = d*d
+    return q*d - investment, -q1*d2, 2*d2*d*(q2*d + q1)
@@ -0,0 +1,50 @@
+import numpy as np
+
+from fixincome import accrued as ac
+from fixincome import utils as ut
+from fixincome.coupons import coupon_schedule, coupon_schedules
+
+
+def almost_equal(result, expect, precision: float = 1e-8) -> bool:
+    return np.all(np.abs(np.asarray(result)-expect) <= precision)
+
+
+def test_accrued_interest():
+    s = coupon_schedule('2020-01-15', '2030-01-15', 0.05, 2)
+    settle = ['2020-01-15', '2020-04-15', '2020-07-15', '2020-07-31', '2030-01-15', '2019-12-31']
+    result = ac.accrued_interest(settle, s)
+    assert almost_equal(result[:4], [0, 2.5*91/182, 0, 2.5*16/184])
+    assert np.isnan(result[4:]).all()
+    assert almost_equal(ac.accrued_interest('2020-07-31', s, "30/360"), 5*16/360)
+    assert almost_equal(ac.dirty_price(99, '2020-04-15', s), 99 + 2.5*91/182)
+    assert almost_equal(ac.clean_price(101, '2020-04-15', s), 101 - 2.5*91/182)
+
+
+def test_price_from_yield():
+    s = coupon_schedule('2020-01-15', '2025-01-15', 0.05, 2)
+    assert almost_equal(ac.price_from_yield(0.06, '2020-01-15', s), ut.present_value(2.5, 0.03, 10, 100))
+    # between coupon dates the payments are discounted over fractional periods
+    w = 91/182
+    expect = sum(2.5/1.03**(w + j) for j in range(10)) + 100/1.03**(w + 9)
+    assert almost_equal(ac.price_from_yield(0.06, '2020-04-15', s, clean=False), expect)
+    assert almost_equal(ac.price_from_yield(0.06, '2020-04-15', s), expect - 2.5*(1 - w))
+
+
+def test_yield_from_price():
+    rng = np.random.default_rng(7)
+    n = 500
+    schedules = coupon_schedules('2018-02-28', np.datetime64('2028-02-28') + rng.integers(0, 2000, n),
+                                 rng.choice([0.01, 0.03, 0.07], n), rng.choice([1, 2, 4, 12], n),
+                                 stub=rng.choice(["short_front", "long_front", "short_back", "long_back"], n))
+    settle = np.datetime64('2023-01-01') + rng.integers(0, 365, n)
+    ytm = rng.uniform(-0.01, 0.12, n)
+    clean = ac.price_from_yield(ytm, settle, schedules)
+    result = ac.yield_from_price(clean, settle, schedules)
+    assert result.converged.all()
+    assert almost_equal(result.root, ytm, 1e-10)
+    dirty = ac.dirty_price(clean, settle, schedules)
+    assert almost_equal(ac.yield_from_price(dirty, settle, schedules, clean=False).root, ytm, 1e-10)
+    s = schedules[0]
+    out = ac.yield_from_price([95, 95], ['2017-01-01', '2020-01-01'], s)
+    assert np.isnan(out.root[0]) and not out.converged[0] and out.converged[1]
+    assert almost_equal(ac.price_from_yield(out.root[1], '2020-01-01', s), 95)
@@ -0,0 +1,61 @@
+import pytest
+
+from fixincome import backend as be
+from fixincome import utils as ut
+
+
+def almost_equal(result, expect, precision: float = 1e-10) -> bool:
+    return abs(result-expect) <= precision
+
+
+def _values():
+    return [ut.internal_rate([100, 200, 300, 400, 500], 1000), ut.discount_rate(700, 100, 10),
+            ut.xirr(['20060101', '20060303', '20060704', '20061012', '20061225'], [-1000, 150, 100, 50, 1000]),
+            ut.xnpv(0.12, ['20060101', '20070303', '20070704'], [-1000, 100, 195]),
+            ut.net_present_value(0.1, [100, 200, 300, 400, 500]), ut.macaulay_duration(1000, 0.05, 1000, 0.05, 4),
+            ut.present_value(100, 0.13, 10, 1000), ut.present_value(100, 0.13, 10.5, 1000, time=1),
+            ut.convexity(1000, 50, 4, 1000)]
+
+
+@pytest.fixture
+def restore_backend():
+    previous = be.get_backend()
+    yield
+    be.set_backend(previous or "auto")
+
+
+def test_set_backend(restore_backend):
+    assert be.set_backend("python") == "python"
+    assert be.get_backend() == "python"
+    assert "python" in be.available_backends()
+    with pytest.raises(ValueError):
+        be.set_backend("fortran")
+
+
+def test_numba_backend(restore_backend):
+    pytest.importorskip("numba")
+    be.set_backend("python")
+    expect = _values()
+    be.set_backend("numba")
+    assert all(almost_equal(a, b) for a, b in zip(_values(), expect))
+    assert almost_equal(ut.internal_rate([100, 200, 300, 400, 500], 1000, guess=-0.9999), expect[0])
+
+
+def test_numba_annuity_kernels_fractional_nper():
+    pytest.importorskip("numba")
+    from fixincome import jit, kernels
+    for rate in (0.0, 1e-7, 0.0004, -0.003, 0.009, 0.011, 0.05):
+        for term in (0.5, 7.25, 12.5, 360.5):
+            expect = kernels.annuity_derivatives(5, rate, term, 100)
+            result = jit.annuity_derivatives(5, rate, term, 100)
+            assert all(abs(a - b) <= 1e-9*max(1, abs(b)) for a, b in zip(result, expect))
+
+
+def test_numba_present_value():
+    pytest.importorskip("numba")
+    from fixincome import jit, kernels
+    for rate in (0.0, 1e-9, -0.003, 0.05, 0.13):
+        for term in (0.5, 10, 360.5):
+            for time in (0, 1):
+                expect = kernels.present_value(5, rate, term, 100, time)
+                assert almost_equal(jit.present_value(5, rate, term, 100, time), expect, 1e-9*max(1, abs(expect)))
@@ -0,0 +1,40 @@
+import numpy as np
+
+from fixincome import bond as bd
+from fixincome import utils as ut
+
+
+def almost_equal(result, expect, precision: float = 1e-4) -> bool:
+    return np.all(np.abs(np.asarray(result)-expect) <= precision)
+
+
+def test_bond_analytics():
+    res = bd.bond_analytics(1000, 50, 4, 1000)
+    assert all(type(value) is float for value in res)
+    assert almost_equal(res.ytm, 0.05, 1e-10)
+    assert almost_equal(res.macaulay_duration, 3.7232480293704775)
+    assert almost_equal(res.modified_duration, 3.7232480293/1.05)
+    assert almost_equal(res.convexity, 16.473834)
+    assert almost_equal(bd.bond_analytics(101.39, 6, 20).pvbp, 0.1169594)
+
+
+def test_bond_analytics_array():
+    price, coupon, term = np.array([1000, 950, 100]), np.array([50, 50, 0]), np.array([4, 10, 3])
+    face = np.array([1000, 1000, 100])
+    res = bd.bond_analytics_array(price, coupon, term, face)
+    for i in range(2):
+        assert almost_equal(res.ytm[i], ut.discount_rate(price[i], coupon[i], term[i], face[i]), 1e-8)
+        assert almost_equal(res.macaulay_duration[i],
+                            ut.macaulay_duration(price[i], res.ytm[i], face[i], coupon[i]/face[i], term[i]), 1e-8)
+    assert almost_equal(res.convexity[2], 12, 1e-8)
+
+
+def test_macaulay_duration_array():
+    price, ytm, rate, term = [1000, 980, 1010], [0.05, 0.004, 0.07], [0.05, 0.03, 0.0], [4, 30, 7]
+    expect = [ut.macaulay_duration(*args) for args in zip(price, ytm, [1000]*3, rate, term)]
+    assert almost_equal(bd.macaulay_duration_array(price, ytm, 1000, rate, term), expect, 1e-10)
+    assert almost_equal(bd.macaulay_duration_array(price, ytm, 1000, rate, term)[2], 7*1000/1.07**7/1010, 1e-10)
+
+
+def test_modified_duration_array():
+    assert almost_equal(bd.modified_duration_array([1000], [0.05], [1000], [0.05], [4]), 3.7232480293/1.05)
@@ -0,0 +1,38 @@
+import numpy as np
+
+from fixincome import utils as ut
+from fixincome.book import CashflowBook
+from fixincome.schedule import CashflowSchedule
+
+
+def almost_equal(result, expect, precision: float = 1e-10) -> bool:
+    return np.all(np.abs(np.asarray(result)-expect) <= precision)
+
+
+DATES = [['20060101', '20060303', '20060704', '20061012', '20061225'], [], ['20060101', '20070303', '20070704']]
+CASHFLOWS = [[-1000, 150, 100, 50, 1000], [], [-1000, 100, 1195]]
+
+
+def test_cashflow_book():
+    book = CashflowBook.from_lists(DATES, CASHFLOWS)
+    assert len(book) == 3 and book.lengths.tolist() == [5, 0, 3]
+    assert book.offsets.dtype == np.int32 and book.indptr.tolist() == [0, 5, 5, 8]
+    assert book[2].offsets.tolist() == CashflowSchedule(DATES[2], CASHFLOWS[2]).offsets.tolist()
+    assert book.periods.tolist() == [1, 2, 3, 4, 5, 1, 2, 3]
+    same = CashflowBook.from_schedules([CashflowSchedule(d, c) for d, c in zip(DATES, CASHFLOWS) if d])
+    assert same.indptr.tolist() == [0, 5, 8]
+
+
+def test_cashflow_book_valuation():
+    book = CashflowBook.from_lists(DATES, CASHFLOWS)
+    rates = np.array([0.12, 0.05, 0.08])
+    for i in (0, 2):
+        assert almost_equal(book.xnpv(rates)[i], ut.xnpv(rates[i], DATES[i], CASHFLOWS[i]))
+        assert almost_equal(book.npv(0.1, 100)[i], ut.net_present_value(0.1, CASHFLOWS[i], 100))
+        assert almost_equal(book.xirr().root[i], ut.xirr(DATES[i], CASHFLOWS[i]))
+    assert book.xnpv(0.1)[1] == 0 and np.isnan(book.macaulay_duration(0.1)[1])
+    result = book.xirr()
+    assert np.isnan(result.root[1]) and not result.converged[1] and result.converged[[0, 2]].all()
+    bond = CashflowBook.from_lists([['20210101', '20220101', '20230101', '20240101']], [[0, 50, 50, 1050]])
+    assert almost_equal(bond.macaulay_duration(0.05), ut.macaulay_duration(1000, 0.05, 1000, 0.05, 3))
+    assert almost_equal(bond.modified_duration(0.05), ut.modified_duration(1000, 0.05, 1000, 0.05, 3))
@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from fixincome import cache as ch
+from fixincome import utils as ut
+
+
+def test_lru_cache():
+    cache = ch.LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.info() == ch.CacheInfo(1, 1, 2, 2)
+    cache.clear()
+    assert cache.info() == ch.CacheInfo(0, 0, 2, 0)
+
+
+def test_factor_cache():
+    cache = ch.enable_factor_cache(maxsize=16, decimals=10)
+    try:
+        first = ut.present_value_factor(0.3, 10)
+        assert ut.present_value_factor(0.1 + 0.2, 10) == first
+        assert ut.present_value(100, 0.13, 10, 1000) == ut.present_value(100, 0.13, 10, 1000)
+        info = cache.info()
+        assert info.hits == 3 and info.misses == 3
+        assert ch.factor_cache() is cache
+    finally:
+        ch.disable_factor_cache()
+    assert ch.factor_cache() is None
+
+
+def test_factor_cache_threads():
+    cache = ch.enable_factor_cache(maxsize=8)
+    try:
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(lambda i: ut.future_value_factor(0.01*(i % 20 + 1), 12), range(400)))
+        assert results[:20] == results[20:40]
+        info = cache.info()
+        assert info.hits + info.misses == 400 and info.currsize == 8
+    finally:
+        ch.disable_factor_cache()
+
+
+def test_lru_cache_bulk():
+    cache = ch.LRUCache(3)
+    cache.put_many(["a", "b", "c", "d"], [1, 2, 3, 4])
+    assert cache.get_many(["a", "d", "b"], 0) == [0, 4, 2]
+    assert cache.info() == ch.CacheInfo(2, 1, 3, 3)
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from fixincome.calendars import Calendar, get_calendar, read_holidays, register_calendar
+
+HOLIDAYS = ['2023-01-02', '2023-04-07', '2023-04-10', '2023-05-01', '2023-06-30', '2023-12-25', '2023-12-26']
+
+
+def test_calendar_matches_numpy():
+    calendar = Calendar(HOLIDAYS)
+    reference = np.busdaycalendar(holidays=HOLIDAYS)
+    days = np.arange(np.datetime64('2022-12-20'), np.datetime64('2024-01-10'))
+    assert (calendar.is_business_day(days) == np.is_busday(days, busdaycal=reference)).all()
+    for roll in ("following", "preceding", "modifiedfollowing", "modifiedpreceding"):
+        expect = np.busday_offset(days, 0, roll=roll, busdaycal=reference)
+        assert (calendar.roll(days, roll.replace("modified", "modified_")) == expect).all()
+    n = np.arange(days.size) % 11 - 5
+    assert (calendar.add_business_days(days, n) == np.busday_offset(days, n, roll="following",
+                                                                   busdaycal=reference)).all()
+    assert (calendar.business_days_between(days[0], days) == np.busday_count(days[0], days, busdaycal=reference)).all()
+    with pytest.raises(ValueError):
+        calendar.roll(days, "nearest")
+
+
+def test_calendar_registry(tmp_path):
+    (tmp_path / "xyz.txt").write_text("# holidays\n2023-06-30\n\n2023-07-03  # bridge\n")
+    register_calendar("xyz", read_holidays(tmp_path / "xyz.txt"))
+    register_calendar("abc", ['2023-07-04'], weekmask="1111110")
+    joint = get_calendar("XYZ+abc")
+    assert joint is get_calendar("xyz+ABC")
+    assert joint.roll('2023-06-30').item() == np.datetime64('2023-07-05').item()
+    assert get_calendar("weekends").roll('2023-07-01').item() == np.datetime64('2023-07-03').item()
+    assert get_calendar("abc").is_business_day('2023-07-01')
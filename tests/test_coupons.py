@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from fixincome.calendars import Calendar
+from fixincome.coupons import CouponSchedule, coupon_schedule, coupon_schedules, schedule_cache
+from fixincome.dates import add_months
+
+
+def almost_equal(a, b, decimals=10):
+    return np.allclose(a, b, rtol=0, atol=10**-decimals)
+
+
+@pytest.mark.parametrize("stub, ends, fractions", [
+    ("short_front", ['2020-05-31', '2020-11-30', '2021-05-31', '2021-11-30', '2022-05-31'], [137/183, 1, 1, 1, 1]),
+    ("long_front", ['2020-11-30', '2021-05-31', '2021-11-30', '2022-05-31'], [1 + 137/183, 1, 1, 1]),
+    ("short_back", ['2020-07-15', '2021-01-15', '2021-07-15', '2022-01-15', '2022-05-31'], [1, 1, 1, 1, 136/181]),
+    ("long_back", ['2020-07-15', '2021-01-15', '2021-07-15', '2022-05-31'], [1, 1, 1, 1 + 136/181]),
+])
+def test_coupon_schedule_stubs(stub, ends, fractions):
+    s = coupon_schedule('2020-01-15', '2022-05-31', 0.05, 2, stub=stub)
+    assert s.accrual_end.astype(str).tolist() == ends
+    assert s.accrual_start.astype(str).tolist() == ['2020-01-15'] + ends[:-1]
+    assert almost_equal(s.fractions, fractions)
+    assert almost_equal(s.cashflows, 2.5*np.array(fractions) + np.eye(len(ends))[-1]*100)
+
+
+def test_coupon_schedules_match_loop():
+    rng = np.random.default_rng(3)
+    issue = np.datetime64('2015-01-01') + rng.integers(0, 3000, 300)
+    maturity = issue + rng.integers(20, 365*12, 300)
+    frequency = rng.choice([1, 2, 4, 12], 300)
+    stub = rng.choice(["short_front", "short_back"], 300)
+    for s, i, m, f, rule in zip(coupon_schedules(issue, maturity, 0.04, frequency, stub=stub, eom=False),
+                                issue, maturity, frequency, stub):
+        step = 12//f
+        if rule == "short_front":
+            k = np.arange(0, -1000, -1)
+            grid = add_months(m, k*step)
+            expect = grid[grid > i][::-1]
+        else:
+            grid = add_months(i, np.arange(1, 1000)*step)
+            expect = np.append(grid[grid < m], m)
+        assert s.accrual_end.tolist() == expect.tolist()
+        assert s.issue == i and s.maturity == m
+
+
+def test_coupon_schedules_interning():
+    schedule_cache().clear()
+    issue = ['2021-03-15', '2021-03-15', '2021-03-15']
+    a = coupon_schedules(issue, '2031-03-15', [0.03, 0.03, 0.04], 2)
+    assert a[0] is a[1] and a[0] is not a[2]
+    b = coupon_schedules('2021-03-15', '2031-03-15', 0.03)
+    assert b[0] is a[0]
+    assert schedule_cache().info().hits == 1
+    with pytest.raises(ValueError):
+        a[0].cashflows[0] = 0
+    assert isinstance(a[0], CouponSchedule) and len(a[0]) == 20 and a[0].cashflows.sum() == 130
+
+
+def test_coupon_schedules_calendar():
+    calendar = Calendar(['2023-01-31'])
+    s = coupon_schedule('2022-01-31', '2023-07-31', 0.06, 4, calendar=calendar, roll="modified_following")
+    assert s.accrual_end.astype(str).tolist()[:4] == ['2022-04-30', '2022-07-31', '2022-10-31', '2023-01-31']
+    assert s.dates.astype(str).tolist()[:4] == ['2022-04-29', '2022-07-29', '2022-10-31', '2023-01-30']
+    with pytest.raises(ValueError):
+        coupon_schedules('2022-01-31', '2021-01-31', 0.05)
+    with pytest.raises(ValueError):
+        coupon_schedules('2020-01-31', '2021-01-31', 0.05, stub="odd")
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from fixincome import utils as ut
+from fixincome.book import CashflowBook
+from fixincome.curve import YieldCurve
+
+TIMES = [0.25, 0.5, 1, 2, 3, 5, 7, 10, 20, 30]
+ZEROS = [0.05, 0.048, 0.045, 0.04, 0.038, 0.037, 0.039, 0.041, 0.045, 0.044]
+
+
+def almost_equal(result, expect, precision: float = 1e-10) -> bool:
+    return np.all(np.abs(np.asarray(result)-expect) <= precision)
+
+
+def test_interpolation():
+    t = np.linspace(0.25, 30, 500)
+    linear = YieldCurve(TIMES, ZEROS)
+    assert almost_equal(linear.zero_rate(t), np.interp(t, TIMES, ZEROS))
+    log_linear = YieldCurve(TIMES, discount_factors=(1 + np.array(ZEROS))**-np.array(TIMES), interpolation="log_linear")
+    assert almost_equal(log_linear.zero_rates, ZEROS)
+    # piecewise constant forwards between nodes
+    assert almost_equal(log_linear.forward_rate(3.5, 4), log_linear.forward_rate(3, 5))
+    interpolate = pytest.importorskip("scipy.interpolate")
+    cubic = YieldCurve(TIMES, ZEROS, interpolation="monotone_cubic")
+    assert almost_equal(cubic.zero_rate(t), interpolate.PchipInterpolator(TIMES, ZEROS)(t))
+
+
+def test_discount_factor():
+    for method in ("linear", "log_linear", "monotone_cubic"):
+        curve = YieldCurve(TIMES, ZEROS, interpolation=method)
+        assert almost_equal(curve.discount_factor(TIMES), (1 + np.array(ZEROS))**-np.array(TIMES))
+        # flat zero rates beyond the nodes
+        assert almost_equal(curve.discount_factor([0.1, 40]), [1.05**-0.1, 1.044**-40])
+        assert curve.discount_factor(0) == 1.0
+    curve = YieldCurve(TIMES, ZEROS)
+    t = np.random.default_rng(1).uniform(0, 30, 1000)
+    assert almost_equal(curve.discount_factor(t), [curve.discount_factor(x) for x in t])
+    assert curve.cache_info().hits == 0
+    curve.discount_factor(t[:3])
+    assert curve.cache_info().hits == 3
+    with pytest.raises(ValueError):
+        YieldCurve([1, 1], [0.01, 0.02])
+    with pytest.raises(ValueError):
+        YieldCurve([1, 2], [0.01, 0.02], interpolation="spline")
+
+
+def test_curve_valuation():
+    flat = YieldCurve([1], [0.1])
+    assert almost_equal(ut.net_present_value(flat, [10, 10, 110]), ut.net_present_value(0.1, [10, 10, 110]))
+    dates, cashflows = ['20200101', '20200815', '20220101'], [-100, 10, 110]
+    assert almost_equal(ut.xnpv(flat, dates, cashflows), ut.xnpv(0.1, dates, cashflows))
+    curve = YieldCurve(TIMES, ZEROS, date='2020-01-01')
+    expect = sum(c*curve.discount_factor((np.datetime64(d[:4] + '-' + d[4:6] + '-' + d[6:]) -
+                                          np.datetime64('2020-01-01')).astype(int)/365)
+                 for d, c in zip(dates, cashflows))
+    assert almost_equal(ut.xnpv(curve, dates, cashflows), expect)
+
+    book = CashflowBook.from_lists([dates, ['20210301', '20250301']], [cashflows, [5, 105]])
+    assert almost_equal(book.xnpv(flat), book.xnpv(0.1))
+    assert almost_equal(book.npv(flat), book.npv(0.1))
+    result = book.xnpv(curve)
+    assert almost_equal(result, [expect, ut.xnpv(curve, ['20210301', '20250301'], [5, 105])])
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from fixincome import dates as dt
+
+
+def test_to_datetime64():
+    result = dt.to_datetime64(['20060101', '20240229', '19991231'])
+    assert result.tolist() == np.array(['2006-01-01', '2024-02-29', '1999-12-31'], dtype='datetime64[D]').tolist()
+    assert dt.to_datetime64([[20060101]]).shape == (1, 1)
+
+
+@pytest.mark.parametrize("dates", [['20061301'], ['20070230'], [20060100], ['2006-01-01', '20060201'],
+                                   ['2007-02-30'], ['2006011']])
+def test_to_datetime64_invalid(dates):
+    with pytest.raises(ValueError):
+        dt.to_datetime64(dates)
+
+
+def test_day_offsets():
+    assert dt.day_offsets(['20060101', '20060303', '20070101']).tolist() == [0, 61, 365]
+
+
+def test_add_months():
+    result = dt.add_months(['2024-01-31', '2023-02-28', '2024-08-31', '2024-08-30'], [1, 6, -6, -6], True)
+    assert result.astype(str).tolist() == ['2024-02-29', '2023-08-31', '2024-02-29', '2024-02-29']
+    assert dt.add_months('2023-02-28', 6).astype(str).item() == '2023-08-28'
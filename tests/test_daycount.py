@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from fixincome import solvers as sv
+from fixincome import utils as ut
+from fixincome.book import CashflowBook
+from fixincome.daycount import register_convention, year_fraction
+from fixincome.schedule import CashflowSchedule
+
+
+def almost_equal(result, expect, precision: float = 1e-8) -> bool:
+    return np.all(np.abs(np.asarray(result)-expect) <= precision)
+
+
+START = ['2007-12-28', '2008-02-29', '2007-10-31', '2008-02-28', '2006-01-31']
+END = ['2008-02-28', '2008-08-31', '2008-11-30', '2008-03-31', '2006-02-28']
+
+
+def test_year_fraction():
+    assert almost_equal(year_fraction(START, END, "ACT/360"), np.array([62, 184, 396, 32, 28])/360)
+    assert almost_equal(year_fraction(START, END, "30/360"), np.array([60, 180, 390, 33, 28])/360)
+    assert almost_equal(year_fraction(START, END, "30E/360"), np.array([60, 181, 390, 32, 28])/360)
+    assert almost_equal(year_fraction(START, END, "act/act"),
+                        [4/365 + 58/366, 184/366, 62/365 + 334/366, 32/366, 28/365])
+    assert almost_equal(year_fraction(START, END, "ACT/365L"), [62/365, 184/365, 396/366, 32/366, 28/365])
+    assert almost_equal(year_fraction('20080101', START[:2]), [-4/365, 59/365])
+    with pytest.raises(ValueError):
+        year_fraction(START, END, "BUS/252")
+
+
+def test_register_convention():
+    register_convention("act/364", lambda start, end: (end - start).astype(np.int64)/364)
+    assert almost_equal(year_fraction('20060101', '20061231', "ACT/364"), 1)
+
+
+def test_xirr_convention():
+    dates = ['20060101', '20060303', '20060704', '20061012', '20061225']
+    cashflows = [-1000, 150, 100, 50, 1000]
+    schedule = CashflowSchedule(dates, cashflows, "ACT/360")
+    assert schedule.times("ACT/360") is schedule.year_fractions
+    rate = ut.xirr(schedule)
+    assert almost_equal(ut.xnpv(rate, dates, cashflows, convention="ACT/360"), 0)
+    assert almost_equal(sv.xirr_batch([dates], [cashflows], convention="ACT/360").root, rate, 1e-10)
+    book = CashflowBook.from_lists([dates], [cashflows], "ACT/360")
+    assert almost_equal(book.xirr().root, rate, 1e-10)
+    assert almost_equal(ut.xirr(dates, cashflows), ut.xirr(schedule, convention="ACT/365"), 1e-10)
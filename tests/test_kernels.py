@@ -0,0 +1,28 @@
+from fixincome import kernels as kn
+
+
+def almost_equal(result, expect, precision: float = 1e-9) -> bool:
+    return abs(result-expect) <= precision
+
+
+CASHFLOWS = [100, -50, 300, 400, 500]
+
+
+def test_npv():
+    assert almost_equal(kn.npv(0.1, [100, 200, 300, 400, 500]), 1065.258831, 1e-6)
+    assert almost_equal(kn.npv(0.12, iter([1.6, 2.4, 2.8]), 5), 0.3348, 1e-4)
+
+
+def test_npv_derivatives():
+    rate = 0.07
+    f, f1, f2 = kn.npv_derivatives(rate, CASHFLOWS, 100)
+    assert almost_equal(f, sum(c/(1+rate)**t for t, c in enumerate(CASHFLOWS, 1)) - 100)
+    assert almost_equal(f1, -sum(t*c/(1+rate)**(t+1) for t, c in enumerate(CASHFLOWS, 1)))
+    assert almost_equal(f2, sum(t*(t+1)*c/(1+rate)**(t+2) for t, c in enumerate(CASHFLOWS, 1)))
+
+
+def test_annuity_derivatives():
+    for rate in (0.05, 0.001):
+        pv, d1, d2 = kn.annuity_derivatives(5, rate, 10, 100)
+        expect = kn.npv_derivatives(rate, [5]*9 + [105])
+        assert all(almost_equal(a, b) for a, b in zip((pv, d1, d2), expect))
@@ -0,0 +1,44 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import fixincome
+from fixincome import bond as bd
+from fixincome import solvers as sv
+from fixincome import utils as ut
+from fixincome.parallel import ParallelRunner, parallel_npv
+
+
+def almost_equal(result, expect, precision: float = 1e-10) -> bool:
+    return np.all(np.abs(np.asarray(result)-expect) <= precision)
+
+
+def test_parallel_runner():
+    assert fixincome.ParallelRunner is ParallelRunner
+    rng = np.random.default_rng(1)
+    n = 1000
+    price, coupon, term = rng.uniform(80, 120, n), rng.uniform(1, 8, n), rng.integers(1, 30, n)
+    with ParallelRunner(processes=2, chunksize=128) as runner:
+        res = runner.discount_rate(price, coupon, term, 100)
+        expect = sv.discount_rate_batch(price, coupon, term, 100)
+        assert almost_equal(res.root, expect.root) and res.converged.all()
+        analytics = runner.bond_analytics(price, coupon, term)
+        for got, want in zip(analytics, bd.bond_analytics_array(price, coupon, term)):
+            assert almost_equal(got, want)
+        assert almost_equal(runner.modified_duration(price, res.root, 100, coupon/100, term),
+                            analytics.modified_duration)
+        dates = [['20060101', '20060303', '20060704'], ['20060101', '20061012', '20061225', '20070601']]
+        cashflows = [[-1000, 600, 500], [-1000, 100, 100, 1000]]
+        assert almost_equal(runner.xirr(dates, cashflows).root, sv.xirr_batch(dates, cashflows).root)
+
+
+def test_parallel_npv():
+    # several chunks of NPV_CHUNK periods for every worker count
+    cashflows = np.random.default_rng(2).uniform(-100, 100, 200001)
+    expect = ut.net_present_value(0.0003, cashflows.tolist(), 50)
+    results = [ut.net_present_value(0.0003, cashflows, 50, workers=w) for w in (1, 2, 3, 8)]
+    assert all(r == results[0] for r in results)
+    assert almost_equal(results[0], expect, 1e-8)
+    with ThreadPoolExecutor(2) as pool:
+        assert parallel_npv(0.0003, cashflows, 50, chunksize=1000, executor=pool) == \
+            parallel_npv(0.0003, cashflows, 50, chunksize=1000, workers=4)
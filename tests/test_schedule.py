@@ -0,0 +1,55 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from fixincome import utils as ut
+from fixincome.schedule import CashflowSchedule
+
+
+def almost_equal(result, expect, precision: float = 1e-4) -> bool:
+    return abs(result-expect) <= precision
+
+
+DATES = ['20060101', '20070303', '20070704', '20081012', '20091225']
+CASHFLOWS = [-1000, 100, 195, 350, 800]
+
+
+def test_cashflow_schedule():
+    schedule = CashflowSchedule(DATES, CASHFLOWS)
+    assert schedule.offsets.dtype == np.int32
+    assert schedule.offsets.tolist() == [0, 426, 549, 1015, 1454]
+    assert schedule.year_fractions is schedule.year_fractions
+    assert len(schedule) == 5
+
+
+def test_cashflow_schedule_inputs():
+    iso = ['2006-01-01', '2007-03-03', '2007-07-04', '2008-10-12', '2009-12-25']
+    objects = [datetime.date(*map(int, d.split('-'))) for d in iso]
+    expect = CashflowSchedule(DATES, CASHFLOWS).offsets.tolist()
+    for dates in (iso, objects, np.array(iso, dtype='datetime64[D]')):
+        assert CashflowSchedule(dates, CASHFLOWS).offsets.tolist() == expect
+    with pytest.raises(ValueError):
+        CashflowSchedule(['20060101', '20070230', '20070704', '20081012', '20091225'], CASHFLOWS)
+    with pytest.raises(ValueError):
+        CashflowSchedule(['2006-01-01', '20070303', '20070704', '20081012', '20091225'], CASHFLOWS)
+
+
+def test_xnpv_schedule():
+    schedule = CashflowSchedule(DATES, CASHFLOWS)
+    assert almost_equal(schedule.xnpv(0.12), 16.80083062214726)
+    assert almost_equal(ut.xnpv(0.12, schedule), 16.80083062214726)
+
+
+def test_xirr_schedule():
+    schedule = CashflowSchedule(['20060101', '20060303', '20060704', '20061012', '20061225'],
+                                [-1000, 150, 100, 50, 1000])
+    assert almost_equal(ut.xirr(schedule), 0.37188269789)
+
+
+def test_xnpv_rate_grid():
+    schedule = CashflowSchedule(DATES, CASHFLOWS)
+    rates = np.linspace(-0.05, 0.3, 51).reshape(3, 17)
+    expect = np.vectorize(schedule.xnpv)(rates)
+    assert np.allclose(ut.xnpv(rates, DATES, CASHFLOWS), expect, rtol=1e-12)
+    assert np.allclose(schedule.xnpv(rates, chunksize=4), expect, rtol=1e-12)
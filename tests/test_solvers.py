@@ -0,0 +1,143 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from fixincome import solvers as sv
+from fixincome import utils as ut
+
+
+def almost_equal(result, expect, precision: float = 1e-8) -> bool:
+    return np.all(np.abs(np.asarray(result)-expect) <= precision)
+
+
+def test_internal_rate_batch():
+    cashflows = [[100, 200, 300, 400, 500], [1.6, 2.4, 2.8, 99, 99], [1, 1, 1, 1, 1]]
+    res = sv.internal_rate_batch(cashflows, [1000, 5, 0], lengths=[5, 3, 5])
+    assert almost_equal(res.root[:2], [0.12005762, 0.15517573])
+    assert res.converged.tolist() == [True, True, False]
+    assert np.isnan(res.root[2])
+    assert np.all(res.iterations[:2] < 10)
+
+
+def test_internal_rate_batch_masked():
+    cashflows = np.ma.masked_array([[1.6, 2.4, 2.8, 99]], mask=[[0, 0, 0, 1]])
+    res = sv.internal_rate_batch(cashflows, 5)
+    assert almost_equal(res.root, ut.internal_rate([1.6, 2.4, 2.8], 5))
+
+
+def test_internal_rate_batch_fallback():
+    res = sv.internal_rate_batch([[100, 200, 300, 400, 500]], 1000, guess=-0.999, maxiter=2)
+    assert res.converged[0]
+    assert res.iterations[0] > 2
+    assert almost_equal(res.root, 0.12005762)
+
+
+def test_xirr_batch():
+    dates = [['20060101', '20060303', '20060704', '20061012', '20061225'],
+             ['20060101', '20070303', '20070704', '20081012', '20091225']]
+    cashflows = [[-1000, 150, 100, 50, 1000], [-1000, 100, 195, 350, 800]]
+    res = sv.xirr_batch(dates, cashflows)
+    assert almost_equal(res.root[0], 0.37188269789)
+    assert almost_equal(ut.xnpv(res.root[1], dates[1], cashflows[1]), 0, 1e-6)
+    assert res.converged.all()
+
+
+def test_xirr_batch_ragged():
+    dates = [['20060101', '20060303', '20060704', '20061012', '20061225'], ['20060101', '20070101']]
+    cashflows = [[-1000, 150, 100, 50, 1000], [-100, 110]]
+    res = sv.xirr_batch(dates, cashflows)
+    assert almost_equal(res.root, [0.37188269789, 0.1])
+
+
+def test_discount_rate_batch():
+    res = sv.discount_rate_batch([700, 50, 1000], [100, 0, 50], [10, 5, 4], [0, 10, 1000])
+    assert almost_equal(res.root, [0.0707282, 1/5**0.2 - 1, 0.05], 1e-7)
+    assert res.converged.all()
+
+
+def test_discount_rate_batch_fractional_low_rate():
+    rate = np.array([0.0, 0.0005, 0.005, -0.004, 0.009, 0.02])
+    term = np.array([12.5, 12.5, 12.5, 7.25, 360.5, 0.5])
+    price = [ut.present_value(5, r, n, 100) for r, n in zip(rate, term)]
+    res = sv.discount_rate_batch(price, 5, term, 100, guess=0.05)
+    assert res.converged.all()
+    assert almost_equal(res.root, rate, 1e-10)
+
+
+def test_discount_rate_batch_fallback():
+    res = sv.discount_rate_batch(700, 100, 10, guess=-0.9, maxiter=1)
+    assert res.converged[0] and res.iterations[0] > 1
+    assert almost_equal(res.root, 0.0707282, 1e-7)
+
+
+def test_solve_scalar():
+    res = sv.solve_scalar(lambda x: (x*x - 2, 2*x, 2), 1.0)
+    assert res.converged and almost_equal(res.root, 2**0.5, 1e-12)
+    fallback = sv.solve_scalar(lambda x: (x*x - 0.04, 2*x, 2), 0.0, maxiter=3)
+    assert fallback.converged and almost_equal(abs(fallback.root), 0.2, 1e-10)
+    missing = sv.solve_scalar(lambda x: (x*x + 1, 2*x, 2), 0.5)
+    assert not missing.converged and np.isnan(missing.root)
+
+
+def test_solve_scalar_scipy():
+    assert almost_equal(ut.internal_rate([100, 200, 300, 400, 500], 1000, method="scipy"), 0.12005762)
+    assert almost_equal(ut.discount_rate(700, 100, 10, method="scipy"), 0.0707282)
+
+
+def test_import_does_not_load_scipy():
+    code = "import sys, fixincome; fixincome.internal_rate([1.6, 2.4, 2.8], 5); print('scipy' in sys.modules)"
+    env = dict(os.environ, FIXINCOME_BACKEND="python")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env).stdout
+    assert out.strip() == "False"
+
+
+def test_sign_changes():
+    assert sv.sign_changes([[1, 0, -1, 0, 2], [0, 0, 1, 1, 0], [-1, 2, -3, 4, 0]]).tolist() == [2, 0, 3]
+
+
+def test_internal_rates_batch():
+    discount = 1/np.array([1.05, 1.1, 1.3, 0.8])
+    coefficients = np.poly(discount)[::-1]
+    cashflows = [list(coefficients[1:]) + [0], [-100, 230, -132, 0, 0], [100, 200, 300, 400, 500], [1, 1, 1, 1, 1]]
+    roots = sv.internal_rates_batch(cashflows, [-coefficients[0], 0, 1000, 0])
+    assert almost_equal(roots[0], [-0.2, 0.05, 0.1, 0.3])
+    assert almost_equal(roots[1], [0.1, 0.2])
+    assert almost_equal(roots[2], [0.12005762])
+    assert roots[3].size == 0
+    assert almost_equal(ut.internal_rates([-100, 230, -132], 0), [0.1, 0.2])
+
+
+def test_internal_rates_batch_repeated_root():
+    # NPV polynomials in the discount factor with a double root at 10% and a single one at 30%
+    double = np.poly(1/np.array([1.1, 1.1]))[::-1]
+    triple = np.poly(1/np.array([1.1, 1.1, 1.3]))[::-1]
+    cashflows = [list(double[1:]) + [0], list(triple[1:])]
+    roots = sv.internal_rates_batch(cashflows, [-double[0], -triple[0]])
+    assert roots[0].size == 1 and almost_equal(roots[0], [0.1], 1e-7)
+    assert roots[1].size == 2 and almost_equal(roots[1], [0.1, 0.3], 1e-7)
+
+
+def test_warm_start_solver():
+    solver = sv.WarmStartSolver(maxsize=2)
+    cold = solver.discount_rate("a", 700, 100, 10)
+    warm = solver.discount_rate("a", 701, 100, 10)
+    assert almost_equal(cold, 0.0707282, 1e-7)
+    assert almost_equal(warm, ut.discount_rate(701, 100, 10), 1e-12)
+    stats = solver.stats()
+    assert stats.solves == 2 and stats.warm_starts == 1 and stats.cold_starts == 1
+    assert stats.mean_iterations == stats.iterations/2
+
+
+def test_warm_start_solver_batch():
+    solver = sv.WarmStartSolver()
+    keys = ["a", "b", "c"]
+    first = solver.discount_rate_batch(keys, [700, 950, 1000], [100, 50, 50], [10, 10, 4], [0, 1000, 1000])
+    second = solver.discount_rate_batch(keys, [700.5, 951, 1000], [100, 50, 50], [10, 10, 4], [0, 1000, 1000])
+    assert first.converged.all() and second.converged.all()
+    assert second.iterations.sum() < first.iterations.sum()
+    assert almost_equal(second.root[2], 0.05, 1e-12)
+    assert solver.stats().warm_starts == 3
+    solver.clear()
+    assert solver.stats().solves == 0 and len(solver.yields) == 0
@@ -0,0 +1,44 @@
+import numpy as np
+
+from fixincome import utils as ut
+from fixincome.book import CashflowBook
+from fixincome.store import BookWriter, csv_to_book, iter_chunks, open_book, value_book, write_book
+
+
+def almost_equal(result, expect, precision: float = 1e-10) -> bool:
+    return np.all(np.abs(np.asarray(result)-expect) <= precision)
+
+
+DATES = [['20060101', '20060303', '20060704', '20061012', '20061225'], [], ['20060101', '20070303', '20070704']]
+CASHFLOWS = [[-1000, 150, 100, 50, 1000], [], [-1000, 100, 1195]]
+
+
+def test_book_roundtrip(tmp_path):
+    book = CashflowBook.from_lists(DATES, CASHFLOWS)
+    with BookWriter(tmp_path / "book") as writer:
+        writer.append(book[:2])
+        writer.append(book[2:])
+    stored = open_book(tmp_path / "book")
+    assert not stored.cashflows.flags.owndata and not stored.start.flags.owndata
+    assert stored.indptr.tolist() == book.indptr.tolist() and len(stored) == 3
+    assert stored[2].dates.tolist() == book[2].dates.tolist()
+    assert [len(c) for _, _, c in iter_chunks(stored, 5)] == [2, 1]
+
+
+def test_csv_to_book(tmp_path):
+    lines = ["key,date,amount"] + [f"{k},{d},{c}" for k, ds, cs in zip("ab", DATES[::2], CASHFLOWS[::2])
+                                   for d, c in zip(ds, cs)]
+    (tmp_path / "flows.csv").write_text("\n".join(lines))
+    assert csv_to_book(tmp_path / "flows.csv", tmp_path / "book", chunksize=1) == 2
+    stored = open_book(tmp_path / "book")
+    assert stored.cashflows.tolist() == CASHFLOWS[0] + CASHFLOWS[2]
+
+
+def test_value_book(tmp_path):
+    write_book(tmp_path / "book", CashflowBook.from_lists(DATES, CASHFLOWS))
+    stored = open_book(tmp_path / "book")
+    rates = np.array([0.12, 0.05, 0.08])
+    res = value_book(stored, "xnpv", rates, out=tmp_path / "xnpv.npy", max_payments=4)
+    assert almost_equal(np.load(tmp_path / "xnpv.npy"), res)
+    assert almost_equal(res[[0, 2]], [ut.xnpv(0.12, DATES[0], CASHFLOWS[0]), ut.xnpv(0.08, DATES[2], CASHFLOWS[2])])
+    assert almost_equal(value_book(stored, "xirr", max_payments=1)[0], ut.xirr(DATES[0], CASHFLOWS[0]))
@@ -0,0 +1,39 @@
+import numpy as np
+
+from fixincome import stream as st
+from fixincome import utils as ut
+
+
+def almost_equal(result, expect, precision: float = 1e-8) -> bool:
+    return np.all(np.abs(np.asarray(result)-expect) <= precision)
+
+
+CASHFLOWS = [100, 200, 300, 400, 500, -50, 700]
+
+
+def test_stream_npv():
+    expect = ut.net_present_value(0.1, CASHFLOWS, 1000)
+    assert almost_equal(st.stream_npv(0.1, iter(CASHFLOWS), 1000, chunksize=3), expect)
+    assert almost_equal(ut.net_present_value(0.1, (c for c in CASHFLOWS), 1000), expect)
+    assert almost_equal(st.stream_npv(0.1, [np.array(CASHFLOWS[:4]), np.array(CASHFLOWS[4:])], 1000), expect)
+    f, f1, f2 = st.stream_npv_derivatives(0.1, iter(CASHFLOWS), 1000, chunksize=2)
+    h = 1e-5
+    assert almost_equal(f, expect)
+    assert almost_equal(f1, (ut.net_present_value(0.1+h, CASHFLOWS) - ut.net_present_value(0.1-h, CASHFLOWS))/(2*h), 1e-4)
+
+
+def test_stream_internal_rate(tmp_path):
+    path = tmp_path / "flows.bin"
+    np.array(CASHFLOWS, dtype=np.float64).tofile(path)
+    expect = ut.internal_rate(CASHFLOWS, 1000)
+    res = st.stream_internal_rate(lambda: st.read_cashflows(path, chunksize=3, binary=True), 1000)
+    assert res.converged and almost_equal(res.root, expect, 1e-10)
+    assert almost_equal(st.stream_internal_rate(CASHFLOWS, 1000).root, expect, 1e-10)
+
+
+def test_stream_xnpv(tmp_path):
+    dates = ['20060101', '20070303', '20070704', '20081012', '20091225']
+    cashflows = [-1000, 100, 195, 350, 800]
+    (tmp_path / "flows.txt").write_text("\n".join(map(str, cashflows)))
+    res = st.stream_xnpv(0.12, iter(dates), st.read_cashflows(tmp_path / "flows.txt", chunksize=2))
+    assert almost_equal(res, ut.xnpv(0.12, dates, cashflows))
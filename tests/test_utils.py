@@ -49,6 +49,12 @@ def test_discount_rate():
     assert almost_equal(ut.discount_rate(700, 100, 10), 0.07073)
 
 
+def test_discount_rate_fractional_low_rate():
+    for rate, term in ((0.005, 12.5), (0.0005, 12.5), (-0.003, 7.25), (0.009, 360.5)):
+        price = ut.present_value(5, rate, term, 100)
+        assert almost_equal(ut.discount_rate(price, 5, term, 100), rate, 1e-10)
+
+
 def test_holding_period_yield():
     assert almost_equal(ut.holding_period_yield(100000, 98500), 0.015228)
 
@@ -85,3 +91,15 @@ def test_pvbp():
 
 def test_convexity():
     assert almost_equal(ut.convexity(1000, 50, 4, 1000), 16.473834)
+
+
+def test_geometric_series_sum_near_one():
+    assert ut.geometric_series_sum(2, 1, 7) == 14
+    assert almost_equal(ut.geometric_series_sum(1, 1 + 1e-9, 100), 100 + 4950e-9, 1e-12)
+
+
+def test_factors_zero_rate():
+    assert ut.present_value_factor(0, 12) == 12
+    assert ut.future_value_factor(0, 12, 1) == 12
+    assert almost_equal(ut.present_value_factor(1e-8, 360), 360 - 64980e-8, 1e-9)
+    assert almost_equal(ut.present_value(100, 0, 10, 1000), 2000, 1e-12)
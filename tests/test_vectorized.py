@@ -0,0 +1,71 @@
+import numpy as np
+
+from fixincome import kernels as kn
+from fixincome import utils as ut
+from fixincome import vectorized as vt
+
+
+def all_close(result, expect, precision: float = 1e-12) -> bool:
+    return np.allclose(result, expect, rtol=precision, atol=0)
+
+
+RATES = np.array([0.013, 0.05, 0.12, 0.2])
+TERMS = np.array([12.5, 4, 10, 30])
+TIMES = np.array([0, 1, 0, 1])
+
+
+def test_geometric_series_sum_array():
+    assert all_close(vt.geometric_series_sum_array(10, [2.3, 1.1], 20),
+                     [ut.geometric_series_sum(10, 2.3, 20), ut.geometric_series_sum(10, 1.1, 20)])
+
+
+def test_future_value_factor_array():
+    expect = [ut.future_value_factor(r, n, t) for r, n, t in zip(RATES, TERMS, TIMES)]
+    assert all_close(vt.future_value_factor_array(RATES, TERMS, TIMES), expect)
+
+
+def test_present_value_factor_array():
+    expect = [ut.present_value_factor(r, n, t) for r, n, t in zip(RATES, TERMS, TIMES)]
+    assert all_close(vt.present_value_factor_array(RATES, TERMS, TIMES), expect)
+
+
+def test_present_value_array():
+    expect = [ut.present_value(100, r, n, 1000, t) for r, n, t in zip(RATES, TERMS, TIMES)]
+    assert all_close(vt.present_value_array(100, RATES, TERMS, 1000, TIMES), expect)
+    grid = vt.present_value_array(100, RATES[:, None], TERMS[None, :], 1000)
+    assert grid.shape == (4, 4)
+    assert all_close(grid[2, 1], ut.present_value(100, RATES[2], TERMS[1], 1000))
+
+
+def test_future_value_array():
+    expect = [ut.future_value(r, n, 150, 10, t) for r, n, t in zip(RATES, TERMS, TIMES)]
+    assert all_close(vt.future_value_array(RATES, TERMS, 150, 10, TIMES), expect)
+
+
+def test_factors_array_zero_rate():
+    rates = np.array([0, 1e-8, -1e-8])
+    assert all_close(vt.present_value_factor_array(rates, 360), [ut.present_value_factor(r, 360) for r in rates])
+    assert all_close(vt.future_value_factor_array(rates, 360), [ut.future_value_factor(r, 360) for r in rates])
+    assert vt.geometric_series_sum_array(3, 1, 5) == 15
+
+
+def test_npv_derivatives_array():
+    cashflows = np.array([[100, 200, 300, 400, 500], [1.6, 2.4, 2.8, 0, 0]])
+    result = vt.npv_derivatives_array([0.1, 0.12], cashflows, [0, 5])
+    for i, (rate, investment) in enumerate([(0.1, 0), (0.12, 5)]):
+        assert all_close([r[i] for r in result], kn.npv_derivatives(rate, cashflows[i], investment))
+
+
+def test_annuity_moments_array_fractional_low_rate():
+    # near zero the moments come from a series that must match the closed forms for non-integer terms
+    rate = np.array([0.0, 1e-6, -0.0004, 0.003, 0.0099, 0.0101])
+    term = np.array([12.5, 0.5, 7.25, 360.5, 100.3, 100.3])
+    x = np.log1p(rate)
+    s0 = np.where(rate == 0, term, -np.expm1(-term*x)/np.expm1(np.where(rate == 0, 1, x)))
+    moments = vt.annuity_moments_array(rate, term)
+    assert all_close(moments[0], s0, 1e-9)
+    assert all_close(moments, np.array([kn.annuity_moments(r, n) for r, n in zip(rate, term)]).T, 1e-9)
+    # the integer case matches the direct sums
+    t = np.arange(1, 13)
+    v = 1/(1+rate[2])**t
+    assert all_close(vt.annuity_moments_array(rate[2], 12), [v.sum(), (t*v).sum(), (t*(t+1)*v).sum()])